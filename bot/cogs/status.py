@@ -8,10 +8,37 @@ from discord import app_commands
 from datetime import datetime, timedelta
 
 from core.stats import stats
+from utils.http_client import http_client
+from core.host_scheduler import host_scheduler
+from core.proxy_pool import proxy_pool
+from core.scanner.breaker import quarantined
+from utils.storage import p, load_json_safe
 from settings import LOOP_MINUTES, LOOP_INTERVAL_STR
 
 log = logging.getLogger("MaftyIntel")
 
+# Limite do Discord para o valor de um campo de embed.
+_FIELD_MAX_CHARS = 1024
+
+
+def quarantine_field(quarentena: list) -> str:
+    """
+    Até 10 fontes em quarentena, uma por linha, mais "… e mais N".
+
+    Para antes de passar de _FIELD_MAX_CHARS contando a linha final: com URLs
+    longas, 10 linhas já estouravam o campo e o /status inteiro falhava.
+    """
+    linhas = []
+    for url, item in quarentena[:10]:
+        linha = f"• {url[:80]} — sonda <t:{int(item.get('next_probe_at', 0))}:R>"
+        resto = len(quarentena) - len(linhas) - 1
+        cauda = f"\n… e mais {resto}" if resto else ""
+        if len("\n".join(linhas + [linha]) + cauda) > _FIELD_MAX_CHARS:
+            break
+        linhas.append(linha)
+    if len(quarentena) > len(linhas):
+        linhas.append(f"… e mais {len(quarentena) - len(linhas)}")
+    return "\n".join(linhas)
 
 
 class ScanButton(discord.ui.View):
@@ -70,7 +97,8 @@ class StatusCog(commands.Cog):
         
         embed.add_field(
             name="📡 Varreduras",
-            value=f"{stats.scans_completed}",
+            value=f"{stats.scans_completed}"
+            + (f" (+{stats.cadence_batches} lotes)" if stats.cadence_batches else ""),
             inline=True
         )
         
@@ -85,7 +113,65 @@ class StatusCog(commands.Cog):
             value=f"{stats.cache_hits_total}",
             inline=True
         )
+
+        embed.add_field(
+            name="🧬 Corpo Idêntico (sem ETag)",
+            value=f"{stats.fingerprint_hits_total}",
+            inline=True
+        )
+
+        pool = http_client.snapshot()
+        embed.add_field(
+            name="🌐 Pool HTTP",
+            value=(
+                f"{pool['requests']} req · {pool['connections_reused']} conexões reusadas / "
+                f"{pool['connections_created']} novas · DNS em cache {pool['dns_cache_hits']}"
+            ),
+            inline=False
+        )
+
+        ritmo = host_scheduler.snapshot()
+        embed.add_field(
+            name="🚦 Rate Limit por Host",
+            value=(
+                f"{ritmo['pushbacks']} pedidos de calma · {ritmo['waits']} esperas "
+                f"({ritmo['wait_seconds']}s) · {ritmo['hosts_paced']} host(s) com ritmo"
+            ),
+            inline=False
+        )
         
+        if proxy_pool.configured:
+            rotas = proxy_pool.snapshot()["routes"]
+            embed.add_field(
+                name="🛡️ Rotas de Proxy",
+                value="\n".join(
+                    f"• {r['route']}: {r['requests']} req · {r['error_rate'] * 100:.0f}% erro · "
+                    f"{'—' if r['latency_ms'] is None else str(r['latency_ms']) + ' ms'}"
+                    + (f" · 🚫 ejetado {r['ejected_for_sec']}s" if r["ejected_for_sec"] else "")
+                    for r in rotas
+                ),
+                inline=False
+            )
+
+        # Fontes tiradas das buscas pelo disjuntor, da próxima sonda à mais distante.
+        quarentena = quarantined(load_json_safe(p("state.json"), {}).get("breakers"))
+        if quarentena:
+            embed.add_field(
+                name=f"🚧 Fontes em Quarentena ({len(quarentena)})",
+                value=quarantine_field(quarentena),
+                inline=False
+            )
+
+        if stats.lane_time_to_post:
+            embed.add_field(
+                name="🚥 Tempo até o Post por Prioridade",
+                value=" · ".join(
+                    f"{pista}: {item['posts']} envio(s), mediana {item['median_sec']:.0f}s"
+                    for pista, item in stats.lane_time_to_post.items()
+                ),
+                inline=False
+            )
+
         if stats.last_scan_time:
             last_scan_str = f"<t:{int(stats.last_scan_time.timestamp())}:R>"
         else:
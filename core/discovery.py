@@ -0,0 +1,439 @@
+"""
+Discovery module - Descobre feed RSS/Atom ou sitemap com <lastmod> dos sites oficiais.
+
+Um site oficial com feed vai para o fetcher de feeds (entradas com título e link,
+GET condicional, marcas de água); um com sitemap que cobre a área vigiada só tem a
+página baixada e parseada pelo HTML Monitor quando o sitemap muda. O resultado
+fica num overlay gerado do sources.json (sources.discovered.json), que o
+`scripts/sources/discover_feeds.py` escreve e, com
+SOURCE_DISCOVERY_INTERVAL_HOURS > 0, a própria varredura renova.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+from settings import HTML_MONITOR_PARSER, SOURCE_DISCOVERY_INTERVAL_HOURS
+from utils.storage import p, load_json_safe, save_json_safe
+from utils.security import validate_url
+from utils.http_client import http_client
+from core.host_scheduler import host_scheduler
+from core.html_clean import clean_hash_links, resolve_backend, site_backend
+
+log = logging.getLogger("MaftyIntel")
+
+# Overlay gerado do sources.json (não editar à mão: a próxima descoberta reescreve).
+DISCOVERY_FILE = "sources.discovered.json"
+
+_FEED_TYPES = ("application/rss+xml", "application/atom+xml", "application/rdf+xml")
+# Feeds de comentários (WordPress) anunciam-se igual ao feed de posts.
+_SKIP_FEED_HINTS = ("/comments/", "comments/feed")
+_MAX_FEED_CANDIDATES = 3
+_MAX_CHILD_SITEMAPS = 5
+# Sitemaps gigantes (lojas com 50 mil produtos) não compensam: corta a leitura.
+_MAX_BODY_BYTES = 5 * 1024 * 1024
+_TIMEOUT = aiohttp.ClientTimeout(total=30.0)
+_CONCURRENCY = 4
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
+}
+
+# Renovação em segundo plano disparada pela varredura (uma de cada vez).
+_refresh_task: Optional[asyncio.Task] = None
+
+
+# ---------------------------------------------------------------------------
+# Funções puras (rodam no pool de processos do parse)
+# ---------------------------------------------------------------------------
+
+def find_feed_links(content: str, base_url: str) -> List[str]:
+    """URLs absolutas dos <link rel="alternate"> RSS/Atom da página, na ordem declarada."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
+    out: List[str] = []
+    for link in soup.find_all("link", href=True):
+        rel = [r.lower() for r in (link.get("rel") or [])]
+        tipo = (link.get("type") or "").split(";")[0].strip().lower()
+        if "alternate" not in rel or tipo not in _FEED_TYPES:
+            continue
+        href = urljoin(base_url, link["href"].strip())
+        if href.startswith(("http://", "https://")) and not any(h in href for h in _SKIP_FEED_HINTS):
+            if href not in out:
+                out.append(href)
+    return out
+
+
+def probe_page(
+    content: str, backend: str, watch: Optional[str], ignore: Sequence[str], base_url: str
+) -> Tuple[float, List[str]]:
+    """Custo da limpeza/hash que o HTML Monitor paga pela página (s) e os feeds anunciados nela."""
+    segundos = clean_hash_links(content, backend, watch, ignore)[3]
+    return segundos, find_feed_links(content, base_url)
+
+
+def probe_feed(body: bytes) -> Tuple[int, float]:
+    """Entradas com link num feed e os segundos do parse (o custo por ciclo depois da troca)."""
+    import feedparser
+
+    started = time.perf_counter()
+    entries = feedparser.parse(body).entries
+    return sum(1 for e in entries if e.get("link")), time.perf_counter() - started
+
+
+def parse_sitemap(body: bytes) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    (<url>s como (loc, lastmod), <sitemap>s filhos) de um sitemap ou sitemapindex.
+
+    Aceita o corpo gzip (sitemap.xml.gz), descomprimido no máximo até
+    _MAX_BODY_BYTES (uma bomba de gzip não infla no worker), e ignora o
+    namespace. XML inválido devolve listas vazias.
+    """
+    if body[:2] == b"\x1f\x8b":
+        try:
+            body = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, _MAX_BODY_BYTES)
+        except zlib.error:
+            return [], []
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return [], []
+    urls: List[Tuple[str, str]] = []
+    filhos: List[str] = []
+    for node in root:
+        tag = node.tag.rsplit("}", 1)[-1]
+        campos = {child.tag.rsplit("}", 1)[-1]: (child.text or "").strip() for child in node}
+        if not campos.get("loc"):
+            continue
+        if tag == "url":
+            urls.append((campos["loc"], campos.get("lastmod", "")))
+        elif tag == "sitemap":
+            filhos.append(campos["loc"])
+    return urls, filhos
+
+
+def site_prefix(site_url: str) -> str:
+    """host+caminho que delimita a área do site (sem esquema, sem www., sem index.php)."""
+    parsed = urlparse(site_url)
+    host = parsed.netloc.lower().removeprefix("www.")
+    path = parsed.path or "/"
+    ultimo = path.rsplit("/", 1)[-1]
+    if "." in ultimo:
+        path = path[: -len(ultimo)]
+    return host + path
+
+
+def _under(loc: str, prefix: str) -> bool:
+    parsed = urlparse(loc)
+    return (parsed.netloc.lower().removeprefix("www.") + (parsed.path or "/")).startswith(prefix)
+
+
+def sitemap_signature(body: bytes, site_url: str) -> Tuple[str, int, List[str], float]:
+    """
+    Assinatura das URLs do sitemap dentro da área do site, com os <lastmod>.
+
+    Devolve (assinatura, URLs com lastmod na área, sitemaps filhos, segundos).
+    Assinatura "" = o sitemap não cobre o site (ou não tem <lastmod>): não serve
+    de vigia. Muda quando surge uma URL nova ou um lastmod avança.
+    """
+    started = time.perf_counter()
+    urls, filhos = parse_sitemap(body)
+    prefix = site_prefix(site_url)
+    na_area = sorted((loc, mod) for loc, mod in urls if mod and _under(loc, prefix))
+    if not na_area:
+        return "", 0, filhos, time.perf_counter() - started
+    digest = hashlib.blake2b(repr(na_area).encode("utf-8"), digest_size=8).hexdigest()
+    return digest, len(na_area), filhos, time.perf_counter() - started
+
+
+# ---------------------------------------------------------------------------
+# Overlay (sources.discovered.json)
+# ---------------------------------------------------------------------------
+
+def load_overlay() -> Dict[str, Any]:
+    """Conteúdo do overlay ({"generated_at", "sites": {url: rota}}); {} se não existir."""
+    data = load_json_safe(p(DISCOVERY_FILE), {})
+    return data if isinstance(data, dict) else {}
+
+
+def routes_for(sites: Sequence[Dict[str, Any]], overlay: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Rotas descobertas que valem agora: {url do site: {"feed"|"sitemap", ...}}.
+
+    PROPÓSITO DE NEGÓCIO:
+        Um só lugar decide quem sai do HTML Monitor: o fetcher de feeds (que
+        acrescenta os feeds descobertos) e o monitor (que pula ou vigia pelo
+        sitemap) não podem discordar sobre o mesmo site.
+
+    INVARIANTES DO DOMÍNIO:
+        - Só sites ainda presentes em `sites` (official_sites atual): tirar um
+          site do sources.json tira também o feed descoberto dele.
+        - "discovery": false no item do site ignora o overlay (feed anunciado que
+          não presta, sitemap que mente no lastmod).
+        - Feed tem precedência sobre sitemap.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Overlay ausente ou malformado devolve {}: todos os sites ficam no HTML
+        Monitor, como antes.
+    """
+    overlay = load_overlay() if overlay is None else overlay
+    descobertos = overlay.get("sites") if isinstance(overlay, dict) else None
+    if not isinstance(descobertos, dict):
+        return {}
+    out: Dict[str, Dict[str, Any]] = {}
+    for site in sites:
+        info = descobertos.get(site["url"])
+        if site.get("discovery") is False or not isinstance(info, dict):
+            continue
+        if isinstance(info.get("feed"), str) and info["feed"].startswith("http"):
+            out[site["url"]] = {**info, "sitemap": None}
+        elif isinstance(info.get("sitemap"), str) and info["sitemap"].startswith("http"):
+            out[site["url"]] = info
+    return out
+
+
+def discovered_feeds(sources: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Fontes (formato de load_sources) dos feeds descobertos nos sites oficiais.
+
+    Pista "high" como as outras fontes oficiais; "discovered_from" guarda o site
+    de origem para os logs.
+    """
+    # Import local: core.html_monitor importa este módulo.
+    from core.html_monitor import _html_monitor_sites_from_sources
+
+    out = []
+    for site_url, route in routes_for(_html_monitor_sites_from_sources(sources)).items():
+        if route.get("feed"):
+            meta = {"name": route.get("name") or site_url, "discovered_from": site_url, "priority": "high"}
+            out.append({"url": route["feed"], "metadata": meta})
+    return out
+
+
+def savings(routes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Economia estimada por ciclo (bytes e ms de CPU), medida na descoberta, por tipo de rota."""
+    out = {"feed": 0, "sitemap": 0, "bytes": 0, "cpu_ms": 0.0}
+    for info in routes.values():
+        out["feed" if info.get("feed") else "sitemap"] += 1
+        out["bytes"] += int(info.get("html_bytes", 0) or 0) - int(info.get("alt_bytes", 0) or 0)
+        out["cpu_ms"] += float(info.get("html_cpu_ms", 0) or 0) - float(info.get("alt_cpu_ms", 0) or 0)
+    return out
+
+
+def format_savings(economia: Dict[str, Any]) -> str:
+    return (
+        f"{economia['feed']} site(s) pelo feed, {economia['sitemap']} pelo sitemap: "
+        f"~{economia['bytes'] / 1024:.0f} KB e ~{economia['cpu_ms']:.0f} ms de CPU a menos por ciclo"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Descoberta (rede)
+# ---------------------------------------------------------------------------
+
+async def _get(session: aiohttp.ClientSession, url: str) -> Tuple[int, bytes, str]:
+    """GET direto com orçamento por host; (status, corpo, url final). (0, b"", url) em falha."""
+    ok, _ = validate_url(url)
+    if not ok:
+        return 0, b"", url
+    await host_scheduler.acquire(url)
+    try:
+        async with session.get(url, headers=HEADERS, timeout=_TIMEOUT) as resp:
+            host_scheduler.observe(url, resp.status, resp.headers)
+            if resp.status != 200:
+                return resp.status, b"", str(resp.url)
+            body = await resp.content.read(_MAX_BODY_BYTES + 1)
+            if len(body) > _MAX_BODY_BYTES:
+                return resp.status, b"", str(resp.url)
+            return resp.status, body, str(resp.url)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return 0, b"", url
+
+
+async def _sitemap_candidates(session: aiohttp.ClientSession, site_url: str) -> List[str]:
+    parsed = urlparse(site_url)
+    raiz = f"{parsed.scheme}://{parsed.netloc}"
+    out: List[str] = []
+    status, body, _ = await _get(session, f"{raiz}/robots.txt")
+    if status == 200:
+        for linha in body.decode("utf-8", "replace").splitlines():
+            chave, _, valor = linha.partition(":")
+            if chave.strip().lower() == "sitemap" and valor.strip().startswith("http"):
+                out.append(valor.strip())
+    padrao = f"{raiz}/sitemap.xml"
+    if padrao not in out:
+        out.append(padrao)
+    return out
+
+
+async def _find_sitemap(
+    session: aiohttp.ClientSession, site_url: str, max_bytes: int
+) -> Optional[Dict[str, Any]]:
+    # Primeiro sitemap (ou filho de um índice) que cobre a área do site com
+    # <lastmod> e é menor do que a própria página.
+    from core.scanner.parsepool import parse_pool
+
+    fila = await _sitemap_candidates(session, site_url)
+    vistos = set()
+    filhos_seguidos = 0
+    while fila:
+        url = fila.pop(0)
+        if url in vistos:
+            continue
+        vistos.add(url)
+        status, body, _ = await _get(session, url)
+        if status != 200 or not body:
+            continue
+        assinatura, quantos, filhos, segundos = await parse_pool.run(sitemap_signature, body, site_url)
+        if assinatura and len(body) < max_bytes:
+            return {"sitemap": url, "alt_bytes": len(body), "alt_cpu_ms": round(segundos * 1000, 1), "urls": quantos}
+        # Índice: os filhos cujo nome lembra a área do site vão primeiro.
+        pista = site_prefix(site_url).split("/", 1)[-1].strip("/").split("/")[0]
+        filhos.sort(key=lambda f: 0 if pista and pista in f else 1)
+        for filho in filhos:
+            if filhos_seguidos >= _MAX_CHILD_SITEMAPS:
+                break
+            filhos_seguidos += 1
+            fila.append(filho)
+    return None
+
+
+async def discover_site(session: aiohttp.ClientSession, site: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Descobre a rota barata de um site oficial e mede o que ela poupa.
+
+    PROPÓSITO DE NEGÓCIO:
+        Cada site oficial custa, por ciclo, a página inteira e a limpeza/hash
+        dela. Um feed anunciado na página substitui isso de vez (com título e
+        link por notícia); um sitemap com <lastmod> que cobre a área do site
+        deixa a página para quando ele mudar.
+
+    INVARIANTES DO DOMÍNIO:
+        - Feed só vale com pelo menos uma entrada com link; tem precedência.
+        - Sitemap só vale se cobrir a área do site (host+caminho) com <lastmod>
+          e for menor do que a página (senão vigiar custaria mais do que raspar).
+        - Custos medidos como o monitor paga: bytes do corpo e segundos da
+          limpeza com o backend e os seletores do site.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Não levanta: página inacessível devolve "error" e nenhuma rota (o site
+        segue no HTML Monitor).
+    """
+    from core.scanner.parsepool import parse_pool
+
+    url = site["url"]
+    out: Dict[str, Any] = {"feed": None, "sitemap": None, "checked_at": int(time.time())}
+    if site.get("name"):
+        out["name"] = site["name"]
+    status, body, final_url = await _get(session, url)
+    if status != 200 or not body:
+        out["error"] = f"HTTP {status}" if status else "sem resposta"
+        return out
+    watch = site.get("watch_selector")
+    ignore = list(site.get("ignore_selectors", ()))
+    backend = site_backend(resolve_backend(HTML_MONITOR_PARSER), [s for s in [watch, *ignore] if s])
+    segundos, feeds = await parse_pool.run(
+        probe_page, body.decode("utf-8", "replace"), backend, watch, ignore, final_url
+    )
+    out["html_bytes"] = len(body)
+    out["html_cpu_ms"] = round(segundos * 1000, 1)
+
+    for feed_url in feeds[:_MAX_FEED_CANDIDATES]:
+        status, feed_body, _ = await _get(session, feed_url)
+        if status != 200 or not feed_body:
+            continue
+        entradas, parse_s = await parse_pool.run(probe_feed, feed_body)
+        if entradas:
+            out.update(feed=feed_url, alt_bytes=len(feed_body), alt_cpu_ms=round(parse_s * 1000, 1))
+            return out
+
+    sitemap = await _find_sitemap(session, url, len(body))
+    if sitemap:
+        out.update(sitemap)
+    return out
+
+
+async def discover_sites(
+    session: aiohttp.ClientSession, sites: Sequence[Dict[str, Any]], concurrency: int = _CONCURRENCY
+) -> Dict[str, Dict[str, Any]]:
+    """Descobre todos os sites com concorrência limitada; {url: resultado de discover_site}."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def um(site):
+        async with semaphore:
+            try:
+                return site["url"], await discover_site(session, site)
+            except Exception as e:
+                log.warning(f"⚠️ [DESCOBERTA] Falha inesperada em '{site['url']}': {type(e).__name__}: {e}")
+                return site["url"], {"feed": None, "sitemap": None, "error": type(e).__name__}
+
+    return dict(await asyncio.gather(*(um(site) for site in sites)))
+
+
+def save_overlay(results: Dict[str, Dict[str, Any]]) -> None:
+    """Grava o overlay gerado (substitui o anterior por inteiro)."""
+    agora = time.time()
+    save_json_safe(p(DISCOVERY_FILE), {
+        "generated": datetime.fromtimestamp(agora).isoformat(timespec="seconds"),
+        "generated_at": agora,
+        "note": "Gerado por scripts/sources/discover_feeds.py — não editar à mão.",
+        "sites": results,
+    })
+
+
+def discovery_due(now: float, overlay: Optional[Dict[str, Any]] = None) -> bool:
+    """True se a renovação durante as varreduras está ligada e o overlay venceu."""
+    if SOURCE_DISCOVERY_INTERVAL_HOURS <= 0:
+        return False
+    overlay = load_overlay() if overlay is None else overlay
+    try:
+        gerado = float(overlay.get("generated_at", 0) or 0)
+    except (TypeError, ValueError):
+        gerado = 0.0
+    return now - gerado >= SOURCE_DISCOVERY_INTERVAL_HOURS * 3600
+
+
+async def refresh_overlay(session: aiohttp.ClientSession) -> Dict[str, Dict[str, Any]]:
+    """Redescobre todos os sites oficiais (ignorando o overlay atual) e grava o resultado."""
+    # Import local: core.html_monitor importa este módulo.
+    from core.html_monitor import _html_monitor_sites_from_sources
+
+    sources = load_json_safe(p("sources.json"), {})
+    sites = [
+        site for site in _html_monitor_sites_from_sources(sources if isinstance(sources, dict) else {})
+        if site.get("discovery") is not False
+    ]
+    started = time.monotonic()
+    results = await discover_sites(session, sites)
+    save_overlay(results)
+    log.info(
+        f"🧭 [DESCOBERTA] {len(sites)} site(s) oficiais verificados em {time.monotonic() - started:.0f}s — "
+        f"{format_savings(savings(routes_for(sites, {'sites': results})))}."
+    )
+    return results
+
+
+def schedule_refresh() -> bool:
+    """Dispara `refresh_overlay` em segundo plano se nenhuma estiver a correr (a varredura não espera)."""
+    global _refresh_task
+    if _refresh_task is not None and not _refresh_task.done():
+        return False
+
+    async def _run():
+        try:
+            await refresh_overlay(http_client.session())
+        except Exception as e:
+            log.warning(f"⚠️ [DESCOBERTA] Renovação do overlay falhou: {type(e).__name__}: {e}")
+
+    _refresh_task = asyncio.create_task(_run())
+    return True
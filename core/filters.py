@@ -1,8 +1,9 @@
 """
 Filters module - Gundam & Gunpla Intelligence filtering and categorization logic.
 """
-from typing import Dict, List, Any
 import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
 from utils.html import clean_html
 
 
@@ -202,6 +203,30 @@ def _has_cjk(text: str) -> bool:
     )
 
 
+def _keyword_pattern(k: str) -> str:
+    """Regex de UMA keyword, com a fronteira certa para o tipo dela (ver _contains_any)."""
+    escaped = re.escape(k)
+    if _has_cjk(k):
+        # Japonês não separa palavras com espaço e kana/kanji contam como \w,
+        # então \b nunca casa no meio de uma frase ("アニメ主題歌決定").
+        # Substring é o único critério que funciona — mesma razão de GUNDAM_JP_HINTS.
+        return escaped
+    if k.isdigit():
+        # ":" e "." colam o número a horários (12:00) e versões (1.00);
+        # \w cobre os dígitos vizinhos de "2000" e "300".
+        return r'(?<![\w:.])' + escaped + r'(?![\w:.])'
+    return r'\b' + escaped + r's?\b'
+
+
+@lru_cache(maxsize=256)
+def _compiled_any(keywords: Tuple[str, ...]) -> "re.Pattern[str]":
+    """Alternação compilada de uma lista de keywords, construída uma vez por lista."""
+    return re.compile(
+        r'(?:' + '|'.join(_keyword_pattern(k) for k in keywords) + r')',
+        re.IGNORECASE,
+    )
+
+
 def _contains_any(text: str, keywords: List[str]) -> bool:
     """
     Verifica se alguma keyword aparece no texto, respeitando fronteiras de palavra.
@@ -226,52 +251,214 @@ def _contains_any(text: str, keywords: List[str]) -> bool:
         Lista de keywords vazia ou None devolve False (nunca levanta). Keywords
         são escapadas com re.escape, então caracteres especiais são literais e
         não conseguem quebrar o regex.
+
+    O regex de cada lista é compilado uma vez e guardado (_compiled_any); as
+    listas fixas do módulo passam pelo KeywordMatcher, que as avalia juntas.
     """
     if not keywords:
         return False
+    return bool(_compiled_any(tuple(keywords)).search(text))
 
-    patterns = []
-    for k in keywords:
-        escaped = re.escape(k)
-        if _has_cjk(k):
-            # Japonês não separa palavras com espaço e kana/kanji contam como \w,
-            # então \b nunca casa no meio de uma frase ("アニメ主題歌決定").
-            # Substring é o único critério que funciona — mesma razão de GUNDAM_JP_HINTS.
-            patterns.append(escaped)
-        elif k.isdigit():
-            # ":" e "." colam o número a horários (12:00) e versões (1.00);
-            # \w cobre os dígitos vizinhos de "2000" e "300".
-            patterns.append(r'(?<![\w:.])' + escaped + r'(?![\w:.])')
-        else:
-            patterns.append(r'\b' + escaped + r's?\b')
 
-    pattern_str = r'(?:' + '|'.join(patterns) + r')'
-    return bool(re.search(pattern_str, text, re.IGNORECASE))
+def _trie_regex(words: Iterable[str], leaf: str) -> str:
+    """
+    Alternação fatorada por prefixo ("gun(?:dam|pla)") de palavras já minúsculas.
 
+    O `re` testa as alternativas de uma alternação plana uma a uma em cada
+    posição; fatorada, cada caractere do texto decide o ramo de uma vez. `leaf`
+    é o sufixo de fronteira anexado onde cada palavra termina.
+    """
+    trie: Dict[str, Any] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
 
-def match_intel(
-    guild_id: str,
+    def rx(node: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + rx(child) for ch, child in sorted(node.items()) if ch]
+        if "" in node:
+            alts.append(leaf)
+        if len(alts) == 1:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")"
+
+    return rx(trie) if trie else ""
+
+
+class KeywordMatcher:
+    """
+    Várias listas de keywords avaliadas numa única passada sobre o texto.
+
+    PROPÓSITO DE NEGÓCIO:
+        classify_intel consultava BLACKLIST, NEGATIVE_KEYWORDS, GUNDAM_SPECIFIC,
+        GUNDAM_CORE, os hints japoneses e cada categoria do CAT_MAP em separado —
+        uma dezena de buscas sobre o mesmo texto por notícia. Aqui todas as
+        keywords viram um só regex compilado (fatorado por prefixo, o mesmo
+        princípio de um autômato Aho-Corasick), e uma passada devolve TODOS os
+        grupos que casaram.
+
+    INVARIANTES DO DOMÍNIO:
+        - Cada keyword casa exatamente como em _contains_any (palavra inteira com
+          plural, fronteira numérica estrita, substring para CJK). Grupos em
+          `case_sensitive` casam como `in` (é o caso dos GUNDAM_JP_HINTS).
+        - O regex combinado só localiza as posições onde ALGUMA keyword casa; em
+          cada uma, todas as keywords que começam ali são conferidas com o próprio
+          padrão. Por isso matches sobrepostos não se escondem: "sd gundam base"
+          casa "sd gundam", "gundam" E "gundam base".
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Nunca levanta em groups_in. Grupos vazios simplesmente nunca aparecem.
+    """
+
+    def __init__(
+        self,
+        groups: Dict[str, Iterable[str]],
+        case_sensitive: Dict[str, Iterable[str]] | None = None,
+    ):
+        # padrão da keyword -> (texto, grupos a que pertence)
+        por_padrao: Dict[str, Tuple[str, Set[str]]] = {}
+
+        def registra(nome: str, keywords: Iterable[str], literal: bool) -> None:
+            for k in keywords:
+                if not isinstance(k, str) or not k:
+                    continue
+                padrao = f"(?-i:{re.escape(k)})" if literal else _keyword_pattern(k)
+                por_padrao.setdefault(padrao, (k, set()))[1].add(nome)
+
+        for nome, keywords in groups.items():
+            registra(nome, keywords, literal=False)
+        for nome, keywords in (case_sensitive or {}).items():
+            registra(nome, keywords, literal=True)
+
+        self._padroes = [re.compile(padrao, re.IGNORECASE) for padrao in por_padrao]
+        self._grupos = [frozenset(g) for _, g in por_padrao.values()]
+
+        # Trie em Python para, numa posição, listar as keywords que começam ali.
+        self._trie: Dict[str, Any] = {}
+        self._max_len = 0
+        texto_kw, numerico_kw, cjk_kw = [], [], []
+        for idx, (padrao, (k, _)) in enumerate(por_padrao.items()):
+            lower = k.lower()
+            node = self._trie
+            for ch in lower:
+                node = node.setdefault(ch, {})
+            node.setdefault("", []).append(idx)
+            self._max_len = max(self._max_len, len(lower))
+            if padrao.startswith("(?-i:") or _has_cjk(k):
+                cjk_kw.append(lower)
+            elif k.isdigit():
+                numerico_kw.append(lower)
+            else:
+                texto_kw.append(lower)
+
+        partes = []
+        if texto_kw:
+            partes.append(r"\b" + _trie_regex(texto_kw, r"s?\b"))
+        if numerico_kw:
+            partes.append(r"(?<![\w:.])" + _trie_regex(numerico_kw, r"(?![\w:.])"))
+        if cjk_kw:
+            partes.append(_trie_regex(cjk_kw, ""))
+        self._combinado = re.compile("|".join(partes), re.IGNORECASE) if partes else None
+
+    def _candidatos(self, text: str, pos: int) -> List[int]:
+        """Índices das keywords cujo texto é prefixo de text[pos:] (minúsculas)."""
+        out: List[int] = []
+        node = self._trie
+        for ch in text[pos:pos + self._max_len]:
+            for c in ch.lower():
+                node = node.get(c)
+                if node is None:
+                    return out
+            out.extend(node.get("", ()))
+        return out
+
+    def groups_in(self, text: str) -> Set[str]:
+        """Nomes de todos os grupos com pelo menos uma keyword no texto."""
+        achados: Set[str] = set()
+        if not text or self._combinado is None:
+            return achados
+        search = self._combinado.search
+        m = search(text)
+        while m is not None:
+            inicio = m.start()
+            for i in self._candidatos(text, inicio):
+                if not self._grupos[i] <= achados and self._padroes[i].match(text, inicio):
+                    achados |= self._grupos[i]
+            # Recomeça uma posição à frente (e não no fim do match) para não
+            # engolir keywords sobrepostas.
+            m = search(text, inicio + 1)
+        return achados
+
+
+def _build_intel_matcher() -> KeywordMatcher:
+    groups: Dict[str, Iterable[str]] = {
+        "blacklist": BLACKLIST,
+        "negative": NEGATIVE_KEYWORDS,
+        "specific": GUNDAM_SPECIFIC,
+        "core": GUNDAM_CORE,
+    }
+    for categoria, kws in CAT_MAP.items():
+        groups[f"cat:{categoria}"] = kws
+    return KeywordMatcher(groups, case_sensitive={"jp_hints": GUNDAM_JP_HINTS})
+
+
+def _build_source_rules() -> Dict[str, "re.Pattern[str]"]:
+    return {src_key: re.compile(pattern) for src_key, pattern in SPECIAL_SOURCE_RULES.items()}
+
+
+_INTEL_MATCHER = _build_intel_matcher()
+_SOURCE_RULES = _build_source_rules()
+
+
+def reload_filter_rules() -> None:
+    """
+    Recompila o matcher e as regras por fonte a partir das listas do módulo.
+
+    As listas são lidas uma vez no import; quem alterar BLACKLIST, CAT_MAP,
+    SPECIAL_SOURCE_RULES etc. em runtime chama isto para a mudança valer.
+    """
+    global _INTEL_MATCHER, _SOURCE_RULES
+    _INTEL_MATCHER = _build_intel_matcher()
+    _SOURCE_RULES = _build_source_rules()
+    _compiled_any.cache_clear()
+
+
+def classify_intel(
     title: str,
     summary: str,
-    config: Dict[str, Any],
     source_url: str | None = None,
-) -> bool:
+) -> FrozenSet[str] | None:
     """
-    Decides if the news item should be posted to the guild.
-    """
-    g = config.get(str(guild_id), {})
-    filters = g.get("filters", [])
+    Veredito de uma notícia, calculado UMA vez e reaproveitado por todas as guilds.
 
-    if not isinstance(filters, list) or not filters:
-        return False
+    PROPÓSITO DE NEGÓCIO:
+        Tudo o que match_intel decide — blacklist, portão Gundam, regra por fonte e
+        categorias — depende só do conteúdo e da fonte, nunca da guild. Rodar isto
+        por guild custava 21 passagens de regex por notícia; com o índice de
+        assinaturas (core/subscriptions.py) o custo passa a escalar com o número de
+        categorias, não de servidores.
+
+    INVARIANTES DO DOMÍNIO:
+        - None = bloqueada (blacklist, franquia vizinha, sem termo Gundam ou regra
+          da fonte). Nenhuma guild a recebe, nem as de "todos".
+        - frozenset = aprovada; contém as chaves do CAT_MAP que casaram, e pode ser
+          vazio (passa só para quem assina "todos").
+        - Mesma lógica, na mesma ordem, que match_intel sempre aplicou.
 
+    COMPORTAMENTO EM CASO DE FALHA:
+        Nunca levanta. Título/resumo vazios ou None são tratados como texto vazio.
+    """
     clean_title = clean_html(title).lower()
     clean_summary = clean_html(summary).lower()
     content = f"{clean_title} {clean_summary}"
 
+    # Uma passada sobre o conteúdo responde a todas as listas de uma vez.
+    hits = _INTEL_MATCHER.groups_in(content)
+
     # 1. Block explicit blacklist and negative keywords (One Piece, etc)
-    if _contains_any(content, BLACKLIST) or _contains_any(content, NEGATIVE_KEYWORDS):
-        return False
+    if "blacklist" in hits or "negative" in hits:
+        return None
 
     # 2. Source-Specific Strictness
     # For generic aggregators like Google News or generic YouTube channels, 
@@ -282,41 +469,65 @@ def match_intel(
         # Em fontes genéricas (especialmente YouTube), descrição pode citar Gundam
         # sem que o vídeo/notícia seja de fato sobre Gundam.
         if "youtube.com" in (source_url or "") or "youtu.be" in (source_url or ""):
-            has_en_title = _contains_any(clean_title, GUNDAM_SPECIFIC)
-            has_jp_title = any(h in clean_title for h in GUNDAM_JP_HINTS)
-            if not has_en_title and not has_jp_title:
-                return False
+            title_hits = _INTEL_MATCHER.groups_in(clean_title)
+            if "specific" not in title_hits and "jp_hints" not in title_hits:
+                return None
         else:
-            has_en = _contains_any(content, GUNDAM_SPECIFIC)
-            has_jp = any(h in content for h in GUNDAM_JP_HINTS)
-            if not has_en and not has_jp:
-                return False
+            if "specific" not in hits and "jp_hints" not in hits:
+                return None
     else:
         # For specialized Gundam sites, any core term (including Bandai) is okay.
         # Muitos feeds especializados são só em japonês (Esuteru, Hayamimi, Ryokutya,
         # Hobby Dengeki, Gundam Base JP, Tamashii...): também aceitamos os hints em kana/kanji,
         # senão itens só-em-japonês seriam silenciosamente descartados.
-        has_en = _contains_any(content, GUNDAM_CORE)
-        has_jp = any(h in content for h in GUNDAM_JP_HINTS)
-        if not has_en and not has_jp:
-            return False
+        if "core" not in hits and "jp_hints" not in hits:
+            return None
 
     # 3. Source-specific regex rules
     if source_url:
-        for src_key, strict_pattern in SPECIAL_SOURCE_RULES.items():
+        for src_key, strict_pattern in _SOURCE_RULES.items():
             if src_key in source_url:
-                if not re.search(strict_pattern, content):
-                    return False
+                if not strict_pattern.search(content):
+                    return None
+
+    # 4. Categorias que casaram (a escolha de cada guild é aplicada depois)
+    return frozenset(
+        categoria for categoria in CAT_MAP
+        if f"cat:{categoria}" in hits
+    )
+
 
-    # 4. Filter categories (resolvendo nomes legados antes de consultar o CAT_MAP)
+def filters_accept(filters: Any, verdict: FrozenSet[str] | None) -> bool:
+    """
+    Aplica a escolha de filtros de UMA guild sobre o veredito de classify_intel.
+
+    Nomes legados (LEGACY_FILTER_ALIASES) são resolvidos antes de consultar as
+    categorias; lista vazia ou de tipo errado nunca aceita nada.
+    """
+    if verdict is None or not isinstance(filters, list) or not filters:
+        return False
     if "todos" in filters:
         return True
+    return any(LEGACY_FILTER_ALIASES.get(f, f) in verdict for f in filters)
 
-    for f in filters:
-        categoria = LEGACY_FILTER_ALIASES.get(f, f)
-        kws = CAT_MAP.get(categoria, [])
-        if kws and _contains_any(content, kws):
-            return True
 
-    return False
+def match_intel(
+    guild_id: str,
+    title: str,
+    summary: str,
+    config: Dict[str, Any],
+    source_url: str | None = None,
+) -> bool:
+    """
+    Decides if the news item should be posted to the guild.
+
+    Para decidir a mesma notícia para várias guilds, prefira classify_intel uma
+    vez + core.subscriptions.SubscriptionIndex — é o caminho do engine.
+    """
+    g = config.get(str(guild_id), {})
+    filters = g.get("filters", [])
+
+    if not isinstance(filters, list) or not filters:
+        return False
 
+    return filters_accept(filters, classify_intel(title, summary, source_url))
@@ -0,0 +1,305 @@
+"""
+Host scheduler - Balde de fichas por host, aprendido dos cabeçalhos de rate limit.
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+from settings import REDDIT_MIN_INTERVAL_SEC
+from utils.ratelimit import TokenBucket
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+# Hosts com orçamento conhecido de antemão: {domínio: (req/s, burst)}. Subdomínios
+# (old.reddit.com, www.reddit.com) partilham o balde do domínio — o orçamento é
+# do IP, não do subdomínio.
+_SEED_LIMITS: Dict[str, tuple] = {}
+if REDDIT_MIN_INTERVAL_SEC > 0:
+    _SEED_LIMITS["reddit.com"] = (1.0 / REDDIT_MIN_INTERVAL_SEC, 1.0)
+
+# Espera máxima aceita de um servidor (Retry-After / x-ratelimit-reset absurdos
+# travariam a varredura inteira).
+_MAX_BLOCK_SEC = 300.0
+# `x-ratelimit-reset` acima disto é hora absoluta (epoch), não segundos até o reset:
+# 10^9 s são 31 anos, nenhuma janela de rate limit chega perto.
+_EPOCH_RESET_MIN = 1e9
+# Taxa mínima aprendida: um host nunca fica abaixo de 1 requisição por 2 minutos.
+_MIN_RATE = 1.0 / 120.0
+# Recuperação: após esta sequência de respostas sem empurrão, a taxa sobe 25%;
+# acima de _FREE_RATE o host volta a não ter balde (velocidade total).
+_RECOVER_AFTER = 10
+_RECOVER_FACTOR = 1.25
+_FREE_RATE = 5.0
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    raw = headers.get(name)
+    if raw is None:
+        return None
+    try:
+        return float(str(raw).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """`Retry-After` em segundos: delta-seconds ou HTTP-date (RFC 9110); None se ilegível."""
+    value = _header_float(headers, "Retry-After")
+    if value is not None:
+        return value
+    raw = headers.get("Retry-After")
+    if raw is None:
+        return None
+    try:
+        when = parsedate_to_datetime(str(raw).strip())
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return (when - datetime.now(timezone.utc)).total_seconds()
+
+
+def _reset_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """`x-ratelimit-reset` em segundos até o reset; hosts que mandam epoch são convertidos."""
+    value = _header_float(headers, "x-ratelimit-reset")
+    if value is not None and value > _EPOCH_RESET_MIN:
+        value -= time.time()
+    return value
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float:
+    """
+    Segundos que o servidor pediu para esperar (`Retry-After` ou `x-ratelimit-reset`).
+
+    Aceita `Retry-After` em segundos ou como HTTP-date e `x-ratelimit-reset` em
+    segundos ou como epoch. 0.0 se nenhum estiver presente ou for ilegível;
+    limitado a 300s.
+    """
+    for value in (_retry_after(headers), _reset_seconds(headers)):
+        if value is not None:
+            return max(0.0, min(value, _MAX_BLOCK_SEC))
+    return 0.0
+
+
+class HostScheduler:
+    """
+    Um TokenBucket por host, compartilhado pelo fetcher de feeds e pelo HTML Monitor.
+
+    PROPÓSITO DE NEGÓCIO:
+        O throttle antigo conhecia um só host (reddit.com, intervalo fixo) e o
+        HTML Monitor — 122 sites oficiais, vários no mesmo domínio — não tinha
+        ritmo nenhum. Aqui cada host ganha o ritmo que ELE pede: quem nunca
+        reclamou vai a toda a velocidade; quem responde 429 ou anuncia orçamento
+        em `x-ratelimit-*` passa a ter um balde com a taxa aprendida.
+
+    INVARIANTES DO DOMÍNIO:
+        - Host sem balde não espera nada (`acquire` devolve na hora).
+        - 429/503 com espera: o host fica bloqueado pelo tempo pedido e a taxa cai
+          pela metade (ou nasce em 1/espera). `x-ratelimit-remaining` +
+          `x-ratelimit-reset` fixam a taxa em restante/reset; restante < 1 bloqueia
+          até o reset.
+        - Sequências de respostas limpas sobem a taxa 25%; acima de 5 req/s o
+          balde é descartado. Hosts semente (reddit.com) nunca caem abaixo da
+          taxa configurada nem perdem o balde.
+        - O aprendido vai para state["host_limits"] (export/load) e sobrevive a
+          restarts; bloqueios são gravados em hora de parede.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Não levanta exceção: URL sem host, cabeçalho ilegível ou estado
+        persistido corrompido são ignorados (o host fica a velocidade total).
+    """
+
+    def __init__(self, seeds: Optional[Dict[str, tuple]] = None):
+        self._seeds = dict(_SEED_LIMITS if seeds is None else seeds)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._learned: Dict[str, Dict[str, Any]] = {}
+        self._clean_streak: Dict[str, int] = {}
+        self._next_polite: Dict[str, float] = {}
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.pushbacks = 0
+        for host, (rate, burst) in self._seeds.items():
+            self._buckets[host] = TokenBucket(rate, burst)
+
+    def host_key(self, url: str) -> Optional[str]:
+        """Chave do balde: domínio semente que casa, senão o host sem `www.`."""
+        netloc = (urlparse(url).hostname or "").lower()
+        if not netloc:
+            return None
+        for seed in self._seeds:
+            if netloc == seed or netloc.endswith("." + seed):
+                return seed
+        return netloc[4:] if netloc.startswith("www.") else netloc
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(0.0, 1.0)
+        return bucket
+
+    def _set_rate(self, host: str, rate: float, burst: float) -> None:
+        seed = self._seeds.get(host)
+        if seed:
+            rate = min(rate, seed[0]) if rate > 0 else seed[0]
+        rate = max(_MIN_RATE, rate)
+        self._bucket(host).configure(rate, burst)
+        entry = self._learned.setdefault(host, {})
+        entry["rate"] = round(rate, 6)
+        entry["burst"] = burst
+        entry["updated"] = time.time()
+
+    def _block(self, host: str, seconds: float) -> None:
+        seconds = min(seconds, _MAX_BLOCK_SEC)
+        if seconds <= 0:
+            return
+        self._bucket(host).block_for(seconds)
+        entry = self._learned.setdefault(host, {})
+        entry["blocked_until"] = max(float(entry.get("blocked_until", 0.0)), time.time() + seconds)
+
+    async def pace(self, url: str, gap_min: float, gap_max: float) -> float:
+        """
+        Cortesia: espaça em `gap_min..gap_max` segundos (aleatório) os pedidos ao mesmo host.
+
+        Cada chamada reserva a próxima janela do host e dorme até ela; o primeiro
+        pedido a um host sai na hora. Feito ANTES de ocupar vaga de concorrência,
+        a espera de um host não atrasa os outros. Devolve os segundos esperados.
+        """
+        host = self.host_key(url)
+        if not host or gap_max <= 0:
+            return 0.0
+        now = time.monotonic()
+        start = max(now, self._next_polite.get(host, 0.0))
+        self._next_polite[host] = start + random.uniform(max(0.0, gap_min), gap_max)
+        espera = start - now
+        if espera > 0:
+            await asyncio.sleep(espera)
+        return espera
+
+    def delay(self, url: str) -> float:
+        """Segundos até o host de `url` liberar a próxima ficha (não consome)."""
+        host = self.host_key(url)
+        bucket = self._buckets.get(host) if host else None
+        return bucket.delay() if bucket is not None else 0.0
+
+    async def acquire(self, url: str) -> float:
+        """Espera a vez do host de `url`. Devolve os segundos esperados."""
+        host = self.host_key(url)
+        bucket = self._buckets.get(host) if host else None
+        if bucket is None:
+            return 0.0
+        waited = await bucket.acquire()
+        if waited > 0:
+            self.waits += 1
+            self.wait_seconds += waited
+        return waited
+
+    def observe(self, url: str, status: int, headers: Mapping[str, str]) -> None:
+        """Aprende com a resposta: 429/503, Retry-After e x-ratelimit-*."""
+        host = self.host_key(url)
+        if not host:
+            return
+        remaining = _header_float(headers, "x-ratelimit-remaining")
+        reset = _reset_seconds(headers)
+        pushed = False
+
+        if remaining is not None and reset is not None and reset > 0:
+            # Orçamento anunciado: gastar o que resta ao longo da janela.
+            self._set_rate(host, max(remaining, 1.0) / reset, max(1.0, min(remaining, 10.0)))
+            if remaining < 1:
+                self._block(host, reset)
+                pushed = True
+
+        if status in (429, 503):
+            wait = retry_after_seconds(headers)
+            if status == 429 or wait > 0:
+                pushed = True
+                bucket = self._buckets.get(host)
+                current = bucket.rate if bucket is not None else 0.0
+                new_rate = current / 2 if current > 0 else 1.0 / max(wait, 1.0)
+                self._set_rate(host, new_rate, 1.0)
+                self._block(host, wait or 1.0 / max(new_rate, _MIN_RATE))
+                entry = self._learned[host]
+                entry["hits_429"] = int(entry.get("hits_429", 0)) + 1
+
+        if pushed:
+            self.pushbacks += 1
+            self._clean_streak[host] = 0
+            log.info(
+                f"🚦 [RATE LIMIT] {host}: servidor pediu calma (HTTP {status}); "
+                f"ritmo agora {self._buckets[host].rate:.3f} req/s."
+            )
+            return
+
+        if remaining is None and 200 <= status < 400 and host in self._learned:
+            self._recover(host)
+
+    def _recover(self, host: str) -> None:
+        streak = self._clean_streak.get(host, 0) + 1
+        self._clean_streak[host] = streak
+        if streak < _RECOVER_AFTER:
+            return
+        self._clean_streak[host] = 0
+        bucket = self._buckets[host]
+        new_rate = bucket.rate * _RECOVER_FACTOR
+        if new_rate >= _FREE_RATE and host not in self._seeds:
+            self._buckets.pop(host, None)
+            self._learned.pop(host, None)
+            log.info(f"🚦 [RATE LIMIT] {host}: sem reclamações recentes, de volta à velocidade total.")
+            return
+        self._set_rate(host, new_rate, bucket.burst)
+
+    def export(self) -> Dict[str, Dict[str, Any]]:
+        """O que foi aprendido, para state["host_limits"]."""
+        now = time.time()
+        out = {}
+        for host, entry in self._learned.items():
+            item = dict(entry)
+            if float(item.get("blocked_until", 0.0)) <= now:
+                item.pop("blocked_until", None)
+            out[host] = item
+        return out
+
+    def load(self, data: Any) -> None:
+        """Substitui o aprendido pelo persistido (state["host_limits"])."""
+        for host in list(self._learned):
+            if host in self._seeds:
+                rate, burst = self._seeds[host]
+                self._buckets[host].configure(rate, burst)
+            else:
+                self._buckets.pop(host, None)
+        self._learned = {}
+        if not isinstance(data, dict):
+            return
+        now = time.time()
+        for host, entry in data.items():
+            if not isinstance(host, str) or not isinstance(entry, dict):
+                continue
+            try:
+                rate = float(entry.get("rate", 0.0))
+                burst = float(entry.get("burst", 1.0))
+                blocked_until = float(entry.get("blocked_until", 0.0))
+            except (TypeError, ValueError):
+                continue
+            if rate > 0:
+                self._set_rate(host, rate, burst)
+            if blocked_until > now:
+                self._block(host, blocked_until - now)
+            self._learned.setdefault(host, {}).update(
+                {k: v for k, v in entry.items() if k in ("hits_429", "updated")}
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "hosts_paced": len(self._buckets),
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 1),
+            "pushbacks": self.pushbacks,
+        }
+
+
+host_scheduler = HostScheduler()
@@ -0,0 +1,260 @@
+"""
+HTML clean module - Limpeza e hash das páginas do HTML Monitor, com backend de parser plugável.
+
+Funções puras (str in, tupla out): rodam no pool de processos do parse
+(core/scanner/parsepool.py), fora do event loop do bot.
+"""
+import hashlib
+import importlib.util
+import json
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Tags to ignore during hash calculation (noise reduction)
+IGNORE_TAGS = ['script', 'style', 'meta', 'noscript', 'iframe', 'svg']
+# Classes/IDs often used for ads or dynamic widgets
+IGNORE_SELECTORS = ['.ad', '.advertisement', '.widget', '#clock', '.timestamp', '.cookie-consent']
+
+# Do mais rápido para o mais lento; html.parser (BeautifulSoup) está sempre lá.
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+_SIMPLE_SELECTOR = re.compile(r"^([.#])([A-Za-z0-9_-]+)$")
+
+# Links por página devolvidos ao monitor (menus gigantes não incham o state.json).
+MAX_LINKS = 300
+_MAX_ANCHOR_CHARS = 200
+_SKIP_HREF = ("#", "javascript:", "mailto:", "tel:", "data:")
+
+
+def available_backends() -> List[str]:
+    """Backends instalados neste ambiente, na ordem de preferência."""
+    out = []
+    if importlib.util.find_spec("selectolax") is not None:
+        out.append("selectolax")
+    if importlib.util.find_spec("lxml") is not None:
+        out.append("lxml")
+    out.append("html.parser")
+    return out
+
+
+def resolve_backend(wanted: str) -> str:
+    """
+    Backend efetivo para HTML_MONITOR_PARSER.
+
+    "auto" escolhe o mais rápido instalado; um nome pedido mas não instalado
+    (ou desconhecido) cai em html.parser em vez de derrubar o monitor.
+    """
+    instalados = available_backends()
+    if wanted == "auto":
+        return instalados[0]
+    return wanted if wanted in instalados else "html.parser"
+
+
+def region_signature(watch_selector: Optional[str], ignore_selectors: Sequence[str] = ()) -> str:
+    """Assinatura curta da região vigiada de um site ("" = página inteira, sem extras)."""
+    if not watch_selector and not ignore_selectors:
+        return ""
+    chave = json.dumps([watch_selector or "", sorted(ignore_selectors)], ensure_ascii=False)
+    return hashlib.blake2b(chave.encode("utf-8"), digest_size=4).hexdigest()
+
+
+def hash_profile(backend: str, region: str = "") -> str:
+    """Perfil que gerou um hash: backend e, se houver, a região (`lxml@1a2b3c4d`)."""
+    if region:
+        return f"{backend}@{region}"
+    return "" if backend == "html.parser" else backend
+
+
+def hash_key(backend: str, page_hash: str, region: str = "") -> str:
+    """
+    Valor guardado em state["html_monitor"].
+
+    Backends e regiões diferentes não extraem o mesmo texto. O hash do
+    html.parser da página inteira fica sem prefixo (o formato de sempre); os
+    outros levam "perfil:" na frente, para uma troca de backend ou de
+    `watch_selector` reiniciar o hash do site em vez de anunciar uma "mudança"
+    que não aconteceu.
+    """
+    perfil = hash_profile(backend, region)
+    return f"{perfil}:{page_hash}" if perfil else page_hash
+
+
+def key_profile(stored: str) -> str:
+    """Perfil (ver `hash_profile`) que gerou um valor de state["html_monitor"]."""
+    prefixo, sep, _ = (stored or "").partition(":")
+    if sep and (prefixo in BACKENDS or prefixo.split("@", 1)[0] in BACKENDS):
+        return prefixo
+    return ""
+
+
+def site_backend(backend: str, selectors: Sequence[str]) -> str:
+    """
+    Backend para um site com seletores próprios.
+
+    O lxml só entende seletores CSS arbitrários com o pacote cssselect; sem ele,
+    um site com seletor além de `.classe`/`#id` usa html.parser.
+    """
+    if backend != "lxml" or importlib.util.find_spec("cssselect") is not None:
+        return backend
+    if all(_SIMPLE_SELECTOR.match(sel) for sel in selectors):
+        return backend
+    return "html.parser"
+
+
+def _add_link(out: Dict[str, str], href: Optional[str], text: str) -> None:
+    # Primeira ocorrência do href manda na ordem; o texto vem da primeira que tiver
+    # algum (o mesmo link costuma aparecer como imagem e como manchete).
+    href = (href or "").strip()
+    if not href or href.lower().startswith(_SKIP_HREF):
+        return
+    if href in out:
+        if not out[href] and text:
+            out[href] = text[:_MAX_ANCHOR_CHARS]
+        return
+    if len(out) < MAX_LINKS:
+        out[href] = text[:_MAX_ANCHOR_CHARS]
+
+
+def _clean_html_parser(
+    content: str, watch: Optional[str], ignore: Sequence[str]
+) -> Tuple[str, str, bool, List[Tuple[str, str]]]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    # get_text() é robusto a <title> vazio/aninhado (soup.title.string pode ser None)
+    title = soup.title.get_text(strip=True) if soup.title else ""
+
+    # Remove noise tags
+    for tag in soup(IGNORE_TAGS):
+        tag.decompose()
+
+    # Remove noise classes (Safe attempt)
+    for selector in list(IGNORE_SELECTORS) + list(ignore):
+        for match in soup.select(selector):
+            match.decompose()
+
+    # Get text content only (ignoring HTML structure changes)
+    regioes = soup.select(watch) if watch else [soup]
+    links: Dict[str, str] = {}
+    for regiao in regioes:
+        for a in regiao.select("a[href]"):
+            _add_link(links, a.get("href"), " ".join(a.get_text(separator=' ', strip=True).split()))
+    if watch:
+        text_content = " ".join(r.get_text(separator=' ', strip=True) for r in regioes)
+        return text_content, title, bool(regioes), list(links.items())
+    return soup.get_text(separator=' ', strip=True), title, True, list(links.items())
+
+
+def _clean_selectolax(
+    content: str, watch: Optional[str], ignore: Sequence[str]
+) -> Tuple[str, str, bool, List[Tuple[str, str]]]:
+    # Backend lexbor (selectolax >= 0.3); o antigo Modest foi removido no 1.0.
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(content)
+    titulo = tree.css_first("title")
+    title = " ".join(titulo.text().split()) if titulo is not None else ""
+    for selector in IGNORE_TAGS + IGNORE_SELECTORS + list(ignore):
+        for node in tree.css(selector):
+            node.decompose()
+    raiz = tree.root
+    regioes = tree.css(watch) if watch else ([raiz] if raiz is not None else [])
+    links: Dict[str, str] = {}
+    for regiao in regioes:
+        for a in regiao.css("a[href]"):
+            _add_link(links, a.attributes.get("href"), " ".join(a.text(separator=' ', strip=True).split()))
+    if watch:
+        text_content = " ".join(r.text(separator=' ', strip=True) for r in regioes)
+        return " ".join(text_content.split()), title, bool(regioes), list(links.items())
+    text_content = raiz.text(separator=' ', strip=True) if raiz is not None else ""
+    return " ".join(text_content.split()), title, True, list(links.items())
+
+
+def _lxml_xpath(selector: str) -> str:
+    # `.classe` e `#id` (tudo o que IGNORE_SELECTORS usa) sem depender do cssselect;
+    # o resto precisa dele (site_backend já desviou para html.parser se faltar).
+    m = _SIMPLE_SELECTOR.match(selector)
+    if not m:
+        from lxml.cssselect import CSSSelector
+
+        return CSSSelector(selector, translator="html").path
+    if m.group(1) == "#":
+        return f"//*[@id='{m.group(2)}']"
+    return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {m.group(2)} ')]"
+
+
+def _lxml_text(el) -> str:
+    # itertext em vez de text_content(): este cola o texto de blocos vizinhos
+    # ("発表</p><p>Segundo" → "発表Segundo"), o que mudaria o hash à toa.
+    return " ".join(" ".join(el.itertext()).split())
+
+
+def _clean_lxml(
+    content: str, watch: Optional[str], ignore: Sequence[str]
+) -> Tuple[str, str, bool, List[Tuple[str, str]]]:
+    import lxml.html
+
+    # Bytes: o lxml recusa str com declaração de encoding (<?xml encoding=...?>).
+    doc = lxml.html.document_fromstring(content.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+    title = " ".join((doc.findtext(".//title") or "").split())
+    for el in list(doc.iter(*IGNORE_TAGS)):
+        el.drop_tree()
+    for selector in list(IGNORE_SELECTORS) + list(ignore):
+        for el in doc.xpath(_lxml_xpath(selector)):
+            if el.getparent() is not None:
+                el.drop_tree()
+    regioes = doc.xpath(_lxml_xpath(watch)) if watch else [doc]
+    links: Dict[str, str] = {}
+    for regiao in regioes:
+        for a in regiao.iter("a"):
+            _add_link(links, a.get("href"), _lxml_text(a))
+    if watch:
+        return " ".join(_lxml_text(r) for r in regioes).strip(), title, bool(regioes), list(links.items())
+    return _lxml_text(doc), title, True, list(links.items())
+
+
+_CLEANERS = {
+    "selectolax": _clean_selectolax,
+    "lxml": _clean_lxml,
+    "html.parser": _clean_html_parser,
+}
+
+
+def clean_hash_links(
+    content: str,
+    backend: str = "html.parser",
+    watch_selector: Optional[str] = None,
+    ignore_selectors: Sequence[str] = (),
+) -> Tuple[str, str, int, float, List[Tuple[str, str]]]:
+    """
+    `clean_and_hash` + os links da região vigiada: (..., [(href, texto âncora)]).
+
+    Hrefs crus (relativos como vieram), sem âncoras/javascript:/mailto:, na ordem
+    da página e sem repetição, até MAX_LINKS. Mesma limpeza do hash: links
+    dentro de anúncios e widgets removidos não aparecem.
+    """
+    started = time.perf_counter()
+    cleaner = _CLEANERS.get(backend, _clean_html_parser)
+    text_content, title, casou, links = cleaner(content, watch_selector, ignore_selectors)
+    page_hash = hashlib.sha256(text_content.encode('utf-8')).hexdigest() if casou else ""
+    return title or "No Title", page_hash, len(text_content), time.perf_counter() - started, links
+
+
+def clean_and_hash(
+    content: str,
+    backend: str = "html.parser",
+    watch_selector: Optional[str] = None,
+    ignore_selectors: Sequence[str] = (),
+) -> Tuple[str, str, int, float]:
+    """
+    Limpa a página e devolve (título, hash sha256 do texto, tamanho do texto, segundos).
+
+    Tira IGNORE_TAGS, IGNORE_SELECTORS e os `ignore_selectors` do site e faz o
+    hash só do texto visível (mudança de estrutura HTML não conta como
+    novidade). Com `watch_selector`, só o texto das regiões que casam entra no
+    hash — banners e rankings fora delas deixam de contar. Região que não casa
+    com nada devolve hash "" (o seletor envelheceu; o site fica sem veredito).
+    Roda no processo worker; o hash é o cru — quem grava no estado aplica `hash_key`.
+    """
+    return clean_hash_links(content, backend, watch_selector, ignore_selectors)[:4]
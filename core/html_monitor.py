@@ -1,105 +1,194 @@
 """
 HTML Monitor - Detects changes in static websites (Official Gundam Sites).
 """
-import ssl
 import logging
-import hashlib
 import asyncio
-import httpx
+import hashlib
+import time
+from urllib.parse import urljoin, urldefrag
 
-import certifi
-from typing import List, Dict, Tuple, Any
-from bs4 import BeautifulSoup
+import aiohttp
+from typing import List, Dict, Tuple, Any, Optional, Sequence
 
-from settings import CLOUDFLARE_PROXY_URL, CLOUDFLARE_PROXY_SECRET, MAX_CONCURRENT_FEEDS
+from settings import MAX_CONCURRENT_FEEDS, HTML_MONITOR_PARSER, HTML_MONITOR_MAX_NEW_LINKS
 from utils.storage import p, load_json_safe, save_json_safe
 from utils.security import validate_url
+from utils.http_client import http_client
+from utils.cache import (
+    get_cache_headers, update_cache_state, body_fingerprint, fingerprint_matches, update_fingerprint,
+)
+from core.stats import stats
+from core.host_scheduler import host_scheduler
+from core.proxy_pool import proxy_pool
+from core.discovery import routes_for, savings, format_savings, sitemap_signature
+from core.html_clean import (  # noqa: F401 — IGNORE_* reexportados (nome histórico)
+    IGNORE_TAGS, IGNORE_SELECTORS, clean_hash_links, hash_key, hash_profile, key_profile,
+    region_signature, resolve_backend, site_backend,
+)
 
 log = logging.getLogger("MaftyIntel")
 
-# Tags to ignore during hash calculation (noise reduction)
-IGNORE_TAGS = ['script', 'style', 'meta', 'noscript', 'iframe', 'svg']
-# Classes/IDs often used for ads or dynamic widgets
-IGNORE_SELECTORS = ['.ad', '.advertisement', '.widget', '#clock', '.timestamp', '.cookie-consent']
+# Backend efetivo da limpeza (HTML_MONITOR_PARSER; "auto" = o mais rápido instalado).
+HTML_BACKEND = resolve_backend(HTML_MONITOR_PARSER)
+
+_HTML_TIMEOUT = aiohttp.ClientTimeout(total=30.0)
+
+# Impressão digital de cada link em state["html_monitor_links"] (mesmo tamanho
+# dos hashes curtos das marcas de água dos feeds): 12 caracteres por link.
+_LINK_DIGEST_BYTES = 6
+
+
+def link_digest(link: str) -> str:
+    """Hash curto de um link absoluto (o que fica guardado por site)."""
+    return hashlib.blake2b(link.encode("utf-8", "replace"), digest_size=_LINK_DIGEST_BYTES).hexdigest()
+
 
-async def fetch_page_hash(client: httpx.AsyncClient, url: str) -> tuple[str, str, str]:
+def _absolute_links(page_url: str, links: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    # Hrefs crus do parse → URLs absolutas http(s), sem fragmento e sem a própria página.
+    out: Dict[str, str] = {}
+    for href, text in links:
+        absoluto = urldefrag(urljoin(page_url, href)).url
+        if not absoluto.startswith(("http://", "https://")) or absoluto.rstrip("/") == page_url.rstrip("/"):
+            continue
+        if absoluto not in out or (not out[absoluto] and text):
+            out[absoluto] = text
+    return list(out.items())
+
+
+async def fetch_page_hash(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    last_hash: Optional[str] = None,
+    http_state: Optional[Dict[str, Dict[str, str]]] = None,
+    watch_selector: Optional[str] = None,
+    ignore_selectors: Sequence[str] = (),
+) -> tuple[str, str, str, Optional[List[Tuple[str, str]]]]:
     """
-    Fetches a page, cleans it, and returns (url, title, hash).
-    Returns (url, "", "") on failure.
+    Fetches a page, cleans it, and returns (url, title, hash, links).
+    Returns (url, "", "", None) on failure.
+
+    `links`: [(URL absoluta, texto âncora)] da região vigiada, ou None quando a
+    página não foi parseada. Com `last_hash` e `http_state`
+    (state["html_monitor_http"]): GET condicional (If-None-Match/If-Modified-Since)
+    e digest do corpo bruto. 304 ou corpo idêntico devolvem (url, "", last_hash,
+    None) sem parse — "nada mudou".
+    `watch_selector`/`ignore_selectors` (sources.json): só a região vigiada entra no hash.
     """
     try:
         # Validação de segurança: anti-SSRF
         is_valid, error_msg = validate_url(url)
         if not is_valid:
             log.warning(f"🔒 URL bloqueada por segurança no HTML Monitor: {url} - {error_msg}")
-            return url, "", ""
+            return url, "", "", None
         
-        # URL final para a requisição (pode ser via proxy)
-        request_url = url
-        if CLOUDFLARE_PROXY_URL:
-            request_url = f"{CLOUDFLARE_PROXY_URL}{url}"
-            log.debug(f"🛡️ [PROXY HTML] Usando worker para contornar firewall em: {url}")
+        # Rota escolhida no pool de proxies (direta se nenhum Worker estiver configurado)
+        route = proxy_pool.choose(url)
+        request_url = route.request_url(url)
+        if not route.direct:
+            log.debug(f"🛡️ [PROXY HTML] Usando worker {route.name} para contornar firewall em: {url}")
         else:
             log.debug(f"🌐 [HTML DIRETO] Baixando página: {url}")
+        # Segredo só do Worker escolhido, para ele não recusar a requisição.
+        req_headers = {**(headers or {}), **route.headers()}
+        backend = site_backend(HTML_BACKEND, [s for s in [watch_selector, *ignore_selectors] if s])
+        region = region_signature(watch_selector, ignore_selectors)
+        # Validadores só valem com um hash deste backend/região para comparar: sem
+        # ele (primeira ronda, /clean_state, troca de backend) a página vem inteira.
+        condicional = (
+            http_state is not None and bool(last_hash)
+            and key_profile(last_hash) == hash_profile(backend, region)
+        )
+        if condicional:
+            req_headers.update(get_cache_headers(url, http_state))
 
+        # Mesmo orçamento por host do fetcher de feeds: vários sites oficiais
+        # partilham domínio e um 429 aqui também vale para os feeds (e vice-versa).
+        if route.direct:
+            await host_scheduler.acquire(url)
         log.debug(f"🚀 [HTTP GET] Requisitando {request_url}")
-        resp = await client.get(request_url, follow_redirects=True)
-        log.debug(f"📥 [HTTP RESP] Status {resp.status_code} recebido de {url}")
-        if resp.status_code != 200:
-            if resp.status_code == 403:
-                log.warning(f"🚫 Acesso Negado HTML Monitor (403): O site '{url}' bloqueou o bot.")
-            elif resp.status_code == 404:
-                log.warning(f"👻 Não Encontrado HTML Monitor (404): O site '{url}' parece não existir mais.")
-            elif resp.status_code == 429:
-                log.warning(f"⏳ Rate Limit HTML Monitor (429): Servidor do site '{url}' pediu para aguardar.")
-            elif resp.status_code >= 500:
-                log.warning(f"🔥 Erro de Servidor HTML Monitor ({resp.status_code}): O site '{url}' está instável/caiu.")
-            else:
-                log.warning(f"⚠️ Erro HTTP HTML Monitor ({resp.status_code}): Falha ao acessar '{url}'.")
-            return url, "", ""
-        
-        content = resp.text
-        
-        # Parse and Clean
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Remove noise tags
-        for tag in soup(IGNORE_TAGS):
-            tag.decompose()
-        
-        # Remove noise classes (Safe attempt)
-        for selector in IGNORE_SELECTORS:
-            for match in soup.select(selector):
-                match.decompose()
-        
-        # Get text content only (ignoring HTML structure changes)
-        text_content = soup.get_text(separator=' ', strip=True)
-        log.debug(f"🧹 [PARSE HTML] HTML limpo para {url}. Tamanho do texto resultante: {len(text_content)} bytes")
+        pedido_em = time.monotonic()
+        observado = False
+        try:
+            async with session.get(request_url, headers=req_headers, timeout=_HTML_TIMEOUT) as resp:
+                proxy_pool.observe(route, url, resp.status, time.monotonic() - pedido_em)
+                observado = True
+                log.debug(f"📥 [HTTP RESP] Status {resp.status} recebido de {url}")
+                if route.direct:
+                    host_scheduler.observe(url, resp.status, resp.headers)
+                if resp.status == 304 and condicional:
+                    stats.html_not_modified_total += 1
+                    log.debug(f"📦 [CACHE HTML] 304 Not Modified: {url}")
+                    return url, "", last_hash, None
+                if resp.status != 200:
+                    if resp.status == 403:
+                        log.warning(f"🚫 Acesso Negado HTML Monitor (403): O site '{url}' bloqueou o bot.")
+                    elif resp.status == 404:
+                        log.warning(f"👻 Não Encontrado HTML Monitor (404): O site '{url}' parece não existir mais.")
+                    elif resp.status == 429:
+                        log.warning(f"⏳ Rate Limit HTML Monitor (429): Servidor do site '{url}' pediu para aguardar.")
+                    elif resp.status >= 500:
+                        log.warning(f"🔥 Erro de Servidor HTML Monitor ({resp.status}): O site '{url}' está instável/caiu.")
+                    else:
+                        log.warning(f"⚠️ Erro HTTP HTML Monitor ({resp.status}): Falha ao acessar '{url}'.")
+                    return url, "", "", None
+
+                body = await resp.read()
+                digest = body_fingerprint(body, strip_volatile=False)
+                if http_state is not None:
+                    update_cache_state(url, resp.headers, http_state)
+                if condicional and fingerprint_matches(url, digest, http_state):
+                    stats.html_digest_hits_total += 1
+                    log.debug(f"📦 [CACHE HTML] corpo idêntico ao anterior (sem parse): {url}")
+                    return url, "", last_hash, None
+                # text() decodifica o corpo já lido (charset do Content-Type ou detectado).
+                content = await resp.text(errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Sem resposta: falha da rota (Worker ou direta), não só do site.
+            if not observado:
+                proxy_pool.observe(route, url, None, time.monotonic() - pedido_em)
+            raise
         
-        # Hash calculation
-        page_hash = hashlib.sha256(text_content.encode('utf-8')).hexdigest()
-        # get_text() é robusto a <title> vazio/aninhado (soup.title.string pode ser None)
-        title = soup.title.get_text(strip=True) if soup.title else "No Title"
-        if not title:
-            title = "No Title"
+        # Limpeza + hash no pool de processos do parse: BeautifulSoup/select/get_text
+        # de 122 páginas no event loop chegavam a segurar o heartbeat do gateway.
+        # Import local: core.scanner importa este módulo (ciclo de import).
+        from core.scanner.parsepool import parse_pool
+        title, page_hash, tamanho, segundos, links = await parse_pool.run(
+            clean_hash_links, content, backend, watch_selector, list(ignore_selectors)
+        )
+        log.debug(
+            f"🧹 [PARSE HTML] {url} limpo com {backend} em {segundos * 1000:.0f} ms. "
+            f"Tamanho do texto resultante: {tamanho} caracteres, {len(links)} link(s)"
+        )
+        if not page_hash:
+            log.warning(
+                f"🎯 [HTML REGIÃO] watch_selector {watch_selector!r} não casou com nada em '{url}': "
+                f"o layout mudou? Site sem veredito até o seletor ser corrigido no sources.json."
+            )
+            return url, "", "", None
+        page_hash = hash_key(backend, page_hash, region)
         log.debug(f"🔐 [HASH] Hash gerado para {url}: {page_hash[:8]}...")
+        # Digest só depois do parse: um corpo que quebrou a limpeza não vira "igual".
+        if http_state is not None:
+            update_fingerprint(url, digest, http_state)
         
-        return url, title, page_hash
+        return url, title, page_hash, _absolute_links(url, links)
 
-    except httpx.RequestError as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         log.warning(f"🌐 Erro de conexão no HTML Monitor para '{url}': {e}")
-        return url, "", ""
+        return url, "", "", None
     except Exception as e:
         log.warning(f"⚠️ Erro inesperado no HTML Monitor para '{url}': {type(e).__name__}: {e}", exc_info=True)
-        return url, "", ""
+        return url, "", "", None
 
 
-def _html_monitor_urls_from_sources(sources: Dict[str, Any]) -> List[str]:
+def _html_monitor_sites_from_sources(sources: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    Extrai as URLs a vigiar de official_sites_reference_(not_rss) + official_sites.
+    Extrai os sites a vigiar de official_sites_reference_(not_rss) + official_sites.
 
     PROPÓSITO DE NEGÓCIO:
-        Define quais sites oficiais entram na ronda do HTML Watcher a cada varredura.
+        Define quais sites oficiais entram na ronda do HTML Watcher a cada varredura,
+        e que parte de cada página conta como "conteúdo".
 
     INVARIANTES DO DOMÍNIO:
         - Respeita "enabled": false, igual ao carregador de feeds RSS. Sem isto,
@@ -107,13 +196,19 @@ def _html_monitor_urls_from_sources(sources: Dict[str, Any]) -> List[str]:
           continuaria a ser batida a cada ciclo, poluindo o log com avisos que já
           foram diagnosticados.
         - Aceita tanto strings soltas quanto dicts com "url" (formato legado).
-        - Preserva a ordem de declaração e remove duplicados entre os dois blocos.
+        - Dicts podem trazer `watch_selector` (CSS da lista de notícias: só esse
+          trecho entra no hash) e `ignore_selectors` (lista de CSS a tirar antes,
+          somada a IGNORE_SELECTORS). Valores de tipo errado são ignorados.
+        - "name" e "discovery": false (fora da descoberta de feed/sitemap, ver
+          core/discovery.py) acompanham o site quando presentes.
+        - Preserva a ordem de declaração e remove duplicados entre os dois blocos
+          (vale a primeira declaração da URL).
 
     COMPORTAMENTO EM CASO DE FALHA:
         Não levanta exceção. Blocos ausentes ou de tipo inesperado são ignorados;
         no limite devolve lista vazia e `check_official_sites` sai sem fazer rede.
     """
-    out: List[str] = []
+    out: Dict[str, Dict[str, Any]] = {}
     for block in (
         sources.get("official_sites_reference_(not_rss)", []),
         sources.get("official_sites", []),
@@ -122,29 +217,143 @@ def _html_monitor_urls_from_sources(sources: Dict[str, Any]) -> List[str]:
             continue
         for item in block:
             if isinstance(item, str) and item.startswith("http"):
-                out.append(item.strip())
+                out.setdefault(item.strip(), {"url": item.strip()})
             elif isinstance(item, dict) and item.get("url"):
                 if item.get("enabled") is False:
                     continue
                 u = item["url"]
-                if isinstance(u, str) and u.startswith("http"):
-                    out.append(u.strip())
-    return list(dict.fromkeys(out))
+                if not (isinstance(u, str) and u.startswith("http")):
+                    continue
+                site: Dict[str, Any] = {"url": u.strip()}
+                if isinstance(item.get("name"), str) and item["name"].strip():
+                    site["name"] = item["name"].strip()
+                if item.get("discovery") is False:
+                    site["discovery"] = False
+                watch = item.get("watch_selector")
+                if isinstance(watch, str) and watch.strip():
+                    site["watch_selector"] = watch.strip()
+                ignore = item.get("ignore_selectors")
+                if isinstance(ignore, list):
+                    extras = [sel.strip() for sel in ignore if isinstance(sel, str) and sel.strip()]
+                    if extras:
+                        site["ignore_selectors"] = extras
+                out.setdefault(site["url"], site)
+    return list(out.values())
+
+
+def _html_monitor_urls_from_sources(sources: Dict[str, Any]) -> List[str]:
+    """Só as URLs de `_html_monitor_sites_from_sources`, na mesma ordem."""
+    return [site["url"] for site in _html_monitor_sites_from_sources(sources)]
+
+
+async def _sitemap_now(
+    session: aiohttp.ClientSession,
+    site_url: str,
+    sitemap_url: str,
+    http_state: Dict[str, Dict[str, str]],
+    headers: Optional[Dict[str, str]] = None,
+) -> Optional[str]:
+    """
+    Assinatura atual do sitemap na área do site (ver core.discovery.sitemap_signature).
+
+    A assinatura do último 200 fica junto dos validadores do sitemap e é a
+    resposta de um 304 — não a da última página processada, senão uma mudança
+    vista numa ronda em que a página falhou se perderia. None = não deu para
+    saber (rede, HTTP, sitemap que deixou de cobrir o site): a página é baixada.
+    """
+    is_valid, _ = validate_url(sitemap_url)
+    if not is_valid:
+        return None
+    try:
+        await host_scheduler.acquire(sitemap_url)
+        req_headers = {**(headers or {}), **get_cache_headers(sitemap_url, http_state)}
+        async with session.get(sitemap_url, headers=req_headers, timeout=_HTML_TIMEOUT) as resp:
+            host_scheduler.observe(sitemap_url, resp.status, resp.headers)
+            if resp.status == 304:
+                return http_state.get(sitemap_url, {}).get("sitemap_sig") or None
+            if resp.status != 200:
+                return None
+            body = await resp.read()
+            update_cache_state(sitemap_url, resp.headers, http_state)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        log.debug(f"🗺️ [SITEMAP] Falha ao buscar {sitemap_url}: {e}")
+        return None
+    from core.scanner.parsepool import parse_pool
+    assinatura, _, _, _ = await parse_pool.run(sitemap_signature, body, site_url)
+    http_state.setdefault(sitemap_url, {})["sitemap_sig"] = assinatura
+    return assinatura or None
+
+
+def _new_link_items(
+    url: str, title: str, links: List[Tuple[str, str]], seen: Sequence[str]
+) -> List[Dict[str, str]]:
+    # Links que não estavam na página da ronda anterior; sem texto âncora não há
+    # manchete para postar (imagem solta, ícone), então ficam de fora.
+    vistos = set(seen)
+    return [
+        {
+            "title": texto,
+            "link": link,
+            "summary": f"New on the official site {title}.",
+            "site": url,
+        }
+        for link, texto in links
+        if texto and link_digest(link) not in vistos
+    ]
 
 
-async def check_official_sites(current_state: Dict[str, str]) -> Tuple[List[Dict[str, str]], Dict[str, str]]:
+async def check_official_sites(
+    current_state: Dict[str, str],
+    http_state: Optional[Dict[str, Dict[str, str]]] = None,
+    links_state: Optional[Dict[str, List[str]]] = None,
+) -> Tuple[List[Dict[str, str]], Dict[str, str]]:
     """
     Checks official sites for changes with concurrency limiting.
+
+    PROPÓSITO DE NEGÓCIO:
+        Um hash que mudou dizia só "o site mudou": um embed "🔄 Update" genérico
+        por guild, e o cooldown por site escondia um segundo anúncio real. Com os
+        links da região vigiada guardados da ronda anterior, a mudança vira um item
+        por manchete nova (texto âncora + link do artigo), que o engine entrega
+        pelo mesmo caminho dos feeds (classify_intel, dedup, history).
+
+    INVARIANTES DO DOMÍNIO:
+        - Item de link leva "site" (URL da página vigiada); o "🔄 Update" genérico
+          não leva, e só ele passa pelo cooldown do engine.
+        - Hash mudou sem link novo (texto editado, contador) não gera post.
+        - O genérico continua para site sem links extraíveis, sem conjunto da
+          ronda anterior (primeira mudança depois da atualização) ou com mais de
+          HTML_MONITOR_MAX_NEW_LINKS links novos de uma vez (redesenho do site).
+        - Inicialização e troca de perfil do hash só guardam hash e links.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Site que falha (rede, HTTP, região que não casou) fica com hash e links
+        da ronda anterior; uma exceção isolada não derruba os demais.
+
     Args:
         current_state: Dict {url: last_hash}
+        http_state: state["html_monitor_http"] — ETag/Last-Modified/digest por
+            site, atualizado in-place (None = sem GET condicional)
+        links_state: state["html_monitor_links"] — {url: [link_digest]} da
+            última página parseada, atualizado in-place (None = só o "🔄 Update")
     Returns:
         (updates_list, new_state)
     """
     sources = load_json_safe(p("sources.json"), {})
-    urls = _html_monitor_urls_from_sources(sources if isinstance(sources, dict) else {})
+    sites = _html_monitor_sites_from_sources(sources if isinstance(sources, dict) else {})
+    # Overlay da descoberta (sources.discovered.json): site com feed sai daqui e
+    # vai para o fetcher de feeds; site com sitemap só é baixado quando ele muda.
+    routes = routes_for(sites)
+    pelo_feed = {url for url, route in routes.items() if route.get("feed")}
+    sites = [site for site in sites if site["url"] not in pelo_feed]
+    sitemaps = {url: route["sitemap"] for url, route in routes.items() if route.get("sitemap")}
+    urls = [site["url"] for site in sites]
+
+    if routes:
+        log.info(f"🧭 [DESCOBERTA] {format_savings(savings(routes))} (estimativa medida na descoberta).")
 
     if not urls:
-        return [], current_state
+        return [], {url: h for url, h in current_state.items() if url not in pelo_feed}
 
     # Headers: imitando navegador moderno
     headers = {
@@ -156,50 +365,110 @@ async def check_official_sites(current_state: Dict[str, str]) -> Tuple[List[Dict
         "Sec-Fetch-Site": "none",
         "Upgrade-Insecure-Requests": "1"
     }
-    # O monitor roteia via proxy quando CLOUDFLARE_PROXY_URL está definido; envia o
-    # segredo compartilhado (se houver) para o Worker não recusar a requisição.
-    if CLOUDFLARE_PROXY_URL and CLOUDFLARE_PROXY_SECRET:
-        headers["X-Proxy-Secret"] = CLOUDFLARE_PROXY_SECRET
+    # O segredo de cada Worker entra por pedido, em fetch_page_hash, conforme a
+    # rota escolhida no pool de proxies.
 
     updates = []
     new_state = current_state.copy()
     
     semaphore = asyncio.Semaphore(MAX_CONCURRENT_FEEDS)
 
-    async with httpx.AsyncClient(headers=headers, timeout=30.0, verify=certifi.where()) as client:
-        async def throttled_fetch(url):
-            async with semaphore:
-                # O monitor de HTML já é lento por natureza, o semáforo aqui é crucial
-                return await fetch_page_hash(client, url)
-
-        tasks = [throttled_fetch(url) for url in urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    session = http_client.session()
 
-        for result in results:
-            # return_exceptions=True: uma falha isolada não derruba o monitor inteiro
-            if isinstance(result, Exception):
-                log.warning(f"⚠️ Falha não tratada no HTML Monitor: {type(result).__name__}: {result}")
-                continue
-            url, title, page_hash = result
-            if not page_hash:
-                continue
-                
+    async def throttled_fetch(site):
+        async with semaphore:
+            url = site["url"]
             last_hash = current_state.get(url)
-            
-            # If no last hash (first run), just save it
-            if not last_hash:
-                new_state[url] = page_hash
-                log.info(f"HTML Monitor: Initialized hash for {url}")
+            # Vigia pelo sitemap: mesma assinatura da última página processada =
+            # nada novo na área do site, sem baixar nem parsear a página.
+            assinatura = None
+            if url in sitemaps and http_state is not None:
+                assinatura = await _sitemap_now(session, url, sitemaps[url], http_state, headers)
+                if last_hash and assinatura and assinatura == http_state.get(url, {}).get("sitemap_sig"):
+                    stats.html_sitemap_unchanged_total += 1
+                    log.debug(f"🗺️ [SITEMAP] Sem mudança na área de {url}: página não baixada.")
+                    return url, "", last_hash, None
+            # O monitor de HTML já é lento por natureza, o semáforo aqui é crucial
+            result = await fetch_page_hash(
+                session, url, headers,
+                last_hash=last_hash, http_state=http_state,
+                watch_selector=site.get("watch_selector"),
+                ignore_selectors=site.get("ignore_selectors", ()),
+            )
+            # A assinatura só vale depois de a página ser processada: uma falha
+            # agora tem de ser re-tentada na próxima ronda, com o sitemap igual.
+            if assinatura and result[2]:
+                http_state.setdefault(url, {})["sitemap_sig"] = assinatura
+            return result
+
+    tasks = [throttled_fetch(site) for site in sites]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Validadores e links de sites que saíram do sources.json (ou foram para o
+    # fetcher de feeds) não servem para nada; os dos sitemaps vigiados ficam.
+    manter = set(urls) | set(sitemaps.values())
+    for per_site in (http_state, links_state):
+        if per_site is not None:
+            for url in set(per_site) - manter:
+                del per_site[url]
+    for url in pelo_feed:
+        new_state.pop(url, None)
+
+    for result in results:
+        # return_exceptions=True: uma falha isolada não derruba o monitor inteiro
+        if isinstance(result, Exception):
+            log.warning(f"⚠️ Falha não tratada no HTML Monitor: {type(result).__name__}: {result}")
+            continue
+        url, title, page_hash, links = result
+        if not page_hash:
+            continue
+
+        last_hash = current_state.get(url)
+        seen = None
+        if links_state is not None and links is not None:
+            # Conjunto da página de agora substitui o anterior: link que sai e
+            # volta (carrossel) é barrado pelo dedup/history, não por aqui.
+            seen = links_state.get(url)
+            links_state[url] = [link_digest(link) for link, _ in links]
+        
+        # If no last hash (first run), just save it
+        if not last_hash:
+            new_state[url] = page_hash
+            log.info(f"HTML Monitor: Initialized hash for {url}")
+            continue
+        
+        # Backend ou região trocados (HTML_MONITOR_PARSER, lxml instalado,
+        # watch_selector novo…): o texto extraído é outro, então o hash novo só
+        # substitui o antigo, sem anunciar.
+        if key_profile(last_hash) != key_profile(page_hash):
+            new_state[url] = page_hash
+            log.info(
+                f"HTML Monitor: Re-initialized hash for {url} "
+                f"({key_profile(last_hash) or 'html.parser'} → {key_profile(page_hash) or 'html.parser'})"
+            )
+            continue
+
+        # If hash changed, it's an update!
+        if page_hash != last_hash:
+            new_state[url] = page_hash
+            novos = _new_link_items(url, title, links, seen) if isinstance(seen, list) and links else None
+            if novos is not None and len(novos) <= HTML_MONITOR_MAX_NEW_LINKS:
+                if novos:
+                    log.info(f"HTML Monitor: CHANGE DETECTED in {url} — {len(novos)} link(s) novo(s)")
+                    updates.extend(novos)
+                else:
+                    log.info(f"HTML Monitor: {url} mudou sem link novo na região vigiada (nada a postar)")
                 continue
-            
-            # If hash changed, it's an update!
-            if page_hash != last_hash:
-                log.info(f"HTML Monitor: CHANGE DETECTED in {url}")
-                updates.append({
-                    "title": f"🔄 Update: {title}",
-                    "link": url,
-                    "summary": "Official site content has changed. Please check for new announcements."
-                })
-                new_state[url] = page_hash
+            if novos:
+                log.warning(
+                    f"🧭 [HTML LINKS] {len(novos)} links novos de uma vez em '{url}' "
+                    f"(teto {HTML_MONITOR_MAX_NEW_LINKS}): redesenho? Aviso genérico no lugar das manchetes."
+                )
+            log.info(f"HTML Monitor: CHANGE DETECTED in {url}")
+            updates.append({
+                "title": f"🔄 Update: {title}",
+                "link": url,
+                "summary": "Official site content has changed. Please check for new announcements."
+            })
     
     return updates, new_state
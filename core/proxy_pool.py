@@ -0,0 +1,216 @@
+"""
+Proxy pool - Vários Workers (cada um com o seu segredo) e a rota direta, escolhidos por pedido.
+"""
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from settings import (
+    CLOUDFLARE_PROXY_URL,
+    CLOUDFLARE_PROXY_SECRET,
+    CLOUDFLARE_PROXY_URLS,
+    PROXY_POOL_DIRECT_ROUTE,
+    PROXY_EJECT_AFTER,
+    PROXY_EJECT_SEC,
+    PROXY_EJECT_MAX_SEC,
+)
+from core.host_scheduler import host_scheduler
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+DIRECT = "direto"
+
+# Peso do pedido mais recente nas médias móveis (EWMA) de cada rota.
+_ALPHA = 0.3
+# Piso da taxa de sucesso no custo: uma rota que só falha fica cara, não infinita.
+_MIN_SUCCESS = 0.05
+# A cada N escolhas, uma vai para a rota saudável usada há mais tempo: sem isto,
+# um Worker que se recuperou nunca mais seria medido.
+_EXPLORE_EVERY = 20
+
+
+class ProxyRoute:
+    """Uma saída: um Worker (prefixo + segredo) ou a rota direta (sem prefixo)."""
+
+    def __init__(self, name: str, prefix: str = "", secret: str = ""):
+        self.name = name
+        self.prefix = prefix
+        self.secret = secret
+        self.latency: Optional[float] = None  # EWMA em segundos
+        self.error_rate = 0.0                 # EWMA de 0/1 (falhas da rota)
+        self.requests = 0
+        self.failures = 0
+        self.streak = 0                       # falhas seguidas da rota
+        self.ejected_until = 0.0              # time.monotonic()
+        self.ejections = 0                    # reincidências desde o último sucesso
+        self.times_ejected = 0
+        self.last_used = 0.0
+        self.hosts: Dict[str, float] = {}     # EWMA de sucesso por host de destino
+
+    @property
+    def direct(self) -> bool:
+        return not self.prefix
+
+    def request_url(self, url: str) -> str:
+        return f"{self.prefix}{url}" if self.prefix else url
+
+    def headers(self) -> Dict[str, str]:
+        """Segredo do Worker; nunca vai na rota direta (não vaza para a origem)."""
+        if self.prefix and self.secret:
+            return {"X-Proxy-Secret": self.secret}
+        return {}
+
+    def cost(self, host: Optional[str]) -> float:
+        """Latência esperada ÷ chance de sucesso no host; rota nunca medida custa 0."""
+        if self.latency is None:
+            return 0.0
+        sucesso = (1.0 - self.error_rate) * self.hosts.get(host or "", 1.0)
+        return self.latency / max(_MIN_SUCCESS, sucesso)
+
+
+def parse_routes(spec: str, default_url: str = "", default_secret: str = "") -> List[ProxyRoute]:
+    """
+    Workers de CLOUDFLARE_PROXY_URLS (`url` ou `url|segredo`, separados por vírgula).
+
+    Vazio: só `default_url` (CLOUDFLARE_PROXY_URL), como antes do pool. Entrada sem
+    segredo próprio usa `default_secret`. O nome da rota é o host do Worker (o
+    segredo nunca aparece em log nem em /status).
+    """
+    entradas = [e.strip() for e in (spec or "").split(",") if e.strip()]
+    if not entradas and default_url:
+        entradas = [default_url]
+    rotas: List[ProxyRoute] = []
+    nomes: Dict[str, int] = {}
+    for entrada in entradas:
+        prefixo, _, segredo = entrada.partition("|")
+        prefixo = prefixo.strip()
+        if not prefixo.startswith("http"):
+            log.warning(f"⚠️ [PROXY POOL] Entrada ignorada (não é URL http/https): {prefixo[:40]!r}")
+            continue
+        nome = urlparse(prefixo).hostname or f"proxy-{len(rotas) + 1}"
+        nomes[nome] = nomes.get(nome, 0) + 1
+        if nomes[nome] > 1:
+            nome = f"{nome}#{nomes[nome]}"
+        rotas.append(ProxyRoute(nome, prefixo, segredo.strip() or default_secret))
+    return rotas
+
+
+class ProxyPool:
+    """
+    Escolhe, pedido a pedido, por onde sai cada requisição que pede proxy.
+
+    PROPÓSITO DE NEGÓCIO:
+        Um só CLOUDFLARE_PROXY_URL levava todos os feeds de _PROXY_CANDIDATE_DOMAINS
+        e todo o HTML Monitor: um Worker lento ou estrangulado pela Cloudflare
+        atrasava tudo o que passava por ele. Com vários Workers, o tráfego vai
+        para o que está respondendo melhor PARA AQUELE HOST, e o que adoece sai
+        da escolha sozinho por um tempo.
+
+    INVARIANTES DO DOMÍNIO:
+        - Pedido que não quer proxy vai sempre pela direta (e pelo HostScheduler).
+        - Pedido que quer proxy vai pela rota de menor custo: latência EWMA ÷
+          ((1 − taxa de erro da rota) × sucesso EWMA da rota naquele host). Rota
+          nunca medida custa 0 (é experimentada primeiro); empate fica com a
+          ordem de CLOUDFLARE_PROXY_URLS. A cada _EXPLORE_EVERY escolhas, a rota
+          saudável usada há mais tempo é remedida.
+        - Falha da ROTA: exceção (timeout, conexão) ou 5xx. 403/429/404 são do
+          destino: pesam só no sucesso daquele host naquela rota.
+        - PROXY_EJECT_AFTER falhas seguidas ejetam o Worker por PROXY_EJECT_SEC,
+          dobrando a cada reincidência até PROXY_EJECT_MAX_SEC; um sucesso zera.
+        - A direta nunca é ejetada: com todos os Workers fora, é ela que responde.
+          Só concorre com os Workers se PROXY_POOL_DIRECT_ROUTE estiver ligado.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Não levanta exceção. Sem Workers configurados, tudo sai pela direta — o
+        comportamento de CLOUDFLARE_PROXY_URL vazio.
+    """
+
+    def __init__(self, routes: List[ProxyRoute], direct_competes: bool = False):
+        self.proxies = list(routes)
+        self.direct_route = ProxyRoute(DIRECT)
+        self.direct_competes = direct_competes
+        self._choices = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.proxies)
+
+    def choose(self, url: str, proxied: bool = True, now: Optional[float] = None) -> ProxyRoute:
+        """Rota para este pedido; `proxied=False` é sempre a direta."""
+        if not proxied or not self.proxies:
+            return self.direct_route
+        now = time.monotonic() if now is None else now
+        candidatas = [r for r in self.proxies if r.ejected_until <= now]
+        if self.direct_competes or not candidatas:
+            candidatas.append(self.direct_route)
+        host = host_scheduler.host_key(url)
+        self._choices += 1
+        if len(candidatas) > 1 and self._choices % _EXPLORE_EVERY == 0:
+            rota = min(candidatas, key=lambda r: r.last_used)
+        else:
+            rota = min(candidatas, key=lambda r: r.cost(host))
+        rota.last_used = now
+        return rota
+
+    def observe(
+        self,
+        route: ProxyRoute,
+        url: str,
+        status: Optional[int],
+        seconds: float,
+        now: Optional[float] = None,
+    ) -> None:
+        """Aprende com o pedido: `status` None = exceção (timeout, conexão)."""
+        now = time.monotonic() if now is None else now
+        falhou_rota = status is None or status >= 500
+        route.requests += 1
+        route.error_rate = (1 - _ALPHA) * route.error_rate + _ALPHA * (1.0 if falhou_rota else 0.0)
+        route.latency = seconds if route.latency is None else (1 - _ALPHA) * route.latency + _ALPHA * seconds
+        host = host_scheduler.host_key(url) or ""
+        ok_host = 1.0 if status is not None and status < 400 else 0.0
+        route.hosts[host] = (1 - _ALPHA) * route.hosts.get(host, 1.0) + _ALPHA * ok_host
+
+        if not falhou_rota:
+            route.streak = 0
+            route.ejections = 0
+            return
+        route.failures += 1
+        route.streak += 1
+        if route.direct or route.streak < PROXY_EJECT_AFTER:
+            return
+        janela = min(PROXY_EJECT_SEC * (2 ** route.ejections), PROXY_EJECT_MAX_SEC)
+        route.ejections += 1
+        route.times_ejected += 1
+        route.streak = 0
+        route.ejected_until = now + janela
+        log.warning(
+            f"🚫 [PROXY POOL] {route.name} ejetado por {janela:.0f}s após {PROXY_EJECT_AFTER} "
+            f"falha(s) seguida(s) (última: {'exceção' if status is None else f'HTTP {status}'})."
+        )
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        rotas = []
+        for r in self.proxies + [self.direct_route]:
+            rotas.append({
+                "route": r.name,
+                "kind": "direct" if r.direct else "proxy",
+                "requests": r.requests,
+                "failures": r.failures,
+                "error_rate": round(r.error_rate, 3),
+                "latency_ms": None if r.latency is None else round(r.latency * 1000),
+                "ejected_for_sec": round(max(0.0, r.ejected_until - now)),
+                "ejections": r.times_ejected,
+                "hosts": len(r.hosts),
+            })
+        return {
+            "routes": rotas,
+            "ejected": sum(1 for r in self.proxies if r.ejected_until > now),
+        }
+
+
+proxy_pool = ProxyPool(
+    parse_routes(CLOUDFLARE_PROXY_URLS, CLOUDFLARE_PROXY_URL, CLOUDFLARE_PROXY_SECRET),
+    direct_competes=PROXY_POOL_DIRECT_ROUTE,
+)
@@ -0,0 +1,133 @@
+"""
+Breaker module - Disjuntor por fonte: quarentena automática de feeds que falham sempre.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from settings import (
+    FEED_BREAKER_THRESHOLD,
+    FEED_BREAKER_PROBE_MIN,
+    FEED_BREAKER_PROBE_MAX_HOURS,
+)
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+# Meio-aberto não é persistido: é a rodada em que a fonte aberta vai como sonda.
+CLOSED = "closed"  # busca normal; conta falhas seguidas
+OPEN = "open"      # em quarentena: fora das buscas até a próxima sonda
+
+
+def _num(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _probe_backoff_sec(opened_times: int) -> float:
+    """Janela entre sondas: base, 2×base, 4×base… até o teto."""
+    return min(
+        FEED_BREAKER_PROBE_MIN * 60.0 * (2 ** max(0, opened_times - 1)),
+        FEED_BREAKER_PROBE_MAX_HOURS * 3600.0,
+    )
+
+
+def split_by_breaker(
+    sources: List[Dict[str, Any]], breakers: Any, now: float
+) -> Tuple[List[Dict[str, Any]], Set[str], List[str]]:
+    """
+    (fontes a buscar, URLs que vão como sonda, URLs puladas em quarentena).
+
+    Fonte com disjuntor aberto só entra quando a janela de sonda venceu — e aí
+    como sonda barata (uma tentativa por URL, sem pausas de retentativa).
+    """
+    table = breakers if isinstance(breakers, dict) else {}
+    buscar: List[Dict[str, Any]] = []
+    sondas: Set[str] = set()
+    puladas: List[str] = []
+    for src in sources:
+        item = table.get(src["url"])
+        if not isinstance(item, dict) or item.get("state") != OPEN:
+            buscar.append(src)
+        elif _num(item.get("next_probe_at")) <= now:
+            buscar.append(src)
+            sondas.add(src["url"])
+        else:
+            puladas.append(src["url"])
+    return buscar, sondas, puladas
+
+
+def update_breakers(
+    breakers: Any,
+    attempted: Iterable[str],
+    failed: Set[str],
+    now: float,
+    keep: Optional[Set[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Novo estado dos disjuntores (state["breakers"]) depois de uma rodada.
+
+    PROPÓSITO DE NEGÓCIO:
+        Fontes mortas (NXDOMAIN, TLS quebrado) gastavam o orçamento inteiro de
+        retentativas e fallbacks em toda varredura até alguém pôr "enabled": false
+        à mão — foi assim na auditoria de 2026-08-01 do sources.json. O disjuntor
+        tira-as das buscas sozinho e as devolve quando voltarem a responder.
+
+    INVARIANTES DO DOMÍNIO:
+        - Fechado: cada rodada em que a fonte falhou (principal + fallbacks) soma
+          1; uma resposta (200 ou 304) zera. FEED_BREAKER_THRESHOLD falhas
+          seguidas abrem o disjuntor — com UMA mensagem de quarentena no log.
+        - Aberto: fora das buscas até `next_probe_at`; aí vai uma sonda. Sonda que
+          falha dobra a janela (FEED_BREAKER_PROBE_MIN … FEED_BREAKER_PROBE_MAX_HOURS)
+          sem repetir a mensagem; sonda que responde fecha o disjuntor.
+        - Fonte fechada e sem falhas não ocupa espaço na tabela.
+        - Cada item: {"state", "failures", "opened_at", "next_probe_at",
+          "opened_times", "last_failure_at"}.
+        - keep: todas as fontes do sources.json; as que saíram dele (ou ganharam
+          "enabled": false) são descartadas e deixam de aparecer em quarentena.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Não levanta exceção. Tabela persistida corrompida é tratada como vazia.
+    """
+    old = breakers if isinstance(breakers, dict) else {}
+    new = {url: dict(item) for url, item in old.items() if isinstance(item, dict)}
+    if keep is not None:
+        new = {url: item for url, item in new.items() if url in keep}
+    for url in attempted:
+        item = new.get(url)
+        if url not in failed:
+            if item and item.get("state") == OPEN:
+                log.info(f"✅ [QUARENTENA] {url} respondeu à sonda: volta às buscas normais.")
+            new.pop(url, None)
+            continue
+        item = item or {"state": CLOSED, "failures": 0, "opened_times": 0}
+        item["failures"] = int(_num(item.get("failures"))) + 1
+        item["last_failure_at"] = now
+        if item.get("state") == OPEN:
+            # Sonda falhou: janela dobra, sem nova mensagem de quarentena.
+            item["opened_times"] = int(_num(item.get("opened_times"), 1)) + 1
+            item["next_probe_at"] = now + _probe_backoff_sec(item["opened_times"])
+        elif item["failures"] >= FEED_BREAKER_THRESHOLD:
+            item["state"] = OPEN
+            item["opened_at"] = now
+            item["opened_times"] = 1
+            janela = _probe_backoff_sec(1)
+            item["next_probe_at"] = now + janela
+            log.warning(
+                f"🚧 [QUARENTENA] {url} falhou em {item['failures']} rodadas seguidas: fora das "
+                f"buscas; uma sonda a cada {janela / 60:.0f} min (dobrando até "
+                f"{FEED_BREAKER_PROBE_MAX_HOURS:.0f}h). Se for definitivo, marque "
+                f'"enabled": false no sources.json.'
+            )
+        new[url] = item
+    return new
+
+
+def quarantined(breakers: Any) -> List[Tuple[str, Dict[str, Any]]]:
+    """Fontes em quarentena, da próxima sonda mais próxima para a mais distante."""
+    table = breakers if isinstance(breakers, dict) else {}
+    abertas = [
+        (url, item) for url, item in table.items()
+        if isinstance(item, dict) and item.get("state") == OPEN
+    ]
+    return sorted(abertas, key=lambda t: _num(t[1].get("next_probe_at")))
@@ -0,0 +1,122 @@
+"""
+Cadence module - Intervalo de busca aprendido por fonte e lotes de fontes vencidas.
+"""
+import logging
+from typing import Any, Dict, List, Mapping, Tuple
+
+from settings import (
+    LOOP_MINUTES,
+    FEED_CADENCE_MIN_MIN,
+    FEED_CADENCE_MAX_MIN,
+)
+
+from .lanes import source_lane
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+# Resultado de uma fonte numa rodada, como o engine o classifica.
+CHANGED = "changed"      # trouxe entrada nova (além da marca de água)
+UNCHANGED = "unchanged"  # 304, corpo idêntico ou só entradas já vistas
+FAILED = "failed"        # principal + fallbacks falharam (a pista de retentativa cuida)
+
+# Trouxe novidade: o intervalo cai pela metade. Nada novo: cresce 25% — sobe devagar
+# para uma fonte quente não virar fria por uma tarde parada.
+_SHRINK = 0.5
+_GROW = 1.25
+
+
+def _minutes(metadata: Mapping[str, Any], key: str, default: float) -> float:
+    raw = metadata.get(key)
+    if raw is None:
+        return default
+    try:
+        return max(1.0, float(raw))
+    except (TypeError, ValueError):
+        return default
+
+
+def source_bounds(metadata: Mapping[str, Any]) -> Tuple[float, float]:
+    """(mínimo, máximo) em segundos: "min_interval_min"/"max_interval_min" da fonte ou os de settings."""
+    low = _minutes(metadata, "min_interval_min", FEED_CADENCE_MIN_MIN)
+    high = _minutes(metadata, "max_interval_min", FEED_CADENCE_MAX_MIN)
+    return low * 60.0, max(low, high) * 60.0
+
+
+def update_cadence(
+    cadence: Any,
+    outcomes: Mapping[str, str],
+    metadata_by_url: Mapping[str, Mapping[str, Any]],
+    now: float,
+    prune: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Nova tabela de cadência (state["source_cadence"]) depois de uma rodada.
+
+    PROPÓSITO DE NEGÓCIO:
+        O Gundam Info e os canais do YouTube mudam várias vezes por dia; boa parte
+        dos blogs muda uma vez por mês. Com um só LOOP_MINUTES, os primeiros
+        esperavam até 12h para postar e os segundos eram baixados à toa. Cada fonte
+        passa a ter o seu intervalo, aprendido do que ela devolve.
+
+    INVARIANTES DO DOMÍNIO:
+        - Fonte nova começa em LOOP_MINUTES (dentro dos limites dela).
+        - CHANGED: intervalo × 0.5; UNCHANGED: × 1.25; sempre em [mín, máx] da fonte
+          (ver `source_bounds`) — limites mudados no sources.json valem na hora.
+        - FAILED não mexe no intervalo: a falha diz nada sobre a frequência de
+          publicação. A próxima vez é adiada pelo intervalo atual; quem re-tenta
+          antes é a pista de retentativa.
+        - Cada item: {"interval" (s), "next_due" (epoch), "last_change" (epoch|None),
+          "changes", "checks"}.
+        - prune=True descarta fontes que saíram do sources.json.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Não levanta exceção. Tabela persistida corrompida é tratada como vazia.
+    """
+    old = cadence if isinstance(cadence, dict) else {}
+    new = {url: dict(item) for url, item in old.items() if isinstance(item, dict)}
+    if prune:
+        new = {url: item for url, item in new.items() if url in metadata_by_url}
+
+    for url, outcome in outcomes.items():
+        low, high = source_bounds(metadata_by_url.get(url, {}))
+        item = new.setdefault(url, {"changes": 0, "checks": 0, "last_change": None})
+        try:
+            interval = float(item.get("interval", LOOP_MINUTES * 60.0))
+        except (TypeError, ValueError):
+            interval = LOOP_MINUTES * 60.0
+        if outcome == CHANGED:
+            interval *= _SHRINK
+            item["changes"] = int(item.get("changes", 0) or 0) + 1
+            item["last_change"] = now
+        elif outcome == UNCHANGED:
+            interval *= _GROW
+        interval = max(low, min(interval, high))
+        item["interval"] = round(interval, 1)
+        item["next_due"] = now + interval
+        item["checks"] = int(item.get("checks", 0) or 0) + 1
+    return new
+
+
+def due_sources(
+    sources: List[Dict[str, Any]], cadence: Any, now: float, limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Fontes vencidas, até `limit`: pista de prioridade mais alta primeiro e, dentro
+    dela, as mais atrasadas.
+
+    Fonte sem registro na tabela (nova ou tabela limpa) está vencida desde sempre.
+    O resto fica vencido para o próximo lote: o scanner anda em lotes pequenos e
+    contínuos em vez de um pico com todas as fontes.
+    """
+    table = cadence if isinstance(cadence, dict) else {}
+    vencidas = []
+    for i, src in enumerate(sources):
+        item = table.get(src["url"])
+        try:
+            next_due = float(item.get("next_due", 0)) if isinstance(item, dict) else 0.0
+        except (TypeError, ValueError):
+            next_due = 0.0
+        if next_due <= now:
+            vencidas.append((source_lane(src), next_due, i, src))
+    vencidas.sort(key=lambda t: t[:3])
+    return [t[3] for t in vencidas[:max(1, limit)]]
@@ -0,0 +1,193 @@
+"""
+Concurrency module - Limite adaptativo (AIMD) de buscas simultâneas de feeds.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Tuple
+
+from settings import (
+    MAX_CONCURRENT_FEEDS,
+    FEED_CONCURRENCY_MIN,
+    FEED_CONCURRENCY_MAX,
+    FEED_LATENCY_TARGET_SEC,
+    FEED_PRIORITY_RESERVED_SLOTS,
+)
+
+from .logutil import scan_verbose
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+
+class AdaptiveConcurrency:
+    """
+    Semáforo cujo tamanho é ajustado pelas respostas: aumento aditivo, corte multiplicativo.
+
+    PROPÓSITO DE NEGÓCIO:
+        Com `Semaphore(MAX_CONCURRENT_FEEDS)` fixo em 3, uma varredura de ~65
+        feeds saudáveis passava a maior parte do tempo com a rede ociosa; subir
+        o número à mão fazia o contrário nos dias em que algum portal começava a
+        devolver 403/429. Aqui a concorrência sobe sozinha enquanto as respostas
+        chegam rápidas e cai pela metade ao primeiro sinal de congestionamento.
+
+    INVARIANTES DO DOMÍNIO:
+        - O limite efetivo fica sempre em [minimum, maximum].
+        - Aumento: +1/limite por resposta saudável (≈ +1 por janela cheia), só
+          quando o limite está de facto em uso — sem carga, não cresce.
+        - Resposta mais lenta que `latency_target` é neutra (não sobe nem corta).
+        - Corte: timeout, 403 ou 429 dividem o limite por 2. Só um corte por
+          janela: sinais de pedidos que saíram antes do último corte são
+          ignorados (`epoch`), senão uma rajada de 429 do mesmo host levaria o
+          limite ao mínimo de uma vez.
+        - Baixar o limite não interrompe quem já está em voo; só atrasa quem entra.
+        - Pistas de prioridade (`lane`, 0 = mais alta): uma vaga livre vai sempre
+          para a pista mais alta com alguém à espera (FIFO dentro da pista). As
+          pistas abaixo da 0 só usam `effective - reserved` vagas: as `reserved`
+          restantes ficam livres para a pista 0 chegar sem esperar ninguém.
+        - `samples` guarda (instante, limite efetivo) a cada mudança, para o log
+          de concorrência ao longo da varredura.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Não levanta exceção nos sinais. Cancelamento durante a espera por vaga
+        repassa a vez para o próximo da fila.
+    """
+
+    def __init__(
+        self, initial: int, minimum: int, maximum: int, latency_target: float, reserved: int = 0
+    ):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.limit = float(max(self.minimum, min(int(initial), self.maximum)))
+        self.latency_target = float(latency_target)
+        self.reserved = max(0, int(reserved))
+        self.in_flight = 0
+        self.epoch = 0
+        self.increases = 0
+        self.decreases = 0
+        self.peak_in_flight = 0
+        self.samples: List[Tuple[float, int]] = []
+        self._waiters: Dict[int, Deque[asyncio.Future]] = {}
+
+    @property
+    def effective(self) -> int:
+        return max(self.minimum, min(int(self.limit), self.maximum))
+
+    def begin_scan(self) -> None:
+        """Zera a linha do tempo e o pico; o limite aprendido segue da varredura anterior."""
+        self.samples = [(time.monotonic(), self.effective)]
+        self.peak_in_flight = self.in_flight
+
+    def _record(self) -> None:
+        if not self.samples or self.samples[-1][1] != self.effective:
+            self.samples.append((time.monotonic(), self.effective))
+
+    def _cap(self, lane: int) -> int:
+        """Vagas que a pista pode ocupar: todas na 0, menos as reservadas nas outras."""
+        if lane <= 0:
+            return self.effective
+        return max(1, self.effective - self.reserved)
+
+    def _has_waiters(self, up_to_lane: int = -1) -> bool:
+        """Há alguém à espera (numa pista <= up_to_lane; -1 = qualquer)?"""
+        return any(
+            fila for lane, fila in self._waiters.items() if up_to_lane < 0 or lane <= up_to_lane
+        )
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _wake(self) -> None:
+        # A vaga é contada já na entrega: um recém-chegado de pista baixa não a
+        # rouba entre o set_result e o retorno do que estava à espera.
+        for lane in sorted(self._waiters):
+            fila = self._waiters[lane]
+            while fila and self.in_flight < self._cap(lane):
+                fut = fila.popleft()
+                if not fut.done():
+                    fut.set_result(None)
+                    self._take()
+
+    async def acquire(self, lane: int = 0) -> None:
+        if self.in_flight < self._cap(lane) and not self._has_waiters(lane):
+            self._take()
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(lane, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # A vaga já tinha sido dada a este: devolve-a ao próximo.
+                self.release()
+            elif fut in self._waiters.get(lane, ()):
+                self._waiters[lane].remove(fut)
+            raise
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, lane: int = 0) -> AsyncIterator[None]:
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def sleep_outside(self, seconds: float, lane: int = 0) -> None:
+        """
+        Dorme `seconds` SEM a vaga (que outro feed usa) e volta para o fim da fila.
+
+        Para quem está dentro de `slot()`: a contagem fica equilibrada mesmo com
+        cancelamento, para o `release` do `slot()` não devolver uma vaga a mais.
+        """
+        self.release()
+        try:
+            await asyncio.sleep(seconds)
+            await self.acquire(lane)
+        except BaseException:
+            self.in_flight += 1
+            raise
+
+    def on_success(self, latency: float) -> None:
+        """Resposta saudável (2xx/3xx): aumento aditivo se o limite estiver em uso."""
+        if latency > self.latency_target or self.limit >= self.maximum:
+            return
+        if self.in_flight < self.effective and not self._has_waiters():
+            return
+        antes = self.effective
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+        if self.effective != antes:
+            self.increases += 1
+            self._record()
+            scan_verbose(log, f"📈 [CONCORRÊNCIA] {antes} → {self.effective} (latência {latency:.1f}s)")
+            self._wake()
+
+    def on_congestion(self, started_epoch: int, reason: str) -> None:
+        """Timeout/403/429: corte multiplicativo, no máximo um por janela."""
+        if started_epoch != self.epoch:
+            return
+        antes = self.effective
+        self.limit = max(float(self.minimum), self.limit / 2)
+        self.epoch += 1
+        if self.effective != antes:
+            self.decreases += 1
+            self._record()
+            scan_verbose(log, f"📉 [CONCORRÊNCIA] {antes} → {self.effective} ({reason})")
+
+    def timeline(self, started: float) -> str:
+        """Linha do tempo compacta (`0s:3 → 4s:4 → 9s:2`) desde `started` (monotonic)."""
+        return " → ".join(f"{max(0.0, t - started):.0f}s:{n}" for t, n in self.samples)
+
+
+feed_concurrency = AdaptiveConcurrency(
+    MAX_CONCURRENT_FEEDS,
+    FEED_CONCURRENCY_MIN,
+    FEED_CONCURRENCY_MAX,
+    FEED_LATENCY_TARGET_SEC,
+    reserved=FEED_PRIORITY_RESERVED_SLOTS,
+)
@@ -0,0 +1,187 @@
+"""
+Dispatcher module - Entrega ao Discord em fila por canal, concorrente e com rate limit.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from settings import (
+    DISCORD_SEND_CONCURRENCY,
+    DISCORD_CHANNEL_MIN_INTERVAL_SEC,
+    DISCORD_GLOBAL_MAX_PER_SEC,
+    DISCORD_BATCH_EMBEDS,
+)
+from utils.ratelimit import TokenBucket
+
+from .logutil import scan_verbose
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+# Callback de resultado: (ok, erro). Chamado uma vez por entrega, no event loop.
+ResultCallback = Callable[[bool, Optional[BaseException]], None]
+
+# Limites do Discord por mensagem: 10 embeds e 6000 caracteres somados entre eles.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+_Pedido = Tuple[Any, Dict[str, Any], ResultCallback]
+
+
+def _embed_chars(embed: Any) -> int:
+    """Caracteres que o Discord conta no embed (discord.Embed implementa __len__)."""
+    try:
+        return len(embed)
+    except TypeError:
+        return 0
+
+
+class DeliveryDispatcher:
+    """
+    Fila de envios por canal com um pool limitado de envios simultâneos.
+
+    PROPÓSITO DE NEGÓCIO:
+        O engine fazia `await channel.send` um a um dentro do laço de guilds: uma
+        rajada de 30 notícias em 21 servidores virava centenas de idas e voltas ao
+        Discord em série, com a busca dos feeds parada à espera. Agora o engine
+        entrega o envio aqui e segue; canais diferentes enviam em paralelo.
+
+    INVARIANTES DO DOMÍNIO:
+        - Mensagens do MESMO canal saem em ordem de chegada, uma de cada vez e
+          espaçadas por DISCORD_CHANNEL_MIN_INTERVAL_SEC (balde por rota do
+          Discord: 5 mensagens / 5 s por canal).
+        - No máximo DISCORD_SEND_CONCURRENCY envios em voo no total, e no máximo
+          DISCORD_GLOBAL_MAX_PER_SEC por segundo (balde global do bot: 50/s).
+        - Cada entrega chama o seu callback exatamente uma vez, com ok=True só
+          se o Discord aceitou a mensagem — é o que o engine usa para gravar o
+          par (link, guild) no dedup.
+        - Em modo lote (DISCORD_BATCH_EMBEDS), pedidos só com `embed` que já
+          esperam na fila do canal saem numa mensagem, até 10 embeds / 6000
+          caracteres. Pedidos com `content` (vídeos: o link ativa o player) saem
+          sozinhos; a ordem da fila nunca muda e o callback continua por pedido.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Exceções do envio não se propagam: viram callback(False, erro) e um log.
+        Num lote, o resultado vale para todos os pedidos dele.
+        Exceções do próprio callback são logadas e não derrubam o worker.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DISCORD_SEND_CONCURRENCY,
+        channel_interval: float = DISCORD_CHANNEL_MIN_INTERVAL_SEC,
+        global_rate: float = DISCORD_GLOBAL_MAX_PER_SEC,
+        batch_embeds: bool = DISCORD_BATCH_EMBEDS,
+    ):
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._channel_interval = max(0.0, channel_interval)
+        self._global = TokenBucket(global_rate, burst=max(1.0, global_rate))
+        self._batch = batch_embeds
+        self._queues: Dict[int, Deque[_Pedido]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._channel_next: Dict[int, float] = {}
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.sent = 0
+        self.failed = 0
+        self.messages = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, channel: Any, on_result: ResultCallback, **send_kwargs: Any) -> None:
+        """Enfileira `channel.send(**send_kwargs)`; não espera o Discord."""
+        key = getattr(channel, "id", None) or id(channel)
+        self._queues.setdefault(key, deque()).append((channel, send_kwargs, on_result))
+        self._pending += 1
+        self._idle.clear()
+        worker = self._workers.get(key)
+        if worker is None or worker.done():
+            self._workers[key] = asyncio.create_task(self._run_channel(key))
+
+    @staticmethod
+    def _batchable(send_kwargs: Dict[str, Any]) -> bool:
+        return set(send_kwargs) == {"embed"} or (
+            set(send_kwargs) == {"content", "embed"} and send_kwargs["content"] is None
+        )
+
+    def _take(self, queue: Deque[_Pedido]) -> List[_Pedido]:
+        """Tira da cabeça da fila o próximo envio: um pedido, ou um lote de embeds."""
+        lote = [queue.popleft()]
+        if not self._batch or not self._batchable(lote[0][1]):
+            return lote
+        chars = _embed_chars(lote[0][1]["embed"])
+        while queue and len(lote) < MAX_EMBEDS_PER_MESSAGE:
+            _, prox_kwargs, _ = queue[0]
+            if not self._batchable(prox_kwargs):
+                break
+            prox_chars = _embed_chars(prox_kwargs["embed"])
+            if chars + prox_chars > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            lote.append(queue.popleft())
+            chars += prox_chars
+        return lote
+
+    async def _wait_channel(self, key: int) -> None:
+        espera = self._channel_next.get(key, 0.0) - time.monotonic()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+    async def _send(self, key: int, channel: Any, send_kwargs: Dict[str, Any]) -> None:
+        async with self._slots:
+            await self._global.acquire()
+            try:
+                await channel.send(**send_kwargs)
+            finally:
+                self._channel_next[key] = time.monotonic() + self._channel_interval
+                self.messages += 1
+
+    async def _run_channel(self, key: int) -> None:
+        queue = self._queues[key]
+        while queue:
+            # Espera o canal liberar ANTES de pegar uma vaga de envio: o
+            # espaçamento de um canal não segura vaga que outro canal usaria.
+            # Em modo lote, o que chegar durante a espera entra na mesma mensagem.
+            await self._wait_channel(key)
+            lote = self._take(queue)
+            channel, send_kwargs, _ = lote[0]
+            if len(lote) > 1:
+                send_kwargs = {"embeds": [kw["embed"] for _, kw, _ in lote]}
+            ok, erro = False, None
+            try:
+                await self._send(key, channel, send_kwargs)
+                ok = True
+                self.sent += len(lote)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                erro = e
+                self.failed += len(lote)
+                log.error(f"Error sending to channel {key}: {type(e).__name__}: {e}")
+            finally:
+                self._pending -= len(lote)
+                if self._pending == 0:
+                    self._idle.set()
+            for _, _, on_result in lote:
+                try:
+                    on_result(ok, erro)
+                except Exception as e:
+                    log.error(f"Falha no callback de entrega (canal {key}): {type(e).__name__}: {e}", exc_info=True)
+
+    async def join(self) -> None:
+        """Espera todas as entregas enfileiradas terminarem (com sucesso ou não)."""
+        if self._pending:
+            scan_verbose(log, f"📮 [ENTREGA] aguardando {self._pending} envio(s) pendente(s)...")
+        await self._idle.wait()
+
+    async def close(self) -> None:
+        """Cancela workers ainda ativos (ex.: varredura abortada por exceção)."""
+        workers = [w for w in self._workers.values() if not w.done()]
+        for w in workers:
+            w.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
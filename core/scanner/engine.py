@@ -4,12 +4,8 @@ Engine module - The main orchestration logic for the scanning process.
 import asyncio
 import logging
 import time
-import aiohttp
-import ssl
-import certifi
-import random
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Set
 
 import discord
 from discord.ext import tasks
@@ -17,7 +13,17 @@ from discord.ext import tasks
 from settings import (
     LOOP_MINUTES, 
     LOOP_INTERVAL_STR, 
-    MAX_CONCURRENT_FEEDS,
+    SCAN_QUEUE_MAXSIZE,
+    FEED_SCAN_DEADLINE_SEC,
+    FEED_RETRY_LANE,
+    FEED_ADAPTIVE_CADENCE,
+    FEED_CADENCE_TICK_MIN,
+    FEED_CADENCE_BATCH_MAX,
+    FEED_LPT_SCHEDULING,
+    FEED_HEDGING,
+    FEED_HEDGE_DEFAULT_SEC,
+    FEED_HEDGE_MIN_SEC,
+    FEED_BREAKER_ENABLED,
     FEED_FETCH_JITTER_MIN,
     FEED_FETCH_JITTER_MAX,
     MAX_ENTRIES_PER_FEED,
@@ -25,22 +31,57 @@ from settings import (
     HISTORY_LIMIT,
     HTML_MONITOR_COOLDOWN_SEC,
     HTML_MONITOR_COOLDOWN_HOURS,
+    DISCORD_SEND_CONCURRENCY,
+    DISCORD_CHANNEL_MIN_INTERVAL_SEC,
+    DISCORD_GLOBAL_MAX_PER_SEC,
+    DISCORD_BATCH_EMBEDS,
 )
 from utils.storage import p, load_json_safe, save_json_safe, load_config_cached
+from utils.http_client import http_client
 from core.stats import stats
-from core.filters import match_intel
+from core.filters import classify_intel
+from core.subscriptions import get_subscription_index
 
 # Novas importacoes modularizadas
 from .fetcher import load_sources, fetch_feed
+from .dispatcher import DeliveryDispatcher
+from .concurrency import feed_concurrency
+from .retrylane import update_retry_queue, due_retries
+from .cadence import update_cadence, due_sources, CHANGED, UNCHANGED, FAILED
+from .lanes import source_lane, lane_summary, format_lane_summary, NORMAL
+from .planner import plan_order, predict_makespan, update_source_stats, hedge_delay
+from .breaker import split_by_breaker, update_breakers, quarantined
+from .parsepool import parse_pool
 from .logutil import scan_verbose
-from .processor import load_history, save_history, prune_dedup, sanitize_link, parse_entry_dt, is_recent
+from .processor import (
+    load_history, save_history, prune_dedup, sanitize_link, parse_entry_dt, is_recent,
+    unseen_entries, build_feed_mark,
+)
 from .notifier import create_embed, resolve_thumbnail
 from utils.translator import save_translation_cache
 from core.html_monitor import check_official_sites
+from core.discovery import discovery_due, schedule_refresh
+from core.host_scheduler import host_scheduler
+from core.proxy_pool import proxy_pool
 
 log = logging.getLogger("MaftyIntel.scanner")
 scan_lock = asyncio.Lock()
 
+# Sentinela na fila de feeds: todas as buscas da varredura terminaram.
+_FEEDS_DONE = object()
+
+# A pista de retentativa está com o scan_lock (a varredura completa espera por ela).
+_retry_lane_active = False
+# Um lote da cadência está com o scan_lock (idem: /scan espera em vez de ser pulado).
+_cadence_batch_active = False
+# Intervalo da checagem da pista de retentativa (só lê o state.json se nada venceu).
+_RETRY_LANE_TICK_MINUTES = 1
+# Canal que some do cache segura a marca dos feeds por até tantas rodadas seguidas
+# (reconexão do gateway); depois disso é tratado como apagado e a marca avança.
+_MISSING_CHANNEL_GRACE_SCANS = 3
+# Rodadas seguidas em que cada canal configurado não foi encontrado (em memória).
+_missing_channel_scans: Dict[Any, int] = {}
+
 
 def _log_next_run() -> None:
     """Próximo horário estimado após o fim de uma varredura (alinhado ao intervalo LOOP_MINUTES)."""
@@ -52,255 +93,755 @@ def _log_next_run() -> None:
 
 async def run_scan_once(bot: discord.Client, trigger: str = "manual") -> None:
     """Executes a single scanning cycle."""
-    if scan_lock.locked():
+    # A pista de retentativa e o lote da cadência são curtos e não podem fazer a
+    # varredura completa ser pulada (o próximo ciclo seria só LOOP_MINUTES depois,
+    # e um /scan manual se perderia): espera-se por eles.
+    if scan_lock.locked() and not (_retry_lane_active or _cadence_batch_active):
         log.info(f"Scan skipped (already running). Trigger: {trigger}")
         return
+    if scan_lock.locked():
+        log.info(f"⏳ Varredura aguardando a rodada curta em andamento terminar... (trigger={trigger})")
 
     async with scan_lock:
         log.info(f"🔎 Iniciando varredura de inteligência... (trigger={trigger})")
-        config = load_config_cached({})
-        if not config: return
-
-        sources = load_sources()
-        scan_verbose(log, f"📋 [FILA] {len(sources)} fonte(s) RSS/agregada(s) carregada(s).")
-        state_file = p("state.json")
-        state = load_json_safe(state_file, {})
-        state.setdefault("dedup", {})
-        state.setdefault("http_cache", {})
-        state.setdefault("html_monitor", {})
-        
-        history_list, history_set = load_history()
-        
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-        connector = aiohttp.TCPConnector(ssl=ssl_ctx)
-        
-        sent_count = 0
-        cache_hits_start = stats.cache_hits_total
-        feeds_failed_start = stats.feeds_failed
-
-        async with aiohttp.ClientSession(connector=connector) as session:
-            semaphore = asyncio.Semaphore(MAX_CONCURRENT_FEEDS)
+        await _run_scan(bot, trigger)
+
+
+async def run_retry_lane(bot: discord.Client) -> None:
+    """
+    Re-tenta, entre varreduras, só os feeds que falharam na última (state["retry_queue"]).
+
+    Mesmo caminho de busca, filtro, dedup e entrega da varredura completa, sob o
+    mesmo scan_lock; sem HTML Monitor. Não faz nada se nenhuma retentativa venceu
+    ou se uma varredura estiver a correr.
+    """
+    global _retry_lane_active
+    if scan_lock.locked():
+        return
+    async with scan_lock:
+        state = load_json_safe(p("state.json"), {})
+        due = due_retries(state.get("retry_queue"), time.time())
+        if not due:
+            return
+        log.info(f"♻️ [RETRY LANE] Retentando {len(due)} feed(s) que falharam na última varredura...")
+        _retry_lane_active = True
+        try:
+            await _run_scan(bot, "retry", only_urls=set(due), html=False)
+        finally:
+            _retry_lane_active = False
+
+
+async def run_due_batch(bot: discord.Client) -> None:
+    """
+    Um lote da cadência adaptativa: só as fontes vencidas (até FEED_CADENCE_BATCH_MAX).
+
+    O HTML Monitor entra no lote quando passaram LOOP_MINUTES desde a última ronda
+    dele. Não faz nada se nada venceu ou se outra varredura estiver a correr (o
+    próximo tique tenta de novo). Uma varredura completa pedida durante o lote
+    espera por ele. Lotes contam em stats.cadence_batches, não como varreduras.
+    """
+    global _cadence_batch_active
+    if scan_lock.locked():
+        return
+    async with scan_lock:
+        state = load_json_safe(p("state.json"), {})
+        now = time.time()
+        # Fonte em quarentena não ocupa lugar no lote até a sonda dela vencer.
+        candidatas = load_sources()
+        if FEED_BREAKER_ENABLED:
+            candidatas, _, _ = split_by_breaker(candidatas, state.get("breakers"), now)
+        due = due_sources(candidatas, state.get("source_cadence"), now, FEED_CADENCE_BATCH_MAX)
+        try:
+            html_checked_at = float(state.get("html_monitor_checked_at", 0) or 0)
+        except (TypeError, ValueError):
+            html_checked_at = 0.0
+        html_due = now - html_checked_at >= LOOP_MINUTES * 60
+        if not due and not html_due:
+            return
+        log.info(
+            f"🔎 Lote da cadência adaptativa: {len(due)} fonte(s) vencida(s)"
+            f"{' + sites oficiais' if html_due else ''}..."
+        )
+        _cadence_batch_active = True
+        try:
+            await _run_scan(bot, "cadence", only_urls={src["url"] for src in due}, html=html_due)
+        finally:
+            _cadence_batch_active = False
+
+
+async def _run_scan(
+    bot: discord.Client, trigger: str, only_urls: Optional[Set[str]] = None, html: bool = True
+) -> None:
+    """
+    Corpo da varredura (o chamador segura o scan_lock).
+
+    only_urls: busca só estes feeds (pista de retentativa, lote da cadência);
+    None = todas as fontes. html: roda o HTML Monitor nesta rodada.
+    """
+    full_scan = only_urls is None
+    is_retry = trigger == "retry"
+    config = load_config_cached({})
+    if not config: return
+    sub_index = get_subscription_index(config)
+
+    sources = load_sources()
+    # Metadados de TODAS as fontes do sources.json, inclusive as em quarentena e
+    # as fora deste lote: a poda da cadência/latências roda em toda rodada (com a
+    # cadência ligada quase não há varredura completa) e não pode esquecer quem
+    # só está parado.
+    configured = {src["url"]: src.get("metadata", {}) for src in sources}
+    if not full_scan:
+        # Fonte desativada ou removida do sources.json desde a falha sai da fila.
+        sources = [src for src in sources if src["url"] in only_urls]
+    scan_verbose(log, f"📋 [FILA] {len(sources)} fonte(s) RSS/agregada(s) carregada(s).")
+    state_file = p("state.json")
+    state = load_json_safe(state_file, {})
+    # Disjuntor: fonte em quarentena fica de fora até a janela de sonda vencer, e
+    # então vai como sonda barata (uma tentativa por URL).
+    probes: Set[str] = set()
+    if FEED_BREAKER_ENABLED:
+        sources, probes, skipped = split_by_breaker(sources, state.get("breakers"), time.time())
+        if skipped:
+            scan_verbose(log, f"🚧 [QUARENTENA] {len(skipped)} fonte(s) fora desta rodada: {', '.join(skipped)}")
+        if probes:
+            log.info(f"🔌 [SONDA] {len(probes)} fonte(s) em quarentena testada(s) nesta rodada.")
+    # Pistas de prioridade: as "high" (oficiais, YouTube) são despachadas primeiro.
+    # Dentro da pista, a mais demorada pelo histórico começa primeiro (LPT): as
+    # lentas deixam de começar por último e segurar a varredura sozinhas.
+    lane_of = {src["url"]: source_lane(src) for src in sources}
+    declared = sorted(sources, key=lambda src: lane_of[src["url"]])
+    sources = plan_order(sources, state.get("source_stats"), lane_of) if FEED_LPT_SCHEDULING else declared
+    state.setdefault("dedup", {})
+    state.setdefault("http_cache", {})
+    state.setdefault("html_monitor", {})
+    feed_marks = state.setdefault("feed_marks", {})
+    # Ritmo aprendido por host (429/Retry-After/x-ratelimit-*) sobrevive a restarts.
+    host_scheduler.load(state.get("host_limits"))
+    throttle_waits_start = host_scheduler.waits
+    throttle_seconds_start = host_scheduler.wait_seconds
+    
+    history_list, history_set = load_history()
+    
+    sent_count = 0
+    scan_started = time.monotonic()
+    cache_hits_start = stats.cache_hits_total
+    fingerprint_hits_start = stats.fingerprint_hits_total
+    html_304_start = stats.html_not_modified_total
+    html_digest_start = stats.html_digest_hits_total
+    html_sitemap_start = stats.html_sitemap_unchanged_total
+    hedges_start, hedges_won_start = stats.hedges_started, stats.hedges_won
+    parsed_start = parse_pool.parsed
+    parse_seconds_start = parse_pool.parse_seconds_total
+    feeds_failed_start = stats.feeds_failed
+
+    # Sessão do processo (keep-alive, DNS em cache): não é fechada no fim da varredura.
+    async with http_client.borrow() as session:
+        # Concorrência das buscas é adaptativa (AIMD) e o limite aprendido segue
+        # de uma varredura para a outra; aqui só começa a linha do tempo.
+        feed_concurrency.begin_scan()
+        host_gap = (FEED_FETCH_JITTER_MIN + FEED_FETCH_JITTER_MAX) / 2
+
+        def previsto(ordem: List[Dict[str, Any]]) -> float:
+            return predict_makespan(
+                ordem, state.get("source_stats"), feed_concurrency.effective, host_scheduler.host_key, host_gap
+            )
+
+        predicted = previsto(sources)
+        predicted_declared = previsto(declared)
+        # Fila limitada entre busca e processamento: o processamento de um feed
+        # começa assim que ele chega, sem esperar o mais lento da lista.
+        feed_queue: asyncio.Queue = asyncio.Queue(maxsize=SCAN_QUEUE_MAXSIZE)
+        first_post_at: Optional[float] = None
+        # Envios saem por uma fila por canal; o engine só enfileira e segue.
+        dispatcher = DeliveryDispatcher(
+            DISCORD_SEND_CONCURRENCY,
+            DISCORD_CHANNEL_MIN_INTERVAL_SEC,
+            DISCORD_GLOBAL_MAX_PER_SEC,
+            DISCORD_BATCH_EMBEDS,
+        )
+        # Links já entregues ao dispatcher nesta varredura: o history só é gravado
+        # quando o Discord confirma, então outro feed com o mesmo link não pode
+        # confiar nele para não repostar.
+        claimed_links: set = set()
+        # Marcas de água só avançam depois que as entregas do feed terminam sem
+        # falha — senão a notícia que falhou nunca mais seria tentada.
+        pending_marks: Dict[str, Dict[str, Any]] = {}
+        # Canais procurados nesta rodada: os que sumiram (-> guild) e os encontrados.
+        missing_channels: Dict[Any, str] = {}
+        found_channels: Set[Any] = set()
+        failed_mark_urls: set = set()
+
+        # Esperas de retentativa saem da vaga: o feed dorme fora dela e volta ao
+        # fim da fila, e outros feeds usam a capacidade nesse meio-tempo. O prazo
+        # da varredura decide quando desistir.
+        fetch_deadline = scan_started + FEED_SCAN_DEADLINE_SEC
+        # Feeds que falharam (principal + fallbacks): alimentam a pista de retentativa.
+        failed_urls: Set[str] = set()
+        # Resultado por fonte (mudou / igual / falhou): ensina a cadência adaptativa.
+        outcomes: Dict[str, str] = {}
+        off_slot = {"waits": 0, "seconds": 0.0, "gave_up": 0}
+        # Segundos de parede de cada busca (da vaga ao resultado): ensinam o planejador.
+        fetch_seconds: Dict[str, float] = {}
+        # Latência do pedido à URL principal que respondeu: base do p90 do hedge.
+        primary_latency: Dict[str, float] = {}
+        # Segundos (desde o início) de cada envio confirmado, por pista do feed.
+        lane_posts: Dict[int, List[float]] = {}
+
+        async def wait_off_slot(seconds: float, lane: int) -> bool:
+            if time.monotonic() + seconds > fetch_deadline:
+                off_slot["gave_up"] += 1
+                return False
+            off_slot["waits"] += 1
+            off_slot["seconds"] += seconds
+            await feed_concurrency.sleep_outside(seconds, lane)
+            return True
+
+        async def throttled_fetch(src_obj):
+            url_log = src_obj.get("url", "Desconhecida")
+            lane = lane_of.get(src_obj.get("url", ""), NORMAL)
+
+            async def wait(seconds: float) -> bool:
+                return await wait_off_slot(seconds, lane)
+
+            hedge_after = None
+            if FEED_HEDGING:
+                hedge_after = hedge_delay(
+                    (state.get("source_stats") or {}).get(src_obj.get("url", "")),
+                    src_obj.get("metadata") or {},
+                    FEED_HEDGE_MIN_SEC,
+                    FEED_HEDGE_DEFAULT_SEC,
+                )
+
+            # Cortesia por host ANTES de pegar vaga: o espaçamento entre feeds do
+            # mesmo portal não deixa a vaga parada à espera (antes o jitter era
+            # dormido com o slot do semáforo na mão e somava direto ao makespan).
+            pausa = await host_scheduler.pace(
+                src_obj.get("url", ""), FEED_FETCH_JITTER_MIN, FEED_FETCH_JITTER_MAX
+            )
+            if pausa > 0:
+                scan_verbose(log, f"🎲 [JITTER] {pausa:.2f}s de cortesia ao host antes de buscar: {url_log}")
+            scan_verbose(
+                log,
+                f"⏳ [SEMAFORO] {url_log} aguardando liberação na fila "
+                f"(limite atual {feed_concurrency.effective} simultâneos)...",
+            )
+            async with feed_concurrency.slot(lane):
+                fetch_started = time.monotonic()
+                try:
+                    result = await fetch_feed(
+                        session,
+                        src_obj,
+                        state["http_cache"],
+                        wait=wait,
+                        failures=failed_urls,
+                        hedge_after=hedge_after,
+                        probe=src_obj.get("url", "") in probes,
+                        # O fallback do hedge ocupa uma vaga própria na pista do feed.
+                        hedge_slot=lambda: feed_concurrency.slot(lane),
+                        latencies=primary_latency,
+                    )
+                except Exception as e:
+                    # Uma falha isolada num feed não derruba a varredura inteira
+                    result = e
+                    failed_urls.add(src_obj.get("url", ""))
+                src_url = src_obj.get("url", "")
+                fetch_seconds[src_url] = time.monotonic() - fetch_started
+                # Feed que chegou é reclassificado em process_feed (mudou ou não).
+                outcomes[src_url] = FAILED if src_url in failed_urls else UNCHANGED
+                # O put acontece ainda com o slot do semáforo: se o processamento
+                # atrasar, a busca para em vez de acumular feeds parseados na memória.
+                await feed_queue.put(result)
+
+        async def produce_all():
+            # throttled_fetch nunca levanta (exceções viram resultado), então o
+            # sentinela sempre chega — exceto em cancelamento, quando ninguém o lê.
+            await asyncio.gather(*(throttled_fetch(src) for src in sources))
+            await feed_queue.put(_FEEDS_DONE)
+
+        def on_delivered(url: str, link: str, gid: str, channel_id: Any, title: str):
+            # dedup/history só registram o par (link, guild) depois que o Discord
+            # aceitou a mensagem — uma falha de envio volta a tentar na próxima varredura.
+            def _done(ok: bool, _err: Optional[BaseException]) -> None:
+                nonlocal sent_count, first_post_at
+                if not ok:
+                    failed_mark_urls.add(url)
+                    return
+                if any(x in link for x in ("youtube.com", "youtu.be")):
+                    log.info(
+                        f"🎥 [YOUTUBE POST] guild={gid} canal={channel_id} "
+                        f"| {title[:140]} | {link}"
+                    )
+                state["dedup"].setdefault(url, {}).setdefault(link, []).append(str(gid))
+                if link not in history_set:
+                    history_set.add(link)
+                    history_list.append(link)
+                sent_count += 1
+                agora = time.monotonic()
+                lane_posts.setdefault(lane_of.get(url, NORMAL), []).append(agora - scan_started)
+                if first_post_at is None:
+                    first_post_at = agora
+            return _done
+
+        async def process_feed(url: str, entries: List[Any]) -> None:
+            # Dedup per feed
+            if url not in state["dedup"]: state["dedup"][url] = {}
+            is_cold_start = not state["dedup"][url]
             
-            async def throttled_fetch(src_obj):
-                url_log = src_obj.get("url", "Desconhecida")
+            is_youtube_feed = ("youtube.com" in url or "youtu.be" in url)
+            max_items = (
+                MAX_YOUTUBE_ENTRIES_PER_FEED
+                if is_youtube_feed
+                else MAX_ENTRIES_PER_FEED
+            )
+            if is_youtube_feed and max_items <= 0:
+                max_items = len(entries)
+
+            limit_label = "sem limite" if (is_youtube_feed and MAX_YOUTUBE_ENTRIES_PER_FEED <= 0) else str(max_items)
+            scan_verbose(
+                log,
+                f"📊 [PROCESSANDO] Até {limit_label} entradas de {len(entries)} em {url} "
+                f"(cold start: {is_cold_start})",
+            )
+            window = entries[:max_items]
+            origem = (configured.get(url) or {}).get("discovered_from")
+            if origem and is_cold_start and url not in feed_marks:
+                # Feed recém-descoberto para um site oficial: o HTML Monitor já
+                # cobria o site, então o acervo do feed não é novidade. A primeira
+                # leitura só semeia a marca; daí em diante sai o que for novo.
+                mark = build_feed_mark(window)
+                if mark:
+                    pending_marks[url] = mark
+                outcomes[url] = UNCHANGED
+                log.info(
+                    f"🧭 [DESCOBERTA] feed novo de {origem} semeado: {len(window)} entrada(s) "
+                    f"marcada(s) como vista(s), sem postar o acervo → {url}"
+                )
+                return
+            fresh = unseen_entries(window, feed_marks.get(url))
+            if len(fresh) < len(window):
                 scan_verbose(
                     log,
-                    f"⏳ [SEMAFORO] {url_log} aguardando liberação na fila "
-                    f"(máx. {MAX_CONCURRENT_FEEDS} simultâneos)...",
+                    f"📍 [MARCA] {len(window) - len(fresh)} de {len(window)} entradas já vistas "
+                    f"em {url}; processando {len(fresh)}.",
                 )
-                async with semaphore:
-                    jitter = random.uniform(FEED_FETCH_JITTER_MIN, FEED_FETCH_JITTER_MAX)
+            outcomes[url] = CHANGED if fresh else UNCHANGED
+            if not fresh:
+                return
+            mark = build_feed_mark(window)
+            if mark:
+                pending_marks[url] = mark
+            await deliver_entries(url, fresh, is_cold_start)
+
+        async def deliver_entries(url: str, fresh: List[Any], is_cold_start: bool) -> None:
+            # Filtro, dedup por guild e envio de entradas novas de uma fonte: o
+            # caminho dos feeds e das manchetes novas do HTML Monitor.
+            state["dedup"].setdefault(url, {})
+            for entry in fresh:
+                link = sanitize_link(entry.get("link", ""))
+                if not link or link in history_set or link in claimed_links: continue
+                
+                # Dedup per guild (new logic)
+                if link in state["dedup"][url] and "LEGACY" in state["dedup"][url][link]:
+                    continue
+
+                # Filter by date
+                entry_dt = parse_entry_dt(entry)
+                if not is_cold_start and not is_recent(entry_dt):
                     scan_verbose(
                         log,
-                        f"🎲 [JITTER] Aguardando {jitter:.2f}s antes de buscar: {url_log}",
+                        f"⏭️ [IGNORADO] Notícia antiga ou fora da janela: {link}",
                     )
-                    await asyncio.sleep(jitter)
-                    return await fetch_feed(session, src_obj, state["http_cache"])
-
-            tasks_list = [throttled_fetch(src) for src in sources]
-            results = await asyncio.gather(*tasks_list, return_exceptions=True)
-
-            for result in results:
-                # return_exceptions=True: uma falha isolada num feed não derruba a varredura inteira
-                if isinstance(result, Exception):
-                    log.error(f"Falha não tratada ao buscar feed: {type(result).__name__}: {result}")
                     continue
-                if not result: continue
-                url, entries = result
-                
-                # Dedup per feed
-                if url not in state["dedup"]: state["dedup"][url] = {}
-                is_cold_start = not state["dedup"][url]
-                
-                is_youtube_feed = ("youtube.com" in url or "youtu.be" in url)
-                max_items = (
-                    MAX_YOUTUBE_ENTRIES_PER_FEED
-                    if is_youtube_feed
-                    else MAX_ENTRIES_PER_FEED
-                )
-                if is_youtube_feed and max_items <= 0:
-                    max_items = len(entries)
-
-                limit_label = "sem limite" if (is_youtube_feed and MAX_YOUTUBE_ENTRIES_PER_FEED <= 0) else str(max_items)
-                scan_verbose(
-                    log,
-                    f"📊 [PROCESSANDO] Até {limit_label} entradas de {len(entries)} em {url} "
-                    f"(cold start: {is_cold_start})",
-                )
-                for entry in entries[:max_items]:
-                    link = sanitize_link(entry.get("link", ""))
-                    if not link or link in history_set: continue
-                    
-                    # Dedup per guild (new logic)
-                    if link in state["dedup"][url] and "LEGACY" in state["dedup"][url][link]:
-                        continue
 
-                    # Filter by date
-                    entry_dt = parse_entry_dt(entry)
-                    if not is_cold_start and not is_recent(entry_dt):
-                        scan_verbose(
-                            log,
-                            f"⏭️ [IGNORADO] Notícia antiga ou fora da janela: {link}",
-                        )
-                        continue
+                if link not in state["dedup"][url]: state["dedup"][url][link] = []
 
-                    posted_anywhere = False
-                    if link not in state["dedup"][url]: state["dedup"][url][link] = []
-
-                    # Resolve a imagem 1x por notícia e reaproveita o embed por idioma
-                    # entre servidores — evita fetch OpenGraph e tradução duplicados.
-                    thumb = None
-                    thumb_done = False
-                    embeds_by_lang: Dict[str, Any] = {}
-
-                    for gid, gdata in config.items():
-                        if gid in state["dedup"][url][link]: continue
-
-                        channel_id = gdata.get("channel_id")
-                        if not channel_id: continue
-
-                        if not match_intel(
-                            str(gid),
-                            entry.get("title", ""),
-                            entry.get("summary", ""),
-                            config,
-                            source_url=url,
-                        ):
-                            scan_verbose(
-                                log,
-                                f"🚫 [FILTRO] Item não passou em match_intel (guild={gid}): "
-                                f"{(entry.get('title') or '')[:100]} | {link[:120]}",
-                            )
-                            continue
-
-                        channel = bot.get_channel(int(channel_id))
-                        if not channel: continue
-
-                        # Notify
-                        try:
-                            target_lang = gdata.get("language", "en_US")
-                            if target_lang not in embeds_by_lang:
-                                if not thumb_done:
-                                    thumb = await resolve_thumbnail(entry, session)
-                                    thumb_done = True
-                                embeds_by_lang[target_lang] = await create_embed(
-                                    bot, entry, target_lang, config, session=session, thumbnail_url=thumb
-                                )
-                            embed = embeds_by_lang[target_lang]
-
-                            is_video = any(x in link for x in ["youtube.com", "youtu.be", "twitch.tv"])
-                            msg_content = link if is_video else None
-                            await channel.send(content=msg_content, embed=embed)
-
-                            if any(x in link for x in ("youtube.com", "youtu.be")):
-                                title_snip = (entry.get("title") or "")[:140]
-                                log.info(
-                                    f"🎥 [YOUTUBE POST] guild={gid} canal={channel_id} "
-                                    f"| {title_snip} | {link}"
-                                )
-
-                            state["dedup"][url][link].append(str(gid))
-                            posted_anywhere = True
-                            sent_count += 1
-                        except Exception as e:
-                            log.error(f"Error sending to guild {gid}: {e}")
-
-                    if posted_anywhere:
-                        history_set.add(link)
-                        history_list.append(link)
-
-            # --- HTML MONITOR (Official Sites) ---
-            log.info("🔎 Verificando sites oficiais (HTML Watcher)...")
-            html_updates, new_html_state = await check_official_sites(state["html_monitor"])
-            state["html_monitor"] = new_html_state
+                # Classifica 1x por notícia; o índice diz quem assina o que casou.
+                verdict = classify_intel(
+                    entry.get("title", ""),
+                    entry.get("summary", ""),
+                    source_url=url,
+                )
+                targets = sub_index.guilds_for(verdict)
+                if not targets:
+                    scan_verbose(
+                        log,
+                        f"🚫 [FILTRO] Item não passou no filtro de nenhuma guild "
+                        f"(veredito={'bloqueado' if verdict is None else sorted(verdict)}): "
+                        f"{(entry.get('title') or '')[:100]} | {link[:120]}",
+                    )
+                    continue
 
-            # Cooldown por site: o hash muda a cada ciclo em portais com banner/ranking
-            # rotativo, o que gerava um "🔄 Update" por hora sem notícia nova. Estas
-            # atualizações não têm link único, então não passam pelo dedup/history dos
-            # feeds — o cooldown é o que impede a repostagem.
-            html_posted_at = state.setdefault("html_monitor_posted", {})
-            now_ts = time.time()
+                # Resolve a imagem 1x por notícia e reaproveita o embed por idioma
+                # entre servidores — evita fetch OpenGraph e tradução duplicados.
+                thumb = None
+                thumb_done = False
+                embeds_by_lang: Dict[str, Any] = {}
 
-            for update in html_updates:
-                site_url = update.get("link", "")
-                if HTML_MONITOR_COOLDOWN_SEC > 0 and site_url:
-                    try:
-                        last_ts = float(html_posted_at.get(site_url, 0))
-                    except (TypeError, ValueError):
-                        last_ts = 0.0
-                    if last_ts and (now_ts - last_ts) < HTML_MONITOR_COOLDOWN_SEC:
-                        restante = (HTML_MONITOR_COOLDOWN_SEC - (now_ts - last_ts)) / 3600
-                        scan_verbose(
-                            log,
-                            f"🔕 [HTML COOLDOWN] {site_url} avisado há menos de "
-                            f"{HTML_MONITOR_COOLDOWN_HOURS:.0f}h (faltam {restante:.1f}h).",
-                        )
-                        continue
+                for gid in targets:
+                    if gid in state["dedup"][url][link]: continue
 
-                # Trata atualizações de HTML como entradas de feed para processamento uniforme
-                # check_official_sites já retorna dicts compatíveis com create_embed
-                html_sent = False
-                html_embeds_by_lang: Dict[str, Any] = {}
-                for gid, gdata in config.items():
+                    gdata = config.get(gid)
+                    if not isinstance(gdata, dict): continue
                     channel_id = gdata.get("channel_id")
-                    if not channel_id: continue
-
-                    # Filtra por palavras-chave (opcional, mas recomendado)
-                    if not match_intel(str(gid), update.get("title", ""), update.get("summary", ""), config):
-                        continue
 
                     channel = bot.get_channel(int(channel_id))
-                    if not channel: continue
+                    if not channel:
+                        # Canal fora do cache (reconexão do gateway): a entrada não
+                        # foi entregue, então a marca do feed não avança e a próxima
+                        # rodada tenta de novo — por até _MISSING_CHANNEL_GRACE_SCANS
+                        # rodadas. Canal apagado some para sempre: depois disso a
+                        # marca avança, senão uma guild congelaria os feeds dela.
+                        # Itens barrados pelo filtro ou pela data avançam a marca
+                        # de propósito: a decisão não muda na varredura seguinte.
+                        missing_channels[channel_id] = gid
+                        if _missing_channel_scans.get(channel_id, 0) < _MISSING_CHANNEL_GRACE_SCANS:
+                            failed_mark_urls.add(url)
+                        continue
+                    found_channels.add(channel_id)
 
+                    # Notify
                     try:
                         target_lang = gdata.get("language", "en_US")
-                        # Para sites oficiais, passamos um entry fake; embed reaproveitado por idioma
-                        if target_lang not in html_embeds_by_lang:
-                            html_embeds_by_lang[target_lang] = await create_embed(bot, update, target_lang, config, session=session)
-                        embed = html_embeds_by_lang[target_lang]
-                        await channel.send(embed=embed)
-                        sent_count += 1
-                        html_sent = True
+                        if target_lang not in embeds_by_lang:
+                            if not thumb_done:
+                                thumb = await resolve_thumbnail(entry, session)
+                                thumb_done = True
+                            embeds_by_lang[target_lang] = await create_embed(
+                                bot, entry, target_lang, config, session=session, thumbnail_url=thumb
+                            )
+                        embed = embeds_by_lang[target_lang]
+
+                        is_video = any(x in link for x in ["youtube.com", "youtu.be", "twitch.tv"])
+                        msg_content = link if is_video else None
+                        dispatcher.submit(
+                            channel,
+                            on_delivered(url, link, gid, channel_id, entry.get("title") or ""),
+                            content=msg_content,
+                            embed=embed,
+                        )
+                        claimed_links.add(link)
                     except Exception as e:
-                        log.error(f"Error sending HTML update to guild {gid}: {e}")
-
-                # Só arma o cooldown se o aviso de facto saiu para alguma guild —
-                # senão um item barrado pelo filtro bloquearia o site por 24h.
-                if html_sent and site_url:
-                    html_posted_at[site_url] = now_ts
+                        failed_mark_urls.add(url)
+                        log.error(f"Error preparing post for guild {gid}: {e}")
 
-        # Cleanup and Save
-        # Corta o history aos últimos HISTORY_LIMIT e alinha o dedup à mesma janela,
-        # para o state.json não crescer indefinidamente (auto-poda a cada varredura).
-        save_history(history_list)
-        keep_links = set(history_list[-HISTORY_LIMIT:])
-        dedup_before, dedup_after = prune_dedup(state["dedup"], keep_links)
-        if dedup_before != dedup_after:
+        # Um único consumidor processa os feeds na ordem em que terminam: o
+        # dedup/history continuam a ser mutados por uma só corrotina, como antes.
+        producer = asyncio.create_task(produce_all())
+        try:
+            while True:
+                result = await feed_queue.get()
+                if result is _FEEDS_DONE:
+                    break
+                if isinstance(result, Exception):
+                    log.error(f"Falha não tratada ao buscar feed: {type(result).__name__}: {result}")
+                    continue
+                if not result: continue
+                url, entries = result
+                await process_feed(url, entries)
+                # Libera a referência antes de esperar o próximo: o feed parseado
+                # não fica vivo até o fim da varredura.
+                del result, entries
+        except BaseException:
+            await dispatcher.close()
+            raise
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+        fetch_elapsed = time.monotonic() - scan_started
+        if sources:
             log.info(
-                f"🧹 [AUTO-PODA] dedup do state.json: {dedup_before} → {dedup_after} links "
-                f"(teto {HISTORY_LIMIT})."
+                f"📐 [MAKESPAN] busca prevista {predicted:.0f}s "
+                f"({'ordem LPT' if FEED_LPT_SCHEDULING else 'ordem do sources.json'}; na ordem do "
+                f"sources.json seria {predicted_declared:.0f}s); real {fetch_elapsed:.0f}s "
+                f"para {len(sources)} fonte(s)."
+            )
+        if off_slot["waits"] or off_slot["gave_up"]:
+            scan_verbose(
+                log,
+                f"♻️ [RETRY FORA DA VAGA] {off_slot['waits']} espera(s), "
+                f"{off_slot['seconds']:.0f}s sem ocupar vaga; "
+                f"{off_slot['gave_up']} desistência(s) pelo prazo de {FEED_SCAN_DEADLINE_SEC:.0f}s.",
             )
-        save_json_safe(state_file, state)
-        # Persiste o cache de tradução (evita rajada de scraping no Google após restart)
-        save_translation_cache()
 
+        # --- HTML MONITOR (Official Sites) ---
+        # A pista de retentativa só re-busca feeds; os lotes da cadência incluem os
+        # sites oficiais uma vez a cada LOOP_MINUTES.
+        html_updates: List[Dict[str, Any]] = []
+        if html:
+            log.info("🔎 Verificando sites oficiais (HTML Watcher)...")
+            # Validadores (ETag/Last-Modified) e digest do corpo de cada site, ao lado
+            # dos hashes: página sem mudança custa um pedido pequeno e nenhum parse.
+            # Links da região vigiada por site: a mudança vira uma manchete por link novo.
+            html_updates, new_html_state = await check_official_sites(
+                state["html_monitor"],
+                state.setdefault("html_monitor_http", {}),
+                links_state=state.setdefault("html_monitor_links", {}),
+            )
+            state["html_monitor"] = new_html_state
+            state["html_monitor_checked_at"] = time.time()
+            # SOURCE_DISCOVERY_INTERVAL_HOURS > 0: renova o overlay de feeds/sitemaps
+            # descobertos em segundo plano; vale a partir da próxima varredura.
+            if discovery_due(time.time()) and schedule_refresh():
+                log.info("🧭 [DESCOBERTA] Renovando sources.discovered.json em segundo plano...")
+
+        # Manchetes novas (item com "site") têm link próprio: vão pelo caminho dos
+        # feeds, com dedup por site e history — um segundo anúncio real do mesmo
+        # site sai na hora, e um link já postado por um feed não repete.
+        por_site: Dict[str, List[Dict[str, Any]]] = {}
+        for update in html_updates:
+            if update.get("site"):
+                por_site.setdefault(update["site"], []).append(update)
+        for site_url, itens in por_site.items():
+            await deliver_entries(site_url, itens, is_cold_start=False)
+        if por_site:
+            scan_verbose(
+                log,
+                f"🧭 [HTML LINKS] {sum(len(i) for i in por_site.values())} manchete(s) nova(s) "
+                f"em {len(por_site)} site(s) pelo caminho dos feeds.",
+            )
+        html_updates = [update for update in html_updates if not update.get("site")]
+
+        # Cooldown por site, só para o "🔄 Update" genérico (site sem links
+        # extraíveis): o hash muda a cada ciclo em portais com banner/ranking
+        # rotativo, o que gerava um aviso por hora sem notícia nova. Estas
+        # atualizações não têm link único, então não passam pelo dedup/history dos
+        # feeds — o cooldown é o que impede a repostagem.
+        html_posted_at = state.setdefault("html_monitor_posted", {})
+        now_ts = time.time()
+
+        def on_html_delivered(site_url: str):
+            # Só arma o cooldown se o aviso de facto saiu para alguma guild —
+            # senão um item barrado pelo filtro bloquearia o site por 24h.
+            def _done(ok: bool, _err: Optional[BaseException]) -> None:
+                nonlocal sent_count
+                if not ok:
+                    return
+                sent_count += 1
+                if site_url:
+                    html_posted_at[site_url] = now_ts
+            return _done
+
+        for update in html_updates:
+            site_url = update.get("link", "")
+            if HTML_MONITOR_COOLDOWN_SEC > 0 and site_url:
+                try:
+                    last_ts = float(html_posted_at.get(site_url, 0))
+                except (TypeError, ValueError):
+                    last_ts = 0.0
+                if last_ts and (now_ts - last_ts) < HTML_MONITOR_COOLDOWN_SEC:
+                    restante = (HTML_MONITOR_COOLDOWN_SEC - (now_ts - last_ts)) / 3600
+                    scan_verbose(
+                        log,
+                        f"🔕 [HTML COOLDOWN] {site_url} avisado há menos de "
+                        f"{HTML_MONITOR_COOLDOWN_HOURS:.0f}h (faltam {restante:.1f}h).",
+                    )
+                    continue
+
+            # Trata atualizações de HTML como entradas de feed para processamento uniforme
+            # check_official_sites já retorna dicts compatíveis com create_embed
+            html_embeds_by_lang: Dict[str, Any] = {}
+            html_verdict = classify_intel(update.get("title", ""), update.get("summary", ""))
+            for gid in sub_index.guilds_for(html_verdict):
+                gdata = config.get(gid)
+                if not isinstance(gdata, dict): continue
+                channel_id = gdata.get("channel_id")
+
+                channel = bot.get_channel(int(channel_id))
+                if not channel: continue
+
+                try:
+                    target_lang = gdata.get("language", "en_US")
+                    # Para sites oficiais, passamos um entry fake; embed reaproveitado por idioma
+                    if target_lang not in html_embeds_by_lang:
+                        html_embeds_by_lang[target_lang] = await create_embed(bot, update, target_lang, config, session=session)
+                    embed = html_embeds_by_lang[target_lang]
+                    dispatcher.submit(channel, on_html_delivered(site_url), embed=embed)
+                except Exception as e:
+                    log.error(f"Error preparing HTML update for guild {gid}: {e}")
+
+        try:
+            await dispatcher.join()
+        finally:
+            await dispatcher.close()
+
+        for mark_url, mark in pending_marks.items():
+            if mark_url not in failed_mark_urls:
+                feed_marks[mark_url] = mark
+
+        anteriores = dict(_missing_channel_scans)
+        _missing_channel_scans.clear()
+        _missing_channel_scans.update(
+            {cid: n for cid, n in anteriores.items() if cid not in found_channels}
+        )
+        for cid, gid in missing_channels.items():
+            seguidas = anteriores.get(cid, 0) + 1
+            _missing_channel_scans[cid] = seguidas
+            if seguidas > _MISSING_CHANNEL_GRACE_SCANS:
+                log.warning(
+                    f"📭 [CANAL] canal {cid} da guild {gid} não encontrado há {seguidas} rodadas "
+                    f"seguidas: as marcas dos feeds avançam sem entregar a ele. "
+                    f"Reconfigure o canal da guild."
+                )
+
+        if first_post_at is not None:
+            scan_verbose(
+                log,
+                f"⏱️ [STREAMING] primeiro envio em {first_post_at - scan_started:.1f}s; "
+                f"feeds concluídos em {fetch_elapsed:.1f}s; "
+                f"entregas concluídas em {time.monotonic() - scan_started:.1f}s.",
+            )
+        # Tempo até o post por pista: sob carga, as "high" têm de sair antes.
+        por_pista = lane_summary(lane_posts)
+        if por_pista:
+            stats.lane_time_to_post = por_pista
+            log.info(f"🚥 [PRIORIDADE] tempo até o post: {format_lane_summary(por_pista)}")
+
+    # Cleanup and Save
+    # Corta o history aos últimos HISTORY_LIMIT e alinha o dedup à mesma janela,
+    # para o state.json não crescer indefinidamente (auto-poda a cada varredura).
+    save_history(history_list)
+    keep_links = set(history_list[-HISTORY_LIMIT:])
+    dedup_before, dedup_after = prune_dedup(state["dedup"], keep_links)
+    if dedup_before != dedup_after:
+        log.info(
+            f"🧹 [AUTO-PODA] dedup do state.json: {dedup_before} → {dedup_after} links "
+            f"(teto {HISTORY_LIMIT})."
+        )
+    state["host_limits"] = host_scheduler.export()
+    if FEED_BREAKER_ENABLED:
+        state["breakers"] = update_breakers(
+            state.get("breakers"),
+            (src["url"] for src in sources),
+            failed_urls,
+            time.time(),
+            keep=set(configured),
+        )
+    # Fonte em quarentena é da alçada do disjuntor: não ocupa a pista de retentativa.
+    em_quarentena = {url for url, _ in quarantined(state.get("breakers"))}
+    state["retry_queue"] = update_retry_queue(
+        state.get("retry_queue"),
+        (src["url"] for src in sources),
+        failed_urls - em_quarentena,
+        time.time(),
+        full_scan,
+    )
+    state["source_stats"] = update_source_stats(
+        state.get("source_stats"),
+        fetch_seconds,
+        failed_urls,
+        time.time(),
+        keep=set(configured),
+        latencies=primary_latency,
+    )
+    if FEED_ADAPTIVE_CADENCE:
+        state["source_cadence"] = update_cadence(
+            state.get("source_cadence"),
+            outcomes,
+            configured,
+            time.time(),
+            prune=True,
+        )
+    else:
+        # Cadência desligada: a tabela não cresce no state.json (religada, recomeça
+        # em LOOP_MINUTES por fonte).
+        state.pop("source_cadence", None)
+    save_json_safe(state_file, state)
+    # Persiste o cache de tradução (evita rajada de scraping no Google após restart)
+    save_translation_cache()
+
+    if trigger == "cadence":
+        # Lote da cadência não é varredura: não infla o contador do /status e da web.
+        stats.cadence_batches += 1
+        stats.last_scan_time = datetime.now()
+    elif not is_retry:
         stats.scans_completed += 1
-        stats.news_posted += sent_count
         stats.last_scan_time = datetime.now()
-
-        cache_hits = stats.cache_hits_total - cache_hits_start
-        feeds_failed = stats.feeds_failed - feeds_failed_start
+    stats.news_posted += sent_count
+
+    cache_hits = stats.cache_hits_total - cache_hits_start
+    fingerprint_hits = stats.fingerprint_hits_total - fingerprint_hits_start
+    feeds_failed = stats.feeds_failed - feeds_failed_start
+    html_resumo = (
+        f"html_304={stats.html_not_modified_total - html_304_start}, "
+        f"html_corpo_igual={stats.html_digest_hits_total - html_digest_start}, "
+        f"html_sitemap_igual={stats.html_sitemap_unchanged_total - html_sitemap_start}, "
+        if html else ""
+    )
+    log.info(
+        f"✅ {'Retentativa' if is_retry else 'Varredura' if full_scan else 'Lote'} concluída(o). "
+        f"(enviadas={sent_count}, mensagens={dispatcher.messages}, "
+        f"cache_hits={cache_hits}, corpo_igual={fingerprint_hits}, {html_resumo}"
+        f"feeds_falhos={feeds_failed}, trigger={trigger})"
+    )
+    hedges = stats.hedges_started - hedges_start
+    if hedges:
+        log.info(
+            f"🪁 [HEDGE] {hedges} fallback(s) disparado(s) em paralelo após o p90; "
+            f"{stats.hedges_won - hedges_won_start} venceu(ram) a principal."
+        )
+    if state["retry_queue"]:
+        proxima = min(item["next_at"] for item in state["retry_queue"].values())
         log.info(
-            f"✅ Varredura concluída. (enviadas={sent_count}, cache_hits={cache_hits}, "
-            f"feeds_falhos={feeds_failed}, trigger={trigger})"
+            f"♻️ [RETRY LANE] {len(state['retry_queue'])} feed(s) na fila de retentativa; "
+            f"próxima às {datetime.fromtimestamp(proxima):%H:%M:%S}."
+        )
+    log.info(
+        f"🎛️ [CONCORRÊNCIA] limite efetivo ao longo da varredura: "
+        f"{feed_concurrency.timeline(scan_started)} "
+        f"(pico em voo {feed_concurrency.peak_in_flight}, faixa "
+        f"{feed_concurrency.minimum}–{feed_concurrency.maximum})"
+    )
+    throttle_waits = host_scheduler.waits - throttle_waits_start
+    if throttle_waits or state["host_limits"]:
+        scan_verbose(
+            log,
+            f"🚦 [RATE LIMIT] {throttle_waits} espera(s) por orçamento de host "
+            f"({host_scheduler.wait_seconds - throttle_seconds_start:.1f}s); "
+            f"{len(state['host_limits'])} host(s) com ritmo aprendido.",
         )
+    if proxy_pool.configured:
+        rotas = proxy_pool.snapshot()["routes"]
+        scan_verbose(
+            log,
+            "🛡️ [PROXY POOL] " + " · ".join(
+                f"{r['route']}: {r['requests']} req, {r['error_rate'] * 100:.0f}% erro, "
+                f"{'—' if r['latency_ms'] is None else str(r['latency_ms']) + ' ms'}"
+                + (f", ejetado {r['ejected_for_sec']}s" if r["ejected_for_sec"] else "")
+                for r in rotas
+            ),
+        )
+    parsed = parse_pool.parsed - parsed_start
+    if parsed:
+        media_ms = (parse_pool.parse_seconds_total - parse_seconds_start) / parsed * 1000
+        scan_verbose(
+            log,
+            f"🧮 [PARSE] {parsed} feed(s) parseado(s), média {media_ms:.0f} ms "
+            f"(pool: {parse_pool.workers} processo(s), fila máx. {parse_pool.max_queue_depth}).",
+        )
+    if FEED_ADAPTIVE_CADENCE and not is_retry:
+        mudaram = sum(1 for o in outcomes.values() if o == CHANGED)
+        proxima = min(
+            (item["next_due"] for item in state["source_cadence"].values()), default=time.time()
+        )
+        log.info(
+            f"🗓️ [CADÊNCIA] {mudaram}/{len(outcomes)} fonte(s) com novidade; próxima fonte "
+            f"vence às {datetime.fromtimestamp(proxima):%Y-%m-%d %H:%M:%S}."
+        )
+    elif full_scan:
         _log_next_run()
 
 def start_scheduler(bot: discord.Client):
-    @tasks.loop(minutes=LOOP_MINUTES)
+    # Cadência adaptativa: lotes pequenos e contínuos das fontes vencidas a cada
+    # FEED_CADENCE_TICK_MIN. Sem ela, uma varredura de tudo a cada LOOP_MINUTES.
+    @tasks.loop(minutes=FEED_CADENCE_TICK_MIN if FEED_ADAPTIVE_CADENCE else LOOP_MINUTES)
     async def intelligence_gathering():
         try:
-            await run_scan_once(bot, trigger="loop")
+            if FEED_ADAPTIVE_CADENCE:
+                await run_due_batch(bot)
+            else:
+                await run_scan_once(bot, trigger="loop")
         except Exception as e:
             log.exception(f"Loop error: {e}")
 
@@ -308,6 +849,26 @@ def start_scheduler(bot: discord.Client):
     async def _before(): await bot.wait_until_ready()
     
     intelligence_gathering.start()
+
+    if FEED_RETRY_LANE:
+        @tasks.loop(minutes=_RETRY_LANE_TICK_MINUTES)
+        async def retry_lane():
+            try:
+                await run_retry_lane(bot)
+            except Exception as e:
+                log.exception(f"Retry lane error: {e}")
+
+        @retry_lane.before_loop
+        async def _before_retry(): await bot.wait_until_ready()
+
+        retry_lane.start()
+    if FEED_ADAPTIVE_CADENCE:
+        log.info(
+            f"🛰️ Scanner de Inteligência ativado! Cadência adaptativa por fonte: lote de até "
+            f"{FEED_CADENCE_BATCH_MAX} fonte(s) vencida(s) a cada {FEED_CADENCE_TICK_MIN} min; "
+            f"sites oficiais a cada {LOOP_INTERVAL_STR}."
+        )
+        return
     log.info(
         f"🛰️ Scanner de Inteligência ativado! Ciclo: {LOOP_INTERVAL_STR} "
         f"({LOOP_MINUTES} min entre execuções do loop)."
@@ -3,9 +3,10 @@ Fetcher module - Handles HTTP requests and RSS feed parsing with stealth techniq
 """
 import asyncio
 import logging
+import time
 import aiohttp
-import feedparser
-from typing import Any, List, Dict, Tuple, Optional
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, Awaitable, Callable, List, Dict, Set, Tuple, Optional
 from urllib.parse import urlparse
 
 from settings import (
@@ -16,16 +17,24 @@ from settings import (
     FEED_FETCH_INTER_RETRY_DELAYS,
     FEED_FETCH_RETRY_BACKOFF_SEC,
     FEED_BROWSER_USER_AGENT,
-    REDDIT_MIN_INTERVAL_SEC,
-    CLOUDFLARE_PROXY_URL,
-    CLOUDFLARE_PROXY_SECRET,
+    FEED_FINGERPRINT_STRIP_VOLATILE,
+    FEED_FAST_PARSER,
+    MAX_ENTRIES_PER_FEED,
+    MAX_YOUTUBE_ENTRIES_PER_FEED,
 )
 from utils.storage import p, load_json_safe
 from utils.security import validate_url
-from utils.cache import get_cache_headers, update_cache_state
+from utils.cache import (
+    get_cache_headers, update_cache_state, body_fingerprint, fingerprint_matches, update_fingerprint,
+)
 from core.stats import stats
+from core.host_scheduler import host_scheduler, retry_after_seconds
+from core.proxy_pool import proxy_pool
+from core.discovery import discovered_feeds
 
 from .logutil import scan_verbose, scan_verbose_cache
+from .parsepool import parse_pool
+from .concurrency import feed_concurrency
 
 log = logging.getLogger("MaftyIntel.scanner")
 
@@ -37,91 +46,9 @@ _FEED_RETRYABLE_STATUS = frozenset({403, 429, 502, 503, 504})
 # `x-ratelimit-remaining: 0.0` com `x-ratelimit-reset: 6` — é orçamento de ~1
 # requisição por janela de segundos POR IP, não bloqueio de bot. Proxy não resolve
 # (os IPs de Worker são compartilhados e ainda mais estrangulados); quem resolve é o
-# throttle por host abaixo. Fontes que precisem de proxy pedem com "use_proxy": true.
+# HostScheduler (core/host_scheduler.py), que aprende o ritmo com os cabeçalhos. Fontes que precisem de proxy pedem com "use_proxy": true.
 _PROXY_CANDIDATE_DOMAINS = ["youtube.com", "youtu.be", "nyaa.si", "tokyotosho.info"]
 
-# Intervalo mínimo entre requisições ao MESMO host, para respeitar orçamentos de
-# rate limit por IP. Sem isto o semáforo global (MAX_CONCURRENT_FEEDS) dispara os 7
-# feeds do Reddit quase em paralelo e 6 voltam 429.
-_HOST_MIN_INTERVAL_SEC: Dict[str, float] = {
-    "reddit.com": REDDIT_MIN_INTERVAL_SEC,
-}
-
-# Estado do throttle por host. asyncio.Lock é criado sob demanda e vive no event
-# loop da varredura; o dicionário é module-level porque a sessão é recriada a cada
-# ciclo mas o orçamento do Reddit é do IP, não da sessão.
-_host_locks: Dict[str, asyncio.Lock] = {}
-_host_next_free: Dict[str, float] = {}
-
-
-def _throttle_key(url: str) -> Optional[str]:
-    """Host com orçamento de rate limit a respeitar, ou None se não houver."""
-    netloc = urlparse(url).netloc.lower()
-    for host, interval in _HOST_MIN_INTERVAL_SEC.items():
-        if interval > 0 and (netloc == host or netloc.endswith("." + host)):
-            return host
-    return None
-
-
-async def _acquire_host_slot(host: str) -> None:
-    """
-    Serializa e espaça as requisições a um host com orçamento de rate limit.
-
-    PROPÓSITO DE NEGÓCIO:
-        O Reddit concede ~1 requisição por janela de segundos por IP a clientes
-        anónimos. Como o bot tem 7 feeds de subreddit e um semáforo global de 3,
-        eles saíam quase juntos e 6 voltavam 429 todo ciclo — perdendo por completo
-        a cobertura da comunidade.
-
-    INVARIANTES DO DOMÍNIO:
-        - Requisições ao mesmo host nunca saem em paralelo (lock por host).
-        - Entre o fim de uma e o início da seguinte passa pelo menos
-          _HOST_MIN_INTERVAL_SEC[host].
-        - Hosts sem orçamento configurado não pagam nada (nunca chegam aqui).
-
-    COMPORTAMENTO EM CASO DE FALHA:
-        Não levanta exceção. O lock é sempre libertado pelo chamador em `finally`;
-        se a requisição falhar, a janela seguinte é agendada na mesma.
-    """
-    lock = _host_locks.setdefault(host, asyncio.Lock())
-    await lock.acquire()
-    interval = _HOST_MIN_INTERVAL_SEC.get(host, 0.0)
-    espera = _host_next_free.get(host, 0.0) - asyncio.get_running_loop().time()
-    if espera > 0:
-        scan_verbose(log, f"🚦 [THROTTLE] {host}: aguardando {espera:.1f}s pelo orçamento de rate limit.")
-        await asyncio.sleep(espera)
-    _host_next_free[host] = asyncio.get_running_loop().time() + interval
-
-
-def _release_host_slot(host: str, retry_after_sec: float = 0.0) -> None:
-    """Liberta o host e, em caso de 429, empurra a próxima janela para o valor pedido pelo servidor."""
-    if retry_after_sec > 0:
-        loop_now = asyncio.get_event_loop().time()
-        _host_next_free[host] = max(_host_next_free.get(host, 0.0), loop_now + retry_after_sec)
-    lock = _host_locks.get(host)
-    if lock is not None and lock.locked():
-        lock.release()
-
-
-def _retry_after_seconds(resp: Any) -> float:
-    """
-    Segundos que o servidor pediu para esperar, lidos dos cabeçalhos do 429.
-
-    Aceita `Retry-After` (padrão HTTP) e `x-ratelimit-reset` (usado pelo Reddit).
-    Devolve 0.0 se nenhum estiver presente ou for ilegível, deixando o chamador
-    cair no backoff configurado. O valor é limitado a 300s para não travar a
-    varredura inteira num servidor que peça uma espera absurda.
-    """
-    for header in ("Retry-After", "x-ratelimit-reset"):
-        raw = resp.headers.get(header)
-        if not raw:
-            continue
-        try:
-            return max(0.0, min(float(str(raw).strip()), 300.0))
-        except (TypeError, ValueError):
-            continue
-    return 0.0
-
 # Resultado interno de _fetch_feed_url
 _OK = "ok"
 _NOT_MODIFIED = "not_modified"
@@ -136,14 +63,35 @@ def _delay_before_feed_retry(attempt_index: int) -> float:
     return FEED_FETCH_RETRY_BACKOFF_SEC * (2 ** max(0, excess))
 
 
-def _sources_from_list(val: Any) -> List[Dict[str, Any]]:
+# Espera entre tentativas: recebe os segundos e devolve False se o feed deve desistir
+# (prazo da varredura). O engine passa uma que devolve a vaga de concorrência.
+RetryWait = Callable[[float], Awaitable[bool]]
+
+
+async def _sleep_wait(seconds: float) -> bool:
+    """Espera padrão (uso avulso de fetch_feed): só dorme."""
+    await asyncio.sleep(seconds)
+    return True
+
+
+# Vaga de concorrência para uma busca extra (o fallback do hedge). O engine passa
+# a do AdaptiveConcurrency na pista do feed; no uso avulso não há limite.
+SlotFactory = Callable[[], AsyncContextManager[Any]]
+
+
+# Pista de prioridade padrão de cada lista do sources.json; "priority" no item
+# sobrepõe. Listas fora daqui ficam em "normal".
+_LIST_PRIORITY = {"youtube_feeds": "high", "tracker_feeds": "low"}
+
+
+def _sources_from_list(val: Any, priority: Optional[str] = None) -> List[Dict[str, Any]]:
     """Extrai objetos de fonte de listas com strings ou dicts. Preserva metadados."""
     out: List[Dict[str, Any]] = []
     if not isinstance(val, list):
         return out
     for item in val:
         if isinstance(item, str) and item.startswith("http"):
-            out.append({"url": item.strip(), "metadata": {}})
+            out.append({"url": item.strip(), "metadata": {"priority": priority} if priority else {}})
             continue
         if isinstance(item, dict):
             if item.get("enabled") is False:
@@ -152,6 +100,8 @@ def _sources_from_list(val: Any) -> List[Dict[str, Any]]:
             if isinstance(u, str) and u.startswith("http"):
                 # Preserva o item inteiro como metadados (exceto a URL que já extraímos)
                 meta = item.copy()
+                if priority:
+                    meta.setdefault("priority", priority)
                 out.append({"url": u.strip(), "metadata": meta})
     return out
 
@@ -171,7 +121,10 @@ def load_sources() -> List[Dict[str, Any]]:
             "sources",
         ]
         for key in keys_to_check:
-            all_sources.extend(_sources_from_list(sources_raw.get(key, [])))
+            all_sources.extend(_sources_from_list(sources_raw.get(key, []), _LIST_PRIORITY.get(key)))
+        # Feeds descobertos nos sites oficiais (sources.discovered.json): depois
+        # das listas declaradas, para um feed já declarado manter os metadados dele.
+        all_sources.extend(discovered_feeds(sources_raw))
 
     # Deduplicação baseada na URL
     seen_urls = set()
@@ -234,10 +187,20 @@ async def _fetch_feed_url(
     metadata: Dict[str, Any],
     http_cache: dict,
     timeout: aiohttp.ClientTimeout,
+    max_entries: Optional[int] = None,
+    wait: RetryWait = _sleep_wait,
+    attempts: Optional[int] = None,
+    latency: Optional[List[float]] = None,
 ) -> Tuple[str, List[Any]]:
     """
     Busca UMA URL de feed com retentativas e evasão.
     Retorna (outcome, entries): _OK/_NOT_MODIFIED/_FAIL.
+    max_entries: itens que o engine vai olhar (None = todos); o parse devolve só
+    estes (o parser rápido nem lê além deles).
+    wait: toda espera (backoff, Retry-After, host bloqueado) passa por aqui; se
+    devolver False, a URL desiste com _FAIL.
+    latency: se dada, recebe os segundos do pedido que respondeu (200 ou 304),
+    do GET ao corpo lido — sem retentativas nem esperas pelo host.
     """
     is_valid, _ = validate_url(url)
     if not is_valid:
@@ -246,26 +209,31 @@ async def _fetch_feed_url(
     is_youtube = any(d in url for d in ["youtube.com", "youtu.be"])
     quer_proxy = metadata.get("use_proxy", False) or any(d in url for d in _PROXY_CANDIDATE_DOMAINS)
 
-    # `via_proxy` é o que ACONTECE, não o que se pretendia. Antes o log reportava a
-    # intenção e dizia "via proxy: True" mesmo com CLOUDFLARE_PROXY_URL vazio — foi o
-    # que mascarou, durante toda a investigação dos 429, o facto de o Reddit estar a
-    # ser batido diretamente do IP do VPS.
-    via_proxy = bool(quer_proxy and CLOUDFLARE_PROXY_URL)
-
-    request_url = url
-    if via_proxy:
-        request_url = f"{CLOUDFLARE_PROXY_URL}{url}"
-        scan_verbose(log, f"🛡️ [PROXY] Roteando via worker/Cloudflare → {url}")
-    else:
-        if quer_proxy:
-            scan_verbose(log, f"🌐 [BUSCA DIRETA] {url} (proxy pedido, mas CLOUDFLARE_PROXY_URL não está definido)")
-        else:
+    if quer_proxy and not proxy_pool.configured:
+        scan_verbose(log, f"🌐 [BUSCA DIRETA] {url} (proxy pedido, mas CLOUDFLARE_PROXY_URL(S) não está definido)")
+
+    epoch = feed_concurrency.epoch
+
+    # Sonda do disjuntor passa attempts=1: uma tentativa, sem pausas.
+    attempts = attempts or FEED_FETCH_MAX_ATTEMPTS
+    for attempt in range(attempts):
+        # Rota escolhida a cada tentativa: uma retentativa depois de um Worker
+        # falhar já sai pelo próximo mais barato do pool.
+        route = proxy_pool.choose(url, quer_proxy)
+        # `via_proxy` é o que ACONTECE, não o que se pretendia. Antes o log reportava a
+        # intenção e dizia "via proxy: True" mesmo com CLOUDFLARE_PROXY_URL vazio — foi o
+        # que mascarou, durante toda a investigação dos 429, o facto de o Reddit estar a
+        # ser batido diretamente do IP do VPS.
+        via_proxy = not route.direct
+        request_url = route.request_url(url)
+        if via_proxy:
+            scan_verbose(log, f"🛡️ [PROXY] Roteando via worker {route.name} → {url}")
+        elif proxy_pool.configured or not quer_proxy:
             scan_verbose(log, f"🌐 [BUSCA DIRETA] {url}")
-
-    # Só faz sentido respeitar orçamento de rate limit quando se bate na origem.
-    throttle_host = None if via_proxy else _throttle_key(url)
-
-    for attempt in range(FEED_FETCH_MAX_ATTEMPTS):
+        # Só faz sentido respeitar orçamento de rate limit quando se bate na origem.
+        throttle = route.direct
+        observado = False
+        pedido_em = time.monotonic()
         try:
             # UA de navegador por padrão (evita bloqueios que barram bots); fontes
             # que exigem UA de biblioteca HTTP sobrepõem via "user_agent".
@@ -279,9 +247,8 @@ async def _fetch_feed_url(
                 "Sec-Fetch-Site": "none",
                 "Upgrade-Insecure-Requests": "1"
             }
-            # Segredo do proxy só quando de fato roteando via worker (não vaza para a origem)
-            if via_proxy and CLOUDFLARE_PROXY_SECRET:
-                headers["X-Proxy-Secret"] = CLOUDFLARE_PROXY_SECRET
+            # Segredo do worker escolhido; a rota direta não manda nenhum (não vaza para a origem)
+            headers.update(route.headers())
 
             cache_headers = get_cache_headers(url, http_cache)
             if cache_headers:
@@ -290,82 +257,215 @@ async def _fetch_feed_url(
 
             scan_verbose(
                 log,
-                f"🚀 [HTTP GET] tentativa {attempt + 1}/{FEED_FETCH_MAX_ATTEMPTS} → {request_url}",
+                f"🚀 [HTTP GET] tentativa {attempt + 1}/{attempts} → {request_url}",
             )
-            if throttle_host:
-                await _acquire_host_slot(throttle_host)
-            slot_held = bool(throttle_host)
-            try:
-                async with session.get(request_url, headers=headers, timeout=timeout) as resp:
-                    scan_verbose(log, f"📥 [HTTP RESP] status {resp.status} ← {url}")
-                    if resp.status == 304:
-                        stats.cache_hits_total += 1
-                        scan_verbose(log, f"📦 [CACHE] 304 Not Modified (sem corpo novo): {url}")
-                        return _NOT_MODIFIED, []
-
-                    if resp.status >= 400:
-                        log.warning(f"HTTP {resp.status} para {url} (via proxy: {via_proxy})")
-
-                        # YouTube/Trackers às vezes retornam 404/403 quando detectam bot; tratamos como retryable
-                        retryable = resp.status in _FEED_RETRYABLE_STATUS or (is_youtube and resp.status == 404)
-
-                        # O servidor sabe melhor que o backoff fixo quanto se deve esperar.
-                        pedido = _retry_after_seconds(resp) if resp.status == 429 else 0.0
-                        if slot_held and throttle_host:
-                            _release_host_slot(throttle_host, pedido)
-                            slot_held = False
-
-                        if retryable and attempt < FEED_FETCH_MAX_ATTEMPTS - 1:
-                            delay = pedido or _delay_before_feed_retry(attempt)
-                            origem = "pedido pelo servidor" if pedido else "backoff configurado"
-                            scan_verbose(
-                                log,
-                                f"⏳ [RETRY] aguardando {delay:.1f}s ({origem}) antes da próxima tentativa → {url}",
-                            )
-                            await asyncio.sleep(delay)
+            if throttle:
+                # Host bloqueado (Retry-After de até 300s): a espera longa passa
+                # pelo `wait`, fora da vaga; o acquire só cobre o resto.
+                bloqueio = host_scheduler.delay(url)
+                if bloqueio > 0 and not await wait(bloqueio):
+                    scan_verbose(log, f"⌛ [PRAZO] host bloqueado {bloqueio:.0f}s além do prazo da varredura: {url}")
+                    return _FAIL, []
+                esperou = await host_scheduler.acquire(url)
+                if esperou > 0:
+                    scan_verbose(log, f"🚦 [THROTTLE] aguardou {esperou:.1f}s pelo orçamento de rate limit do host → {url}")
+            epoch = feed_concurrency.epoch
+            pedido_em = time.monotonic()
+            async with session.get(request_url, headers=headers, timeout=timeout) as resp:
+                scan_verbose(log, f"📥 [HTTP RESP] status {resp.status} ← {url}")
+                proxy_pool.observe(route, url, resp.status, time.monotonic() - pedido_em)
+                observado = True
+                if throttle:
+                    host_scheduler.observe(url, resp.status, resp.headers)
+                # Sinais para a concorrência adaptativa: 403/429 são congestionamento
+                # (o servidor pede menos carga); 2xx/3xx rápidos deixam-na crescer.
+                if resp.status in (403, 429):
+                    feed_concurrency.on_congestion(epoch, f"HTTP {resp.status} em {url}")
+                elif resp.status < 400:
+                    feed_concurrency.on_success(time.monotonic() - pedido_em)
+                if resp.status == 304:
+                    if latency is not None:
+                        latency.append(time.monotonic() - pedido_em)
+                    stats.cache_hits_total += 1
+                    scan_verbose(log, f"📦 [CACHE] 304 Not Modified (sem corpo novo): {url}")
+                    return _NOT_MODIFIED, []
+
+                if resp.status >= 400:
+                    log.warning(f"HTTP {resp.status} para {url} (via proxy: {via_proxy}, rota: {route.name})")
+
+                    # YouTube/Trackers às vezes retornam 404/403 quando detectam bot; tratamos como retryable
+                    retryable = resp.status in _FEED_RETRYABLE_STATUS or (is_youtube and resp.status == 404)
+
+                    # O servidor sabe melhor que o backoff fixo quanto se deve esperar.
+                    pedido = retry_after_seconds(resp.headers) if resp.status == 429 else 0.0
+
+                    if retryable and attempt < attempts - 1:
+                        if pedido and throttle:
+                            # O scheduler já bloqueou o host pelo tempo pedido: o
+                            # acquire da próxima tentativa faz a espera (e segura
+                            # também os outros feeds do mesmo host).
+                            scan_verbose(log, f"⏳ [RETRY] host bloqueado {pedido:.1f}s pelo servidor → {url}")
                             continue
-                        scan_verbose(log, f"❌ [ABORT] HTTP {resp.status} sem mais retries: {url}")
-                        return _FAIL, []
-
-                    update_cache_state(url, resp.headers, http_cache)
-                    scan_verbose(log, f"✅ [HTTP OK] corpo recebido; parse RSS/XML: {url}")
-                    text = await resp.text(errors="ignore")
-
-                    scan_verbose(log, f"🧩 [PARSE] feedparser em executor → {url}")
-                    loop = asyncio.get_running_loop()
-                    feed = await loop.run_in_executor(None, feedparser.parse, text)
-                    entries = getattr(feed, "entries", [])
-                    entries_count = len(entries)
-                    scan_verbose(log, f"🎯 [FEED PRONTO] {entries_count} item(ns) em {url}")
-                    if is_youtube:
-                        log.info(f"🎥 [YOUTUBE FEED] {entries_count} entrada(s) no Atom — {url}")
-                    return _OK, entries
-            finally:
-                # Liberta o host mesmo em exceção/timeout: um slot preso travaria
-                # todos os outros feeds do mesmo domínio até ao fim da varredura.
-                if slot_held and throttle_host:
-                    _release_host_slot(throttle_host)
+                        delay = pedido or _delay_before_feed_retry(attempt)
+                        origem = "pedido pelo servidor" if pedido else "backoff configurado"
+                        scan_verbose(
+                            log,
+                            f"⏳ [RETRY] aguardando {delay:.1f}s ({origem}) antes da próxima tentativa → {url}",
+                        )
+                        if not await wait(delay):
+                            scan_verbose(log, f"⌛ [PRAZO] retentativa em {delay:.0f}s passaria do prazo: {url}")
+                            return _FAIL, []
+                        continue
+                    scan_verbose(log, f"❌ [ABORT] HTTP {resp.status} sem mais retries: {url}")
+                    return _FAIL, []
+
+                update_cache_state(url, resp.headers, http_cache)
+                body = await resp.read()
+                if latency is not None:
+                    latency.append(time.monotonic() - pedido_em)
+                fingerprint = body_fingerprint(body, FEED_FINGERPRINT_STRIP_VOLATILE)
+                if fingerprint_matches(url, fingerprint, http_cache):
+                    stats.fingerprint_hits_total += 1
+                    scan_verbose(log, f"📦 [CACHE] corpo idêntico ao anterior (200 sem ETag útil): {url}")
+                    return _NOT_MODIFIED, []
+                scan_verbose(log, f"✅ [HTTP OK] corpo recebido; parse RSS/XML: {url}")
+                entries, parser, parse_sec = await parse_pool.parse(
+                    body, max_entries, FEED_FAST_PARSER, resp.headers.get("Content-Type", "")
+                )
+                scan_verbose(
+                    log,
+                    f"🧩 [PARSE] {parser} em {parse_sec * 1000:.0f} ms "
+                    f"(fila do pool: {parse_pool.queue_depth}) → {url}",
+                )
+                entries_count = len(entries)
+                scan_verbose(log, f"🎯 [FEED PRONTO] {entries_count} item(ns) em {url}")
+                if is_youtube:
+                    log.info(f"🎥 [YOUTUBE FEED] {entries_count} entrada(s) no Atom — {url}")
+                # Só grava depois do parse: um corpo que quebrou o parser não
+                # pode virar "sem novidade" na próxima varredura.
+                update_fingerprint(url, fingerprint, http_cache)
+                return _OK, entries
 
         except Exception as e:
             scan_verbose(
                 log,
                 f"⚠️ [EXCEÇÃO] {url} (tentativa {attempt + 1}): {type(e).__name__}: {e}",
             )
-            if attempt < FEED_FETCH_MAX_ATTEMPTS - 1:
+            if not observado:
+                # Sem resposta (timeout, conexão recusada): falha da rota, não só do destino.
+                proxy_pool.observe(route, url, None, time.monotonic() - pedido_em)
+            if isinstance(e, asyncio.TimeoutError):
+                feed_concurrency.on_congestion(epoch, f"timeout em {url}")
+            if attempt < attempts - 1:
                 delay = _delay_before_feed_retry(attempt)
                 scan_verbose(log, f"⏳ [RETRY EXCEÇÃO] {delay:.1f}s antes da próxima → {url}")
-                await asyncio.sleep(delay)
+                if not await wait(delay):
+                    scan_verbose(log, f"⌛ [PRAZO] retentativa em {delay:.0f}s passaria do prazo: {url}")
+                    return _FAIL, []
             else:
-                log.error(f"🔥 [FALHA TOTAL] Desistindo de {url} após {FEED_FETCH_MAX_ATTEMPTS} tentativas.")
+                log.error(f"🔥 [FALHA TOTAL] Desistindo de {url} após {attempts} tentativa(s).")
 
     return _FAIL, []
 
 
-async def fetch_feed(session: aiohttp.ClientSession, source_obj: Dict[str, Any], http_cache: dict) -> Optional[Tuple[str, List[Any]]]:
+async def _hedged_fetch(
+    session: aiohttp.ClientSession,
+    primary: str,
+    fallback: str,
+    metadata: Dict[str, Any],
+    http_cache: dict,
+    timeout: aiohttp.ClientTimeout,
+    max_entries: Optional[int],
+    wait: RetryWait,
+    hedge_after: float,
+    hedge_slot: SlotFactory = nullcontext,
+    latency: Optional[List[float]] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Principal e 1º fallback em corrida: o fallback só sai se a principal não
+    responder em `hedge_after` segundos.
+
+    PROPÓSITO DE NEGÓCIO:
+        Em sequência, o fallback de uma principal instável (gunpla101.com) só era
+        tentado depois de FEED_FETCH_MAX_ATTEMPTS tentativas, das pausas entre elas
+        e de timeouts de até 120s. Disparado em paralelo a partir do p90 da fonte,
+        ele cobre a cauda lenta sem dobrar o tráfego das buscas normais.
+
+    INVARIANTES DO DOMÍNIO:
+        - A primeira resposta válida (200 ou 304) vence; a outra busca é cancelada.
+          Se as duas terminam juntas, vale a principal.
+        - Uma falha não decide a corrida: espera-se a outra.
+        - O fallback pega a sua própria vaga (`hedge_slot`) antes de sair e
+          espera as suas pausas pelo mesmo `wait` da principal: cada busca em
+          voo conta no limite adaptativo e nas vagas reservadas por pista.
+        - `latency` só recebe a latência da principal (o p90 do hedge).
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        As duas falharam: devolve (_FAIL, []). Cancelamento cancela as duas.
+    """
+    async def _fallback() -> Tuple[str, List[Any]]:
+        async with hedge_slot():
+            return await _fetch_feed_url(session, fallback, metadata, http_cache, timeout, max_entries, wait)
+
+    principal = asyncio.create_task(
+        _fetch_feed_url(session, primary, metadata, http_cache, timeout, max_entries, wait, latency=latency)
+    )
+    pendentes = {principal}
+    try:
+        done, pendentes = await asyncio.wait(pendentes, timeout=hedge_after)
+        if not done:
+            stats.hedges_started += 1
+            scan_verbose(
+                log,
+                f"🪁 [HEDGE] {primary} sem resposta em {hedge_after:.1f}s; "
+                f"fallback em paralelo: {fallback}",
+            )
+            pendentes.add(asyncio.create_task(_fallback()))
+        while True:
+            for task in sorted(done, key=lambda t: t is not principal):
+                try:
+                    outcome, entries = task.result()
+                except Exception:
+                    outcome, entries = _FAIL, []
+                if outcome != _FAIL:
+                    if task is not principal:
+                        stats.hedges_won += 1
+                        scan_verbose(log, f"🪁 [HEDGE] fallback venceu a principal: {fallback}")
+                    return outcome, entries
+            if not pendentes:
+                return _FAIL, []
+            done, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pendentes:
+            task.cancel()
+        if pendentes:
+            await asyncio.gather(*pendentes, return_exceptions=True)
+
+
+async def fetch_feed(
+    session: aiohttp.ClientSession,
+    source_obj: Dict[str, Any],
+    http_cache: dict,
+    wait: RetryWait = _sleep_wait,
+    failures: Optional[Set[str]] = None,
+    hedge_after: Optional[float] = None,
+    probe: bool = False,
+    hedge_slot: SlotFactory = nullcontext,
+    latencies: Optional[Dict[str, float]] = None,
+) -> Optional[Tuple[str, List[Any]]]:
     """
     Busca e processa um feed: aplica first_request_delay_sec, tenta a URL principal
     e, em caso de falha, os fallbacks configurados. Mantém a URL canônica como chave
     (dedup/estatísticas), independentemente de qual fallback respondeu.
+    Todas as esperas (atraso inicial e retentativas) passam por `wait`.
+    None é devolvido tanto para 304 quanto para falha; quem precisa distinguir
+    passa `failures`, que recebe a URL canônica dos feeds que falharam.
+    hedge_after: se dado (e houver fallback), o 1º fallback corre em paralelo com
+    a principal a partir desses segundos — ver `_hedged_fetch`; `hedge_slot` dá
+    a vaga de concorrência desse fallback.
+    probe: sonda do disjuntor (fonte em quarentena) — uma tentativa por URL, sem hedge.
+    latencies: se dado, recebe {URL canônica: segundos do pedido à principal que
+    respondeu}; fallbacks e falhas não entram (é a base do p90 do hedge).
     """
     canonical_url = source_obj["url"]
     metadata = source_obj.get("metadata", {})
@@ -379,14 +479,47 @@ async def fetch_feed(session: aiohttp.ClientSession, source_obj: Dict[str, Any],
     first_delay = _first_delay_seconds(metadata)
     if first_delay > 0:
         scan_verbose(log, f"⏱️ [FIRST DELAY] aguardando {first_delay:.1f}s antes de {canonical_url}")
-        await asyncio.sleep(first_delay)
+        if not await wait(first_delay):
+            scan_verbose(log, f"⌛ [PRAZO] atraso inicial passaria do prazo da varredura: {canonical_url}")
+            stats.feeds_failed += 1
+            if failures is not None:
+                failures.add(canonical_url)
+            return None
 
     urls_to_try = [canonical_url] + _fallback_urls(metadata)
 
-    for i, candidate in enumerate(urls_to_try):
+    # Mesma janela que o engine aplica em process_feed (chave: URL canônica).
+    if "youtube.com" in canonical_url or "youtu.be" in canonical_url:
+        max_entries = MAX_YOUTUBE_ENTRIES_PER_FEED if MAX_YOUTUBE_ENTRIES_PER_FEED > 0 else None
+    else:
+        max_entries = MAX_ENTRIES_PER_FEED
+
+    attempts = 1 if probe else None
+    start = 0
+    latencia_principal: List[float] = []
+    if hedge_after is not None and not probe and len(urls_to_try) > 1:
+        outcome, entries = await _hedged_fetch(
+            session, urls_to_try[0], urls_to_try[1], metadata, http_cache, timeout, max_entries, wait,
+            hedge_after, hedge_slot, latencia_principal,
+        )
+        if latencia_principal and latencies is not None:
+            latencies[canonical_url] = latencia_principal[-1]
+        if outcome == _OK:
+            return canonical_url, entries
+        if outcome == _NOT_MODIFIED:
+            return None
+        # Principal e 1º fallback já falharam: segue com os fallbacks restantes.
+        start = 2
+
+    for i, candidate in enumerate(urls_to_try[start:], start):
         if i > 0:
             scan_verbose(log, f"↩️ [FALLBACK] tentando URL alternativa {i}/{len(urls_to_try) - 1} para {canonical_url}: {candidate}")
-        outcome, entries = await _fetch_feed_url(session, candidate, metadata, http_cache, timeout)
+        outcome, entries = await _fetch_feed_url(
+            session, candidate, metadata, http_cache, timeout, max_entries, wait, attempts,
+            latency=latencia_principal if i == 0 else None,
+        )
+        if i == 0 and latencia_principal and latencies is not None:
+            latencies[canonical_url] = latencia_principal[-1]
         if outcome == _OK:
             return canonical_url, entries
         if outcome == _NOT_MODIFIED:
@@ -396,4 +529,6 @@ async def fetch_feed(session: aiohttp.ClientSession, source_obj: Dict[str, Any],
 
     # Esgotou principal + fallbacks
     stats.feeds_failed += 1
+    if failures is not None:
+        failures.add(canonical_url)
     return None
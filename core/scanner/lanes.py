@@ -0,0 +1,54 @@
+"""
+Lanes module - Pistas de prioridade das fontes e tempo até o post por pista.
+"""
+import logging
+from statistics import median
+from typing import Any, Dict, List, Mapping
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+# Ordem de despacho: a pista 0 sai primeiro e tem vagas reservadas na concorrência.
+LANES = ("high", "normal", "low")
+HIGH, NORMAL, LOW = range(len(LANES))
+
+
+def source_lane(src: Mapping[str, Any]) -> int:
+    """
+    Pista da fonte pelo "priority" do sources.json ("high", "normal", "low").
+
+    Ausente, desconhecido ou de tipo errado cai em "normal": uma fonte mal
+    escrita não pode furar a fila das oficiais.
+    """
+    metadata = src.get("metadata") or {}
+    raw = metadata.get("priority") if isinstance(metadata, dict) else None
+    if isinstance(raw, str) and raw.strip().lower() in LANES:
+        return LANES.index(raw.strip().lower())
+    return NORMAL
+
+
+def lane_summary(samples: Mapping[int, List[float]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Tempo até o post por pista: {"high": {"posts", "first_sec", "median_sec"}, ...}.
+
+    `samples` são os segundos, desde o início da varredura, em que o Discord
+    confirmou cada envio de um feed daquela pista. Pista sem envio fica de fora.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for lane, name in enumerate(LANES):
+        vals = samples.get(lane) or []
+        if not vals:
+            continue
+        out[name] = {
+            "posts": len(vals),
+            "first_sec": round(min(vals), 1),
+            "median_sec": round(median(vals), 1),
+        }
+    return out
+
+
+def format_lane_summary(summary: Mapping[str, Mapping[str, Any]]) -> str:
+    """`high: 3 envio(s), 1º 0.8s, mediana 2.1s | normal: …` para o log da varredura."""
+    return " | ".join(
+        f"{name}: {item['posts']} envio(s), 1º {item['first_sec']:.1f}s, mediana {item['median_sec']:.1f}s"
+        for name, item in summary.items()
+    )
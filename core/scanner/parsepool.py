@@ -0,0 +1,188 @@
+"""
+Parse pool module - Parse de feeds num pool de processos dedicado (bytes in, entradas compactas out).
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import feedparser
+from feedparser import FeedParserDict
+
+from settings import FEED_PARSE_WORKERS, FEED_PARSE_QUEUE_MAX
+from utils.exceptions import UnsupportedFeedFormatError
+
+from .fastfeed import parse_top_entries
+from .logutil import scan_verbose
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+# Campos que o engine, o processor e o notifier leem de uma entrada. Só estes
+# atravessam a fronteira do processo: o FeedParserDict completo (content,
+# *_detail, tags, links…) custa mais a serializar do que a parsear.
+_ENTRY_FIELDS = (
+    "title", "link", "id", "summary",
+    "published", "published_parsed", "updated", "updated_parsed",
+    "media_thumbnail", "itunes_image",
+)
+
+
+def _compact(entry: Any) -> Dict[str, Any]:
+    out = {}
+    for field in _ENTRY_FIELDS:
+        value = entry.get(field)
+        if value in (None, "", []):
+            continue
+        if field == "media_thumbnail":
+            value = [{k: v for k, v in t.items() if k in ("url", "width", "height")} for t in value]
+        out[field] = value
+    return out
+
+
+def parse_feed_bytes(
+    body: bytes,
+    limit: Optional[int],
+    fast: bool,
+    content_type: str = "",
+) -> Tuple[List[Dict[str, Any]], str, float]:
+    """
+    Parseia o corpo bruto e devolve (entradas compactas, parser usado, segundos).
+
+    Roda no processo worker: o feedparser recebe bytes e faz a detecção de
+    encoding (BOM, declaração XML, charset do Content-Type). As entradas voltam
+    como dicts simples só com _ENTRY_FIELDS, cortadas em `limit` (None = todas).
+    """
+    started = time.perf_counter()
+    entries = None
+    parser = "feedparser"
+    if fast:
+        try:
+            entries = parse_top_entries(body, limit)
+            parser = "rápido"
+        except UnsupportedFeedFormatError:
+            entries = None
+    if entries is None:
+        headers = {"content-type": content_type} if content_type else None
+        entries = feedparser.parse(body, response_headers=headers).entries
+    if limit is not None:
+        entries = entries[:limit]
+    return [_compact(e) for e in entries], parser, time.perf_counter() - started
+
+
+class FeedParsePool:
+    """
+    Pool de processos, de tamanho fixo, para o parse de feeds e das páginas do HTML Monitor.
+
+    PROPÓSITO DE NEGÓCIO:
+        O feedparser segura o GIL durante quase todo o parse. No executor de
+        threads padrão ele disputava com a tradução (`run_in_executor` do
+        translator) e com o heartbeat do gateway do discord.py — numa varredura
+        de ~65 feeds o loop chegava a engasgar. Em processos à parte, o loop só
+        espera o resultado. O mesmo vale para o BeautifulSoup das 122 páginas
+        oficiais do HTML Monitor, que usam os mesmos processos via `run`.
+
+    INVARIANTES DO DOMÍNIO:
+        - No máximo FEED_PARSE_WORKERS processos e FEED_PARSE_QUEUE_MAX corpos
+          em voo (na fila + em parse); quem passar disso espera a vez, sem
+          acumular bytes de feeds na memória.
+        - O pool nasce na primeira chamada (contexto spawn: o worker não herda
+          sockets nem o estado do bot) e vive até `shutdown()`.
+        - FEED_PARSE_WORKERS=0 desliga o pool: o parse vai para o executor de
+          threads, com a mesma função e o mesmo resultado.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Pool quebrado (worker morto, spawn negado): o feed é parseado no executor
+        de threads, o pool é descartado e recriado na próxima chamada.
+    """
+
+    def __init__(self, workers: int = FEED_PARSE_WORKERS, queue_max: int = FEED_PARSE_QUEUE_MAX):
+        self.workers = max(0, workers)
+        self._queue_max = max(1, queue_max)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.parsed = 0
+        self.parse_seconds_total = 0.0
+        self.parse_seconds_max = 0.0
+        self.fallbacks = 0
+
+    def _ensure_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            ctx = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+            log.info(f"🧮 Pool de parse de feeds iniciado ({self.workers} processo(s)).")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Roda `func(*args)` num processo do pool, respeitando FEED_PARSE_QUEUE_MAX.
+
+        `func` precisa ser uma função de módulo (o spawn a importa pelo nome) e
+        args/resultado, serializáveis. Também usado pelo HTML Monitor para a
+        limpeza e o hash das páginas (core/html_clean.py).
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self._queue_max)
+            self._slots_loop = loop
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            async with self._slots:
+                executor = self._ensure_executor()
+                try:
+                    return await loop.run_in_executor(executor, func, *args)
+                except BrokenProcessPool as e:
+                    log.warning(f"Pool de parse quebrado ({e}); parse desta vez em thread, pool será recriado.")
+                    self.fallbacks += 1
+                    self._discard_executor()
+                    return await loop.run_in_executor(None, func, *args)
+        finally:
+            self.queue_depth -= 1
+
+    async def parse(
+        self,
+        body: bytes,
+        limit: Optional[int],
+        fast: bool,
+        content_type: str = "",
+    ) -> Tuple[List[Any], str, float]:
+        """Parseia fora do event loop; devolve (entradas FeedParserDict, parser, segundos)."""
+        compact, parser, seconds = await self.run(parse_feed_bytes, body, limit, fast, content_type)
+        self.parsed += 1
+        self.parse_seconds_total += seconds
+        self.parse_seconds_max = max(self.parse_seconds_max, seconds)
+        return [FeedParserDict(e) for e in compact], parser, seconds
+
+    def _discard_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores acumulados (para logs de varredura e /status)."""
+        media_ms = (self.parse_seconds_total / self.parsed * 1000) if self.parsed else 0.0
+        return {
+            "workers": self.workers,
+            "parsed": self.parsed,
+            "avg_ms": round(media_ms, 1),
+            "max_ms": round(self.parse_seconds_max * 1000, 1),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "fallbacks": self.fallbacks,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            scan_verbose(log, "🧮 Encerrando pool de parse de feeds.")
+        self._discard_executor()
+
+
+parse_pool = FeedParsePool()
@@ -0,0 +1,182 @@
+"""
+Planner module - Ordem de busca por duração esperada (LPT) e makespan previsto.
+"""
+import heapq
+import logging
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set
+
+from .lanes import NORMAL
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+# Peso da busca mais recente nas médias móveis (EWMA) de cada fonte.
+_ALPHA = 0.3
+# Fonte sem histórico: uma busca típica (s), mais o first_request_delay_sec dela.
+_PRIOR_SEC = 2.0
+# Latências da URL principal guardadas por fonte, para o p90 do hedge.
+_RECENT_OK = 20
+# Abaixo disto o p90 ainda é ruído: o hedge usa o atraso padrão.
+_MIN_P90_SAMPLES = 5
+
+
+def _num(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def expected_seconds(item: Any, metadata: Mapping[str, Any]) -> float:
+    """
+    Duração esperada da busca de uma fonte, em segundos.
+
+    Com histórico: (1 - taxa de falha) × média das buscas que deram certo +
+    taxa de falha × média das que falharam — uma fonte que falha metade das vezes
+    por timeout de 30s pesa como tal. Sem histórico: _PRIOR_SEC mais o
+    first_request_delay_sec da fonte.
+    """
+    if not isinstance(item, dict) or not item.get("checks"):
+        return _PRIOR_SEC + max(0.0, _num(metadata.get("first_request_delay_sec")))
+    fail_rate = min(1.0, max(0.0, _num(item.get("fail_rate"))))
+    ok_sec = _num(item.get("ok_sec"), _num(item.get("fail_sec"), _PRIOR_SEC))
+    fail_sec = _num(item.get("fail_sec"), ok_sec)
+    return (1.0 - fail_rate) * ok_sec + fail_rate * fail_sec
+
+
+def update_source_stats(
+    table: Any,
+    durations: Mapping[str, float],
+    failed: Set[str],
+    now: float,
+    keep: Optional[Set[str]] = None,
+    latencies: Optional[Mapping[str, float]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Nova tabela de latência/falha por fonte (state["source_stats"]) depois de uma rodada.
+
+    PROPÓSITO DE NEGÓCIO:
+        O tempo de parede da varredura é ditado por meia dúzia de fontes lentas
+        (timeout longo, first_request_delay_sec, fallbacks). Declaradas no fim do
+        sources.json, começavam por último e a varredura esperava por elas sozinha.
+        Guardando quanto cada fonte costuma demorar, o engine as começa primeiro.
+
+    INVARIANTES DO DOMÍNIO:
+        - `durations`: segundos de parede de cada busca, da vaga ao resultado
+          (esperas de retentativa incluídas — é isso que pesa no makespan).
+        - Buscas que deram certo e que falharam têm médias separadas (`ok_sec`,
+          `fail_sec`); `fail_rate` é a média móvel de 0/1. Todas EWMA com _ALPHA.
+        - `recent_ok`: as últimas _RECENT_OK latências da URL principal
+          (`latencies`: só o pedido que respondeu, sem retentativas, esperas
+          pelo host nem fallbacks) — o p90 do hedge mede a resposta da
+          principal, não a cauda das buscas retentadas.
+        - Cada item: {"ok_sec", "fail_sec", "fail_rate", "checks", "failures",
+          "last_sec", "recent_ok", "updated_at"}.
+        - keep: todas as fontes do sources.json; as que saíram dele são descartadas.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Não levanta exceção. Tabela persistida corrompida é tratada como vazia.
+    """
+    old = table if isinstance(table, dict) else {}
+    new = {url: dict(item) for url, item in old.items() if isinstance(item, dict)}
+    if keep is not None:
+        new = {url: item for url, item in new.items() if url in keep}
+    for url, seconds in durations.items():
+        item = new.setdefault(url, {"checks": 0, "failures": 0, "fail_rate": 0.0})
+        falhou = url in failed
+        campo = "fail_sec" if falhou else "ok_sec"
+        anterior = item.get(campo)
+        item[campo] = round(
+            seconds if anterior is None else (1 - _ALPHA) * _num(anterior, seconds) + _ALPHA * seconds, 2
+        )
+        item["fail_rate"] = round(
+            (1 - _ALPHA) * _num(item.get("fail_rate")) + _ALPHA * (1.0 if falhou else 0.0), 3
+        )
+        item["checks"] = int(_num(item.get("checks"))) + 1
+        item["failures"] = int(_num(item.get("failures"))) + (1 if falhou else 0)
+        item["last_sec"] = round(seconds, 2)
+        latencia = (latencies or {}).get(url)
+        if not falhou and latencia is not None:
+            recentes = item.get("recent_ok") if isinstance(item.get("recent_ok"), list) else []
+            item["recent_ok"] = (recentes + [round(latencia, 2)])[-_RECENT_OK:]
+        item["updated_at"] = now
+    return new
+
+
+def latency_p90(item: Any) -> Optional[float]:
+    """p90 das latências recentes da principal; None com menos de _MIN_P90_SAMPLES."""
+    recentes = item.get("recent_ok") if isinstance(item, dict) else None
+    if not isinstance(recentes, list):
+        return None
+    valores = sorted(_num(v) for v in recentes)
+    if len(valores) < _MIN_P90_SAMPLES:
+        return None
+    return valores[min(len(valores) - 1, int(0.9 * len(valores)))]
+
+
+def hedge_delay(item: Any, metadata: Mapping[str, Any], floor: float, default: float) -> Optional[float]:
+    """
+    Segundos de espera pela URL principal antes de disparar o 1º fallback em paralelo.
+
+    None quando a fonte não pediu hedge (`"hedge": true` no sources.json) ou não
+    tem fallback. Com histórico, o p90 da fonte (nunca abaixo de `floor`); sem, `default`.
+    """
+    if metadata.get("hedge") is not True or not metadata.get("fallbacks"):
+        return None
+    p90 = latency_p90(item)
+    return max(floor, p90) if p90 is not None else default
+
+
+def plan_order(
+    sources: List[Dict[str, Any]], table: Any, lane_of: Mapping[str, int]
+) -> List[Dict[str, Any]]:
+    """
+    Longest-expected-first (LPT) dentro de cada pista de prioridade.
+
+    A pista continua a mandar (uma oficial rápida sai antes de um blog lento);
+    dentro dela, a fonte mais demorada começa primeiro, e as rápidas preenchem
+    as vagas no fim. Empate mantém a ordem do sources.json.
+    """
+    stats_table = table if isinstance(table, dict) else {}
+    keyed = [
+        (
+            lane_of.get(src["url"], NORMAL),
+            -expected_seconds(stats_table.get(src["url"]), src.get("metadata") or {}),
+            i,
+            src,
+        )
+        for i, src in enumerate(sources)
+    ]
+    keyed.sort(key=lambda t: t[:3])
+    return [t[3] for t in keyed]
+
+
+def predict_makespan(
+    sources: List[Dict[str, Any]],
+    table: Any,
+    slots: int,
+    host_key: Callable[[str], str],
+    host_gap: float,
+) -> float:
+    """
+    Makespan previsto da fase de busca se as fontes forem despachadas nesta ordem.
+
+    Simula `slots` buscas simultâneas (list scheduling): cada fonte pega a vaga
+    que libera primeiro, mas não começa antes de `host_gap` segundos depois da
+    anterior do mesmo host — a cortesia por host do HostScheduler. Estimativa:
+    o limite adaptativo muda durante a varredura e a simulação usa o do início.
+    """
+    stats_table = table if isinstance(table, dict) else {}
+    livres = [0.0] * max(1, int(slots))
+    heapq.heapify(livres)
+    host_ready: Dict[str, float] = {}
+    makespan = 0.0
+    for src in sources:
+        url = src["url"]
+        duracao = expected_seconds(stats_table.get(url), src.get("metadata") or {})
+        host = host_key(url)
+        inicio = max(heapq.heappop(livres), host_ready.get(host, 0.0))
+        host_ready[host] = inicio + host_gap
+        fim = inicio + duracao
+        heapq.heappush(livres, fim)
+        makespan = max(makespan, fim)
+    return makespan
@@ -1,6 +1,8 @@
 """
 Processor module - Handles link sanitization, date parsing, and deduplication.
 """
+import calendar
+import hashlib
 import logging
 import time
 from datetime import datetime, timezone
@@ -89,3 +91,95 @@ def is_recent(entry_dt: Optional[datetime], days_limit: int = 7) -> bool:
     if not entry_dt: return True
     now = datetime.now(entry_dt.tzinfo) if entry_dt.tzinfo else datetime.now()
     return (now - entry_dt).days <= days_limit
+
+
+# ---------------------------------------------------------------------------
+# Marcas de água por feed (state["feed_marks"])
+# ---------------------------------------------------------------------------
+# Formato por URL canônica do feed:
+#   {"guid": <chave da entrada mais nova>, "ts": <epoch dela ou null>,
+#    "ordered": <feed em ordem cronológica decrescente?>,
+#    "seen": [<hash curto de cada chave da janela>]}   # só quando ordered=False
+_SEEN_DIGEST_BYTES = 6
+
+
+def entry_key(entry: Any) -> str:
+    """Identidade estável da entrada: GUID do feed, senão o link limpo."""
+    key = entry.get("id") or entry.get("guid") or ""
+    return str(key) if key else sanitize_link(entry.get("link", "") or "")
+
+
+def _seen_digest(key: str) -> str:
+    return hashlib.blake2b(key.encode("utf-8", "replace"), digest_size=_SEEN_DIGEST_BYTES).hexdigest()
+
+
+def _entry_ts(entry: Any) -> Optional[float]:
+    # published_parsed/updated_parsed primeiro: o feedparser já normalizou para
+    # UTC tanto o ISO 8601 do Atom quanto o RFC 822 do <pubDate> do RSS 2.0, que
+    # o isoparse de parse_entry_dt não entende (todo RSS 2.0 virava "sem ordem").
+    st = entry.get("published_parsed") or entry.get("updated_parsed")
+    if st:
+        try:
+            return float(calendar.timegm(tuple(st)[:6]))
+        except (TypeError, ValueError, OverflowError):
+            pass
+    dt = parse_entry_dt(entry)
+    if dt is None:
+        return None
+    try:
+        return dt.timestamp()
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def unseen_entries(entries: List[Any], mark: Any) -> List[Any]:
+    """
+    Entradas da janela que a marca do feed ainda não viu, na ordem do feed.
+
+    Feed ordenado: para na primeira entrada já vista (a chave da marca, ou uma
+    data anterior à dela) — o resto da janela é mais antigo. Feed sem ordem
+    confiável: filtra pelo conjunto compacto de hashes da janela anterior.
+    Sem marca (feed novo ou limpo pelo /clean_state), devolve a janela inteira.
+    """
+    if not isinstance(mark, dict) or not mark.get("guid"):
+        return entries
+
+    if not mark.get("ordered"):
+        seen = set(mark.get("seen") or [])
+        return [e for e in entries if _seen_digest(entry_key(e)) not in seen]
+
+    mark_ts = mark.get("ts")
+    out: List[Any] = []
+    for entry in entries:
+        if entry_key(entry) == mark["guid"]:
+            break
+        if mark_ts is not None:
+            ts = _entry_ts(entry)
+            if ts is not None and ts < mark_ts:
+                break
+        out.append(entry)
+    return out
+
+
+def build_feed_mark(entries: List[Any]) -> Optional[Dict[str, Any]]:
+    """
+    Marca de água para a janela processada (`entries` na ordem do feed).
+
+    O feed conta como ordenado se todas as entradas têm data e as datas nunca
+    sobem ao descer a lista; senão guarda o conjunto de hashes da janela (6
+    bytes por entrada), que é tudo o que o feed ainda pode voltar a mostrar.
+    """
+    if not entries:
+        return None
+    stamps = [_entry_ts(e) for e in entries]
+    ordered = all(ts is not None for ts in stamps) and all(
+        a >= b for a, b in zip(stamps, stamps[1:])
+    )
+    mark: Dict[str, Any] = {
+        "guid": entry_key(entries[0]),
+        "ts": stamps[0],
+        "ordered": ordered,
+    }
+    if not ordered:
+        mark["seen"] = [_seen_digest(entry_key(e)) for e in entries]
+    return mark
@@ -0,0 +1,95 @@
+"""
+Retry lane module - Agenda de retentativa, entre varreduras, dos feeds que falharam.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Set
+
+from settings import FEED_RETRY_BASE_MIN, FEED_RETRY_MAX_ATTEMPTS
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+
+def _retry_delay_sec(attempts: int) -> float:
+    """Espera antes da retentativa seguinte: base, 2×base, 4×base…"""
+    return FEED_RETRY_BASE_MIN * 60.0 * (2 ** max(0, attempts))
+
+
+def update_retry_queue(
+    queue: Any,
+    attempted: Iterable[str],
+    failed: Set[str],
+    now: float,
+    full_scan: bool,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Nova fila de retentativa (state["retry_queue"]) depois de uma varredura.
+
+    PROPÓSITO DE NEGÓCIO:
+        Com LOOP_MINUTES=720, um feed que falhou (429 do Reddit, timeout do
+        Nyaa) só era lido de novo 12h depois — as notícias chegavam meio dia
+        atrasadas ou já fora da janela de `is_recent`. A fila diz à pista de
+        retentativa quais feeds, e só esses, voltar a buscar antes disso.
+
+    INVARIANTES DO DOMÍNIO:
+        - Varredura completa: a fila passa a ser EXATAMENTE os feeds que falharam
+          nela (a contagem recomeça); quem falhou antes e agora respondeu sai.
+        - Rodada parcial (pista de retentativa, lote da cadência): feed que
+          respondeu (200 ou 304) sai; feed que falhou de novo ganha espera
+          dobrada, até FEED_RETRY_MAX_ATTEMPTS tentativas — depois fica para a
+          próxima vez que vencer; falha nova entra do zero.
+        - Feeds da fila que não foram tentados nesta rodada ficam como estavam.
+        - Cada item: {"attempts", "next_at" (epoch), "failed_at" (epoch)}.
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Não levanta exceção. Fila persistida corrompida é tratada como vazia.
+    """
+    old = queue if isinstance(queue, dict) else {}
+    if full_scan:
+        return {
+            url: {"attempts": 0, "next_at": now + _retry_delay_sec(0), "failed_at": now}
+            for url in sorted(failed)
+        }
+
+    new = {url: item for url, item in old.items() if isinstance(item, dict)}
+    for url in attempted:
+        if url not in failed:
+            new.pop(url, None)
+            continue
+        if url not in new:
+            # Falha nova num lote parcial (cadência): entra na fila do zero.
+            new[url] = {"attempts": 0, "next_at": now + _retry_delay_sec(0), "failed_at": now}
+            continue
+        item = new[url]
+        try:
+            attempts = int(item.get("attempts", 0)) + 1
+        except (TypeError, ValueError):
+            attempts = 1
+        if attempts >= FEED_RETRY_MAX_ATTEMPTS:
+            new.pop(url, None)
+            log.info(
+                f"♻️ [RETRY LANE] {url} falhou {attempts}x seguidas; fica para a próxima varredura completa."
+            )
+            continue
+        new[url] = {
+            "attempts": attempts,
+            "next_at": now + _retry_delay_sec(attempts),
+            "failed_at": item.get("failed_at", now),
+        }
+    return new
+
+
+def due_retries(queue: Any, now: float) -> List[str]:
+    """URLs da fila cuja retentativa já venceu (em ordem de vencimento)."""
+    if not isinstance(queue, dict):
+        return []
+    vencidos = []
+    for url, item in queue.items():
+        if not isinstance(item, dict):
+            continue
+        try:
+            next_at = float(item.get("next_at", 0))
+        except (TypeError, ValueError):
+            next_at = 0.0
+        if next_at <= now:
+            vencidos.append((next_at, url))
+    return [url for _, url in sorted(vencidos)]
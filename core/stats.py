@@ -11,10 +11,30 @@ class BotStats:
         """Inicializa contadores de estatísticas."""
         self.start_time = datetime.now()
         self.scans_completed = 0
+        # Lotes da cadência adaptativa (só as fontes vencidas): contados à parte
+        # para não inflar o número de varreduras.
+        self.cadence_batches = 0
         self.news_posted = 0
         self.feeds_failed = 0
         self.last_scan_time = None
         self.cache_hits_total = 0
+        # Corpo idêntico ao anterior num 200 (servidor sem ETag): conta à parte
+        # dos 304 para dar para ver quanto cada camada economiza.
+        self.fingerprint_hits_total = 0
+        # HTML Monitor: 304 do GET condicional e corpo bruto idêntico (digest),
+        # cada um poupando o parse da página.
+        self.html_not_modified_total = 0
+        self.html_digest_hits_total = 0
+        # Sites vigiados pelo sitemap (core/discovery.py) sem mudança na área:
+        # a página nem chega a ser baixada.
+        self.html_sitemap_unchanged_total = 0
+        # Tempo até o post por pista de prioridade na última rodada com envios
+        # ({"high": {"posts", "first_sec", "median_sec"}, ...}).
+        self.lane_time_to_post = {}
+        # Hedge (fallback em paralelo após o p90 da principal): disparados e
+        # vencidos pelo fallback.
+        self.hedges_started = 0
+        self.hedges_won = 0
     
     @property
     def uptime(self) -> timedelta:
@@ -0,0 +1,109 @@
+"""
+Subscriptions module - Índice categoria → guilds assinantes para o fan-out do scanner.
+"""
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from core.filters import LEGACY_FILTER_ALIASES
+
+log = logging.getLogger("MaftyIntel.scanner")
+
+
+class SubscriptionIndex:
+    """
+    Quem recebe o quê, derivado do config.json.
+
+    PROPÓSITO DE NEGÓCIO:
+        O scanner classifica cada notícia uma única vez (core.filters.classify_intel)
+        e depois só precisa saber quais guilds assinam as categorias que casaram.
+        Percorrer o config inteiro por notícia escalava com o número de servidores;
+        com o índice, o custo escala com o número de categorias casadas.
+
+    INVARIANTES DO DOMÍNIO:
+        - Só entram guilds com channel_id e lista de filtros não vazia — as mesmas
+          que o laço antigo sobre config.items() chegava a considerar.
+        - Nomes de filtro legados ("gunpla", "filmes") são resolvidos aqui, igual
+          ao match_intel.
+        - guilds_for devolve os ids na ordem de declaração do config.json, para a
+          ordem de envio não mudar em relação ao laço antigo.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.todos: List[str] = []
+        self.by_category: Dict[str, List[str]] = {}
+        self._order: Dict[str, int] = {}
+
+        if not isinstance(config, dict):
+            return
+        for pos, (gid, gdata) in enumerate(config.items()):
+            if not isinstance(gdata, dict) or not gdata.get("channel_id"):
+                continue
+            filters = gdata.get("filters", [])
+            if not isinstance(filters, list) or not filters:
+                continue
+            gid = str(gid)
+            self._order[gid] = pos
+            if "todos" in filters:
+                self.todos.append(gid)
+                continue
+            for f in dict.fromkeys(filters):
+                if not isinstance(f, str):
+                    continue
+                categoria = LEGACY_FILTER_ALIASES.get(f, f)
+                subs = self.by_category.setdefault(categoria, [])
+                if gid not in subs:
+                    subs.append(gid)
+
+    @property
+    def guild_count(self) -> int:
+        return len(self._order)
+
+    def guilds_for(self, verdict: Optional[FrozenSet[str]]) -> List[str]:
+        """Guilds que devem receber uma notícia com este veredito (None = bloqueada)."""
+        if verdict is None:
+            return []
+        alvo = set(self.todos)
+        for categoria in verdict:
+            alvo.update(self.by_category.get(categoria, ()))
+        return sorted(alvo, key=self._order.__getitem__)
+
+
+def _config_signature(config: Dict[str, Any]) -> Tuple:
+    """Só o que o índice usa: mudanças de idioma ou outros campos não o invalidam."""
+    if not isinstance(config, dict):
+        return ()
+    sig = []
+    for gid, gdata in config.items():
+        if not isinstance(gdata, dict):
+            continue
+        filters = gdata.get("filters")
+        sig.append((
+            str(gid),
+            gdata.get("channel_id"),
+            tuple(f for f in filters if isinstance(f, str)) if isinstance(filters, list) else (),
+        ))
+    return tuple(sig)
+
+
+_cached_signature: Optional[Tuple] = None
+_cached_index: Optional[SubscriptionIndex] = None
+
+
+def get_subscription_index(config: Dict[str, Any]) -> SubscriptionIndex:
+    """
+    Índice do config atual, reconstruído só quando canais ou filtros mudam.
+
+    O config.json é mutado in-place pelos painéis (mesmo objeto em
+    load_config_cached), então a identidade do dict não serve de chave: a
+    assinatura compara os campos relevantes, custo O(guilds) por varredura.
+    """
+    global _cached_signature, _cached_index
+    sig = _config_signature(config)
+    if _cached_index is None or sig != _cached_signature:
+        _cached_index = SubscriptionIndex(config)
+        _cached_signature = sig
+        log.debug(
+            f"📇 Índice de assinaturas reconstruído: {_cached_index.guild_count} guild(s), "
+            f"{len(_cached_index.by_category)} categoria(s)."
+        )
+    return _cached_index
@@ -18,6 +18,8 @@ from settings import TOKEN, COMMAND_PREFIX, LOG_LEVEL, SCAN_VERBOSE
 from utils.storage import p, load_json_safe, load_config_cached, save_config_safe, save_json_safe
 from bot.views.filter_dashboard import FilterDashboard
 from core.scanner import start_scheduler, run_scan_once
+from core.scanner.parsepool import parse_pool
+from utils.http_client import http_client
 from web.server import start_web_server  # Novo web server
 from utils.git_info import get_git_changes, get_current_hash, get_commits_since
 
@@ -290,7 +292,11 @@ async def main():
     # =========================================================
     # START
     # =========================================================
-    await bot.start(TOKEN)
+    try:
+        await bot.start(TOKEN)
+    finally:
+        parse_pool.shutdown()
+        await http_client.close()
 
 
 if __name__ == "__main__":
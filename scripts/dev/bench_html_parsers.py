@@ -0,0 +1,102 @@
+"""
+Benchmark dos backends de limpeza/hash do HTML Monitor (core/html_clean.py).
+
+Roda cada backend instalado (selectolax, lxml, html.parser) sobre páginas salvas
+e mostra, por página, o tempo de cada um e se o texto extraído bate. Sem páginas
+salvas, `--save` baixa os sites oficiais do sources.json para a pasta antes.
+
+    python scripts/dev/bench_html_parsers.py pages/ --save --repeat 5
+"""
+import argparse
+import asyncio
+import hashlib
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.html_clean import _CLEANERS, available_backends  # noqa: E402
+
+
+async def save_pages(folder: Path) -> None:
+    """Baixa as páginas do HTML Monitor (direto, sem proxy) para `folder`."""
+    import aiohttp
+
+    from core.html_monitor import _html_monitor_urls_from_sources
+    from utils.storage import load_json_safe
+
+    urls = _html_monitor_urls_from_sources(load_json_safe(PROJECT_ROOT / "sources.json", {}))
+    folder.mkdir(parents=True, exist_ok=True)
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/124.0.0.0 Safari/537.36"}
+    async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as session:
+        for url in urls:
+            nome = hashlib.sha1(url.encode()).hexdigest()[:12] + ".html"
+            try:
+                async with session.get(url) as resp:
+                    if resp.status != 200:
+                        print(f"  HTTP {resp.status}: {url}")
+                        continue
+                    (folder / nome).write_text(await resp.text(errors="replace"), encoding="utf-8")
+                    print(f"  salvo {nome} ← {url}")
+            except Exception as e:
+                print(f"  falhou {url}: {type(e).__name__}: {e}")
+
+
+def bench(folder: Path, repeat: int) -> None:
+    backends = available_backends()
+    pages = sorted(folder.glob("*.html"))
+    if not pages:
+        print(f"Nenhuma página .html em {folder} (use --save).")
+        return
+    print(f"Backends instalados: {', '.join(backends)} · {len(pages)} página(s) · {repeat} repetição(ões)\n")
+    print(f"{'página':<20}" + "".join(f"{b + ' ms':>16}" for b in backends) + "  texto igual")
+
+    totais = {b: 0.0 for b in backends}
+    iguais = 0
+    for page in pages:
+        html = page.read_text(encoding="utf-8", errors="replace")
+        tempos, digests = {}, {}
+        for backend in backends:
+            amostras = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                texto, _, _, _ = _CLEANERS[backend](html, None, ())
+                amostras.append(time.perf_counter() - started)
+            tempos[backend] = statistics.median(amostras)
+            totais[backend] += tempos[backend]
+            # O html.parser não normaliza espaços (preserva o hash de sempre):
+            # a comparação entre backends é sobre o texto normalizado.
+            digests[backend] = hashlib.sha256(" ".join(texto.split()).encode("utf-8")).hexdigest()[:10]
+        igual = len(set(digests.values())) == 1
+        iguais += igual
+        print(
+            f"{page.name[:20]:<20}"
+            + "".join(f"{tempos[b] * 1000:>16.1f}" for b in backends)
+            + f"  {'sim' if igual else 'NÃO ' + ' '.join(f'{b}={d}' for b, d in digests.items())}"
+        )
+
+    base = totais["html.parser"]
+    print("\nTotal por varredura (mediana por página, somada):")
+    for backend in backends:
+        ganho = f" ({base / totais[backend]:.1f}× o html.parser)" if totais[backend] and backend != "html.parser" else ""
+        print(f"  {backend:<12} {totais[backend] * 1000:8.0f} ms{ganho}")
+    print(f"  texto idêntico entre todos os backends em {iguais}/{len(pages)} página(s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder", type=Path, help="pasta com páginas .html salvas")
+    parser.add_argument("--save", action="store_true", help="baixa antes os sites oficiais do sources.json")
+    parser.add_argument("--repeat", type=int, default=3, help="repetições por página (vale a mediana)")
+    args = parser.parse_args()
+    if args.save:
+        asyncio.run(save_pages(args.folder))
+    bench(args.folder, max(1, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
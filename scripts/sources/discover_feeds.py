@@ -0,0 +1,86 @@
+"""
+Descoberta de feed RSS/Atom ou sitemap com <lastmod> para os sites oficiais (core/discovery.py).
+
+Visita cada site de official_sites no sources.json, procura <link rel="alternate">
+de RSS/Atom na página e, sem feed, um sitemap (robots.txt ou /sitemap.xml) que
+cubra a área do site. Grava o resultado em sources.discovered.json, que o bot lê
+na varredura seguinte, e mostra quantos bytes e quanto CPU por ciclo a troca poupa.
+
+    python scripts/sources/discover_feeds.py
+    python scripts/sources/discover_feeds.py --only bandai-hobby --dry-run
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.discovery import (  # noqa: E402
+    DISCOVERY_FILE, discover_sites, format_savings, routes_for, save_overlay, savings,
+)
+from core.html_monitor import _html_monitor_sites_from_sources  # noqa: E402
+from utils.http_client import http_client  # noqa: E402
+from utils.storage import load_json_safe  # noqa: E402
+
+
+def _kb(n) -> str:
+    return f"{(n or 0) / 1024:.0f}"
+
+
+def report(sites, results) -> None:
+    print(f"{'site':<44}{'rota':>9}{'página KB':>11}{'ms':>7}{'nova KB':>9}{'ms':>7}")
+    for site in sites:
+        r = results.get(site["url"], {})
+        rota = "feed" if r.get("feed") else "sitemap" if r.get("sitemap") else (r.get("error") or "—")
+        print(
+            f"{(site.get('name') or site['url'])[:43]:<44}{rota[:9]:>9}"
+            f"{_kb(r.get('html_bytes')):>11}{r.get('html_cpu_ms', 0):>7.0f}"
+            f"{_kb(r.get('alt_bytes')) if r.get('alt_bytes') else '':>9}"
+            f"{r.get('alt_cpu_ms', 0) if r.get('alt_bytes') else '':>7}"
+        )
+        if r.get("feed") or r.get("sitemap"):
+            print(f"    → {r.get('feed') or r.get('sitemap')}")
+    economia = savings(routes_for(sites, {"sites": results}))
+    print(f"\n{len(sites)} site(s) verificados — {format_savings(economia)}.")
+
+
+async def run(only: str, dry_run: bool, concurrency: int) -> None:
+    sources = load_json_safe(PROJECT_ROOT / "sources.json", {})
+    sites = [
+        site for site in _html_monitor_sites_from_sources(sources if isinstance(sources, dict) else {})
+        if site.get("discovery") is not False and (not only or only in site["url"])
+    ]
+    if not sites:
+        print("Nenhum site oficial para verificar.")
+        return
+    print(f"Verificando {len(sites)} site(s) oficiais (concorrência {concurrency})...\n")
+    try:
+        results = await discover_sites(http_client.session(), sites, concurrency)
+    finally:
+        await http_client.close()
+    report(sites, results)
+    if dry_run or only:
+        # --only não pode gravar: o overlay parcial tiraria os outros sites dele.
+        print(f"\nNada gravado ({'--dry-run' if dry_run else '--only'}).")
+        return
+    save_overlay(results)
+    print(f"\nGravado em {DISCOVERY_FILE}: vale a partir da próxima varredura do bot.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", default="", help="só sites cuja URL contém este texto (não grava)")
+    parser.add_argument("--dry-run", action="store_true", help="só mostra o relatório, sem gravar o overlay")
+    parser.add_argument("--concurrency", type=int, default=4, help="sites verificados em paralelo")
+    args = parser.parse_args()
+    # O overlay (e o state do bot) vivem na raiz do projeto, resolvidos pelo cwd.
+    os.chdir(PROJECT_ROOT)
+    asyncio.run(run(args.only, args.dry_run, max(1, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
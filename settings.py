@@ -104,14 +104,47 @@ except ValueError:
     FEED_FIRST_DELAY_MAX_SEC = 120.0
 FEED_FIRST_DELAY_MAX_SEC = max(0.0, min(FEED_FIRST_DELAY_MAX_SEC, 300.0))
 
-# Concorrência: limite de buscas simultâneas para evitar bloqueios por IP (anti-bot)
+# Concorrência: limite de buscas simultâneas para evitar bloqueios por IP (anti-bot).
+# Nas varreduras de feeds é o ponto de PARTIDA do controle adaptativo (AIMD, em
+# core/scanner/concurrency.py); o HTML Monitor continua a usá-lo como teto fixo.
 try:
     MAX_CONCURRENT_FEEDS = int(os.getenv("MAX_CONCURRENT_FEEDS", "3"))
 except ValueError:
     MAX_CONCURRENT_FEEDS = 3
 MAX_CONCURRENT_FEEDS = max(1, min(MAX_CONCURRENT_FEEDS, 10))
 
-# Jitter: intervalo aleatório (s) entre o início de cada busca para evitar picos de tráfego
+# Limites do controle adaptativo de concorrência dos feeds: sobe +1 por janela de
+# respostas saudáveis (mais rápidas que FEED_LATENCY_TARGET_SEC) e corta pela
+# metade em timeout/403/429. MIN = MAX fixa a concorrência.
+# Env: FEED_CONCURRENCY_MIN, FEED_CONCURRENCY_MAX, FEED_LATENCY_TARGET_SEC.
+try:
+    FEED_CONCURRENCY_MIN = int(os.getenv("FEED_CONCURRENCY_MIN", "1"))
+except ValueError:
+    FEED_CONCURRENCY_MIN = 1
+FEED_CONCURRENCY_MIN = max(1, min(FEED_CONCURRENCY_MIN, MAX_CONCURRENT_FEEDS))
+try:
+    FEED_CONCURRENCY_MAX = int(os.getenv("FEED_CONCURRENCY_MAX", "16"))
+except ValueError:
+    FEED_CONCURRENCY_MAX = 16
+FEED_CONCURRENCY_MAX = max(MAX_CONCURRENT_FEEDS, min(FEED_CONCURRENCY_MAX, 64))
+try:
+    FEED_LATENCY_TARGET_SEC = float(os.getenv("FEED_LATENCY_TARGET_SEC", "4.0"))
+except ValueError:
+    FEED_LATENCY_TARGET_SEC = 4.0
+FEED_LATENCY_TARGET_SEC = max(0.5, min(FEED_LATENCY_TARGET_SEC, 60.0))
+
+# Prazo (s) da fase de busca de uma varredura. Esperas de retentativa (backoff,
+# Retry-After, first_request_delay_sec) são feitas FORA da vaga de concorrência;
+# uma espera que terminaria depois do prazo desiste do feed em vez de segurar a
+# varredura. Env: FEED_SCAN_DEADLINE_SEC.
+try:
+    FEED_SCAN_DEADLINE_SEC = float(os.getenv("FEED_SCAN_DEADLINE_SEC", "900"))
+except ValueError:
+    FEED_SCAN_DEADLINE_SEC = 900.0
+FEED_SCAN_DEADLINE_SEC = max(60.0, min(FEED_SCAN_DEADLINE_SEC, 3600.0))
+
+# Cortesia por host: intervalo aleatório (s) entre dois pedidos ao MESMO host.
+# Não segura vaga de concorrência — hosts diferentes não esperam uns pelos outros.
 try:
     FEED_FETCH_JITTER_MIN = float(os.getenv("FEED_FETCH_JITTER_MIN", "0.5"))
 except ValueError:
@@ -121,6 +154,226 @@ try:
 except ValueError:
     FEED_FETCH_JITTER_MAX = 2.5
 
+# Varredura em streaming: cada feed é filtrado e publicado assim que termina de
+# baixar, em vez de esperar o mais lento dos ~65. Esta é a capacidade da fila entre
+# a busca e o processamento — quando enche, as buscas param até o processamento
+# (tradução, envio ao Discord) alcançar, e a memória fica limitada a
+# SCAN_QUEUE_MAXSIZE + MAX_CONCURRENT_FEEDS feeds parseados. Env: SCAN_QUEUE_MAXSIZE.
+try:
+    SCAN_QUEUE_MAXSIZE = int(os.getenv("SCAN_QUEUE_MAXSIZE", "8"))
+except ValueError:
+    SCAN_QUEUE_MAXSIZE = 8
+SCAN_QUEUE_MAXSIZE = max(1, min(SCAN_QUEUE_MAXSIZE, 100))
+
+# Entrega ao Discord (core/scanner/dispatcher.py): uma fila por canal, envios de
+# canais diferentes em paralelo. O Discord limita ~5 mensagens / 5 s por canal e
+# 50 requisições/s por bot; os padrões ficam abaixo dos dois. O discord.py ainda
+# trata um 429 eventual, mas moldar o tráfego evita chegar lá.
+try:
+    DISCORD_SEND_CONCURRENCY = int(os.getenv("DISCORD_SEND_CONCURRENCY", "5"))
+except ValueError:
+    DISCORD_SEND_CONCURRENCY = 5
+DISCORD_SEND_CONCURRENCY = max(1, min(DISCORD_SEND_CONCURRENCY, 20))
+try:
+    DISCORD_CHANNEL_MIN_INTERVAL_SEC = float(os.getenv("DISCORD_CHANNEL_MIN_INTERVAL_SEC", "1.0"))
+except ValueError:
+    DISCORD_CHANNEL_MIN_INTERVAL_SEC = 1.0
+DISCORD_CHANNEL_MIN_INTERVAL_SEC = max(0.0, min(DISCORD_CHANNEL_MIN_INTERVAL_SEC, 10.0))
+try:
+    DISCORD_GLOBAL_MAX_PER_SEC = float(os.getenv("DISCORD_GLOBAL_MAX_PER_SEC", "40"))
+except ValueError:
+    DISCORD_GLOBAL_MAX_PER_SEC = 40.0
+DISCORD_GLOBAL_MAX_PER_SEC = max(1.0, min(DISCORD_GLOBAL_MAX_PER_SEC, 50.0))
+
+# Junta até 10 embeds pendentes do mesmo canal numa só mensagem (limite do
+# Discord, e 6000 caracteres somados). Vídeos continuam sozinhos, com o link no
+# content para o player. Desligado por omissão: muda o visual do canal.
+DISCORD_BATCH_EMBEDS = os.getenv("DISCORD_BATCH_EMBEDS", "").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+# Feeds que devolvem 200 com o corpo idêntico (sem ETag/Last-Modified) são
+# detectados por hash do corpo e tratados como 304. <lastBuildDate> muda a cada
+# GET em Blogger/WordPress e é ignorado no hash, salvo se isto for desligado.
+FEED_FINGERPRINT_STRIP_VOLATILE = os.getenv("FEED_FINGERPRINT_STRIP_VOLATILE", "true").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+# Parser rápido (core/scanner/fastfeed.py): lê só os primeiros MAX_ENTRIES_PER_FEED
+# itens de RSS 2.0/Atom e para, em vez de o feedparser montar e sanitizar o
+# documento inteiro. Formatos que ele não entende caem no feedparser. Opt-in.
+FEED_FAST_PARSER = os.getenv("FEED_FAST_PARSER", "").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+# Pista de retentativa (core/scanner/retrylane.py): entre duas varreduras completas,
+# re-tenta SÓ os feeds que falharam na última, com espera exponencial a partir de
+# FEED_RETRY_BASE_MIN minutos (10, 20, 40…) e no máximo FEED_RETRY_MAX_ATTEMPTS
+# vezes. Sem ela, um feed que tomou 429 só volta a ser lido LOOP_MINUTES depois.
+FEED_RETRY_LANE = os.getenv("FEED_RETRY_LANE", "true").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+try:
+    FEED_RETRY_BASE_MIN = float(os.getenv("FEED_RETRY_BASE_MIN", "10"))
+except ValueError:
+    FEED_RETRY_BASE_MIN = 10.0
+FEED_RETRY_BASE_MIN = max(1.0, min(FEED_RETRY_BASE_MIN, 240.0))
+try:
+    FEED_RETRY_MAX_ATTEMPTS = int(os.getenv("FEED_RETRY_MAX_ATTEMPTS", "5"))
+except ValueError:
+    FEED_RETRY_MAX_ATTEMPTS = 5
+FEED_RETRY_MAX_ATTEMPTS = max(1, min(FEED_RETRY_MAX_ATTEMPTS, 10))
+
+# Cadência adaptativa por fonte (core/scanner/cadence.py): em vez de buscar tudo a
+# cada LOOP_MINUTES, o scanner roda a cada FEED_CADENCE_TICK_MIN minutos um lote
+# pequeno (até FEED_CADENCE_BATCH_MAX) das fontes vencidas. O intervalo de cada
+# fonte encolhe quando ela traz itens novos e cresce quando devolve 304/corpo igual,
+# entre FEED_CADENCE_MIN_MIN e FEED_CADENCE_MAX_MIN (sobreponível por fonte com
+# "min_interval_min"/"max_interval_min" no sources.json). Desligada por padrão:
+# ligá-la troca o loop de LOOP_MINUTES por tiques de FEED_CADENCE_TICK_MIN e busca
+# fontes movimentadas (Reddit incluso) até a cada FEED_CADENCE_MIN_MIN.
+FEED_ADAPTIVE_CADENCE = os.getenv("FEED_ADAPTIVE_CADENCE", "false").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+try:
+    FEED_CADENCE_MIN_MIN = float(os.getenv("FEED_CADENCE_MIN_MIN", "30"))
+except ValueError:
+    FEED_CADENCE_MIN_MIN = 30.0
+FEED_CADENCE_MIN_MIN = max(5.0, min(FEED_CADENCE_MIN_MIN, 1440.0))
+try:
+    FEED_CADENCE_MAX_MIN = float(os.getenv("FEED_CADENCE_MAX_MIN", "2880"))
+except ValueError:
+    FEED_CADENCE_MAX_MIN = 2880.0
+FEED_CADENCE_MAX_MIN = max(FEED_CADENCE_MIN_MIN, min(FEED_CADENCE_MAX_MIN, 10080.0))
+try:
+    FEED_CADENCE_TICK_MIN = int(os.getenv("FEED_CADENCE_TICK_MIN", "5"))
+except ValueError:
+    FEED_CADENCE_TICK_MIN = 5
+FEED_CADENCE_TICK_MIN = max(1, min(FEED_CADENCE_TICK_MIN, 60))
+try:
+    FEED_CADENCE_BATCH_MAX = int(os.getenv("FEED_CADENCE_BATCH_MAX", "16"))
+except ValueError:
+    FEED_CADENCE_BATCH_MAX = 16
+FEED_CADENCE_BATCH_MAX = max(1, min(FEED_CADENCE_BATCH_MAX, 200))
+
+# Pistas de prioridade ("priority" por fonte no sources.json: high/normal/low):
+# quantas vagas da concorrência ficam reservadas para a pista "high" (oficiais,
+# YouTube). 0 = só a ordem de despacho, sem reserva.
+try:
+    FEED_PRIORITY_RESERVED_SLOTS = int(os.getenv("FEED_PRIORITY_RESERVED_SLOTS", "1"))
+except ValueError:
+    FEED_PRIORITY_RESERVED_SLOTS = 1
+FEED_PRIORITY_RESERVED_SLOTS = max(0, min(FEED_PRIORITY_RESERVED_SLOTS, 8))
+
+# Dentro de cada pista de prioridade, busca primeiro as fontes que mais demoram
+# pelo histórico (state["source_stats"]): a regra LPT encurta a varredura.
+# false = ordem do sources.json.
+FEED_LPT_SCHEDULING = os.getenv("FEED_LPT_SCHEDULING", "true").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+# Hedge por fonte ("hedge": true + "fallbacks" no sources.json): se a principal não
+# responder no p90 da latência dela, o 1º fallback sai em paralelo e a primeira resposta
+# válida vence. Sem histórico (menos de 5 respostas), espera FEED_HEDGE_DEFAULT_SEC;
+# nunca menos que FEED_HEDGE_MIN_SEC. FEED_HEDGING=false desliga em todas.
+FEED_HEDGING = os.getenv("FEED_HEDGING", "true").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+try:
+    FEED_HEDGE_DEFAULT_SEC = float(os.getenv("FEED_HEDGE_DEFAULT_SEC", "8"))
+except ValueError:
+    FEED_HEDGE_DEFAULT_SEC = 8.0
+FEED_HEDGE_DEFAULT_SEC = max(0.5, min(FEED_HEDGE_DEFAULT_SEC, 120.0))
+try:
+    FEED_HEDGE_MIN_SEC = float(os.getenv("FEED_HEDGE_MIN_SEC", "1.0"))
+except ValueError:
+    FEED_HEDGE_MIN_SEC = 1.0
+FEED_HEDGE_MIN_SEC = max(0.1, min(FEED_HEDGE_MIN_SEC, 60.0))
+
+# Disjuntor por fonte (core/scanner/breaker.py): FEED_BREAKER_THRESHOLD rodadas
+# seguidas de falha põem a fonte em quarentena — fora das buscas, com uma sonda
+# barata a cada FEED_BREAKER_PROBE_MIN minutos (dobrando até FEED_BREAKER_PROBE_MAX_HOURS).
+FEED_BREAKER_ENABLED = os.getenv("FEED_BREAKER_ENABLED", "true").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+try:
+    FEED_BREAKER_THRESHOLD = int(os.getenv("FEED_BREAKER_THRESHOLD", "8"))
+except ValueError:
+    FEED_BREAKER_THRESHOLD = 8
+FEED_BREAKER_THRESHOLD = max(2, min(FEED_BREAKER_THRESHOLD, 100))
+try:
+    FEED_BREAKER_PROBE_MIN = float(os.getenv("FEED_BREAKER_PROBE_MIN", "60"))
+except ValueError:
+    FEED_BREAKER_PROBE_MIN = 60.0
+FEED_BREAKER_PROBE_MIN = max(5.0, min(FEED_BREAKER_PROBE_MIN, 1440.0))
+try:
+    FEED_BREAKER_PROBE_MAX_HOURS = float(os.getenv("FEED_BREAKER_PROBE_MAX_HOURS", "24"))
+except ValueError:
+    FEED_BREAKER_PROBE_MAX_HOURS = 24.0
+FEED_BREAKER_PROBE_MAX_HOURS = max(FEED_BREAKER_PROBE_MIN / 60.0, min(FEED_BREAKER_PROBE_MAX_HOURS, 168.0))
+
+# Parse de feeds num pool de processos dedicado (core/scanner/parsepool.py): o
+# feedparser segura o GIL e, em threads, disputava com a tradução e com o
+# heartbeat do Discord. 0 = parse no executor de threads, como antes.
+try:
+    FEED_PARSE_WORKERS = int(os.getenv("FEED_PARSE_WORKERS", "2"))
+except ValueError:
+    FEED_PARSE_WORKERS = 2
+FEED_PARSE_WORKERS = max(0, min(FEED_PARSE_WORKERS, 8))
+# Corpos de feed em voo no pool (fila + parse). Acima disso, a busca espera.
+try:
+    FEED_PARSE_QUEUE_MAX = int(os.getenv("FEED_PARSE_QUEUE_MAX", "8"))
+except ValueError:
+    FEED_PARSE_QUEUE_MAX = 8
+FEED_PARSE_QUEUE_MAX = max(1, min(FEED_PARSE_QUEUE_MAX, 64))
+
+# Cliente HTTP compartilhado (utils/http_client.py): uma sessão aiohttp para o
+# bot inteiro — fetcher, HTML Monitor e OpenGraph — com keep-alive e cache de DNS.
+try:
+    HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "64"))
+except ValueError:
+    HTTP_POOL_LIMIT = 64
+HTTP_POOL_LIMIT = max(4, min(HTTP_POOL_LIMIT, 512))
+try:
+    HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "4"))
+except ValueError:
+    HTTP_POOL_LIMIT_PER_HOST = 4
+HTTP_POOL_LIMIT_PER_HOST = max(1, min(HTTP_POOL_LIMIT_PER_HOST, HTTP_POOL_LIMIT))
+try:
+    HTTP_DNS_CACHE_TTL_SEC = int(os.getenv("HTTP_DNS_CACHE_TTL_SEC", "600"))
+except ValueError:
+    HTTP_DNS_CACHE_TTL_SEC = 600
+HTTP_DNS_CACHE_TTL_SEC = max(0, min(HTTP_DNS_CACHE_TTL_SEC, 86400))
+try:
+    HTTP_KEEPALIVE_SEC = float(os.getenv("HTTP_KEEPALIVE_SEC", "30"))
+except ValueError:
+    HTTP_KEEPALIVE_SEC = 30.0
+HTTP_KEEPALIVE_SEC = max(1.0, min(HTTP_KEEPALIVE_SEC, 600.0))
+
 # Número máximo de entradas processadas por feed em cada varredura.
 # YouTube costuma expor 15 entradas no Atom; manter 15 reduz perda de vídeos.
 try:
@@ -178,6 +431,30 @@ except ValueError:
 HTML_MONITOR_COOLDOWN_HOURS = max(0.0, min(HTML_MONITOR_COOLDOWN_HOURS, 720.0))
 HTML_MONITOR_COOLDOWN_SEC = HTML_MONITOR_COOLDOWN_HOURS * 3600.0
 
+# HTML Monitor: teto de links novos numa mudança para postá-los um a um (texto
+# âncora + link). Acima disto a página foi redesenhada, não ganhou notícias, e
+# sai o "🔄 Update" genérico (com cooldown). Env: HTML_MONITOR_MAX_NEW_LINKS.
+try:
+    HTML_MONITOR_MAX_NEW_LINKS = int(os.getenv("HTML_MONITOR_MAX_NEW_LINKS", "10"))
+except ValueError:
+    HTML_MONITOR_MAX_NEW_LINKS = 10
+HTML_MONITOR_MAX_NEW_LINKS = max(1, min(HTML_MONITOR_MAX_NEW_LINKS, 50))
+
+# Backend da limpeza/hash das páginas do HTML Monitor (core/html_clean.py), que
+# roda no pool de processos do parse: auto (o mais rápido instalado: selectolax,
+# lxml), selectolax, lxml ou html.parser (BeautifulSoup, sempre disponível).
+HTML_MONITOR_PARSER = os.getenv("HTML_MONITOR_PARSER", "auto").strip().lower() or "auto"
+
+# Descoberta de feed RSS/Atom ou sitemap com <lastmod> dos sites oficiais
+# (core/discovery.py → sources.discovered.json). 0 = só pelo CLI
+# scripts/sources/discover_feeds.py; > 0 = a varredura renova o overlay em
+# segundo plano a cada N horas. Env: SOURCE_DISCOVERY_INTERVAL_HOURS.
+try:
+    SOURCE_DISCOVERY_INTERVAL_HOURS = float(os.getenv("SOURCE_DISCOVERY_INTERVAL_HOURS", "0"))
+except ValueError:
+    SOURCE_DISCOVERY_INTERVAL_HOURS = 0.0
+SOURCE_DISCOVERY_INTERVAL_HOURS = max(0.0, min(SOURCE_DISCOVERY_INTERVAL_HOURS, 24.0 * 90))
+
 # Proxy do Cloudflare Worker para evitar bloqueios de IP (opcional)
 # Exemplo: https://meu-worker.meu-subdominio.workers.dev/?url=
 CLOUDFLARE_PROXY_URL = os.getenv("CLOUDFLARE_PROXY_URL", "").strip()
@@ -186,3 +463,37 @@ CLOUDFLARE_PROXY_URL = os.getenv("CLOUDFLARE_PROXY_URL", "").strip()
 # (env PROXY_SECRET), o bot envia o header X-Proxy-Secret e o Worker recusa quem
 # não o apresentar — evita que o proxy seja usado por terceiros (open proxy).
 CLOUDFLARE_PROXY_SECRET = os.getenv("CLOUDFLARE_PROXY_SECRET", "").strip()
+
+# Pool de proxies (core/proxy_pool.py): vários Workers, cada um com o seu segredo,
+# separados por vírgula no formato `url` ou `url|segredo` (sem segredo próprio vale
+# CLOUDFLARE_PROXY_SECRET). Vazio = só CLOUDFLARE_PROXY_URL, como antes. Cada
+# pedido vai pela rota com menor custo medido (latência ÷ taxa de sucesso no host).
+CLOUDFLARE_PROXY_URLS = os.getenv("CLOUDFLARE_PROXY_URLS", "").strip()
+
+# Rota direta (IP do próprio bot) concorre com os Workers pelos pedidos que iriam
+# via proxy. Desligada, ela só é usada quando todos os Workers estão ejetados.
+PROXY_POOL_DIRECT_ROUTE = os.getenv("PROXY_POOL_DIRECT_ROUTE", "").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+# Ejeção: após PROXY_EJECT_AFTER falhas seguidas (timeout, conexão recusada, 5xx)
+# o Worker sai da escolha por PROXY_EJECT_SEC segundos, dobrando a cada reincidência
+# até PROXY_EJECT_MAX_SEC.
+try:
+    PROXY_EJECT_AFTER = int(os.getenv("PROXY_EJECT_AFTER", "3"))
+except ValueError:
+    PROXY_EJECT_AFTER = 3
+PROXY_EJECT_AFTER = max(1, min(PROXY_EJECT_AFTER, 20))
+try:
+    PROXY_EJECT_SEC = float(os.getenv("PROXY_EJECT_SEC", "60"))
+except ValueError:
+    PROXY_EJECT_SEC = 60.0
+PROXY_EJECT_SEC = max(5.0, min(PROXY_EJECT_SEC, 3600.0))
+try:
+    PROXY_EJECT_MAX_SEC = float(os.getenv("PROXY_EJECT_MAX_SEC", "900"))
+except ValueError:
+    PROXY_EJECT_MAX_SEC = 900.0
+PROXY_EJECT_MAX_SEC = max(PROXY_EJECT_SEC, min(PROXY_EJECT_MAX_SEC, 86400.0))
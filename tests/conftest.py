@@ -6,3 +6,33 @@ pytest_plugins = ("pytest_asyncio",)
 
 def pytest_configure(config):
     config.addinivalue_line("markers", "asyncio: mark test as async (pytest-asyncio)")
+
+
+@pytest.fixture(autouse=True)
+def _parse_sem_processos(monkeypatch):
+    """Parse de feeds no executor de threads: os testes não sobem processos.
+
+    tests/test_parse_pool.py liga o pool de processos explicitamente.
+    """
+    from core.scanner.parsepool import parse_pool
+    monkeypatch.setattr(parse_pool, "workers", 0)
+
+
+@pytest.fixture(autouse=True)
+def _concorrencia_inicial(monkeypatch):
+    """Cada teste começa com o limite adaptativo no valor inicial.
+
+    O limite aprendido vive no processo (de uma varredura para a outra); sem isto,
+    um teste que simula 429 deixaria os seguintes com concorrência 1.
+    """
+    from core.scanner.concurrency import feed_concurrency
+    from settings import MAX_CONCURRENT_FEEDS
+    monkeypatch.setattr(feed_concurrency, "limit", float(MAX_CONCURRENT_FEEDS))
+    monkeypatch.setattr(feed_concurrency, "epoch", 0)
+
+
+@pytest.fixture(autouse=True)
+def _sem_overlay_de_descoberta(monkeypatch, tmp_path):
+    """sources.discovered.json de quem rodou o CLI na raiz não vaza para os testes."""
+    import core.discovery
+    monkeypatch.setattr(core.discovery, "DISCOVERY_FILE", str(tmp_path / "sources.discovered.json"))
@@ -0,0 +1,105 @@
+"""
+Concorrência adaptativa das buscas de feeds (core/scanner/concurrency.py).
+
+AIMD: sobe +1 por janela de respostas rápidas enquanto o limite está em uso,
+corta pela metade em timeout/403/429 — no máximo um corte por janela.
+"""
+import asyncio
+
+import pytest
+
+from core.scanner.concurrency import AdaptiveConcurrency
+
+
+@pytest.mark.asyncio
+async def test_sobe_com_respostas_rapidas_so_quando_ha_carga():
+    aimd = AdaptiveConcurrency(initial=2, minimum=1, maximum=4, latency_target=1.0)
+    aimd.begin_scan()
+
+    # Sem carga (nada em voo), respostas rápidas não fazem o limite crescer.
+    aimd.on_success(0.1)
+    assert aimd.effective == 2
+
+    for _ in range(20):
+        # Mantém o limite todo ocupado, como numa varredura com fila de feeds.
+        while aimd.in_flight < aimd.effective:
+            await aimd.acquire()
+        aimd.on_success(0.1)
+    assert aimd.effective == 4  # teto
+    # Resposta lenta é neutra.
+    aimd.on_success(5.0)
+    assert aimd.effective == 4
+    assert [n for _, n in aimd.samples] == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_corte_multiplicativo_uma_vez_por_janela():
+    aimd = AdaptiveConcurrency(initial=8, minimum=2, maximum=16, latency_target=1.0)
+    epoca = aimd.epoch
+    # Rajada de 429 de pedidos que saíram juntos: só o primeiro corta.
+    for _ in range(5):
+        aimd.on_congestion(epoca, "HTTP 429")
+    assert aimd.effective == 4 and aimd.decreases == 1
+
+    aimd.on_congestion(aimd.epoch, "timeout")
+    aimd.on_congestion(aimd.epoch, "timeout")
+    aimd.on_congestion(aimd.epoch, "timeout")
+    assert aimd.effective == 2  # piso
+
+
+@pytest.mark.asyncio
+async def test_limite_menor_segura_quem_entra_sem_derrubar_quem_esta_em_voo():
+    aimd = AdaptiveConcurrency(initial=3, minimum=1, maximum=3, latency_target=1.0)
+    em_voo = []
+    liberar = asyncio.Event()
+
+    async def busca(i):
+        async with aimd.slot():
+            em_voo.append(i)
+            await liberar.wait()
+
+    tarefas = [asyncio.create_task(busca(i)) for i in range(5)]
+    await asyncio.sleep(0.01)
+    assert len(em_voo) == 3 and aimd.in_flight == 3
+
+    aimd.on_congestion(aimd.epoch, "HTTP 403")  # 3 → 1
+    assert aimd.effective == 1 and aimd.in_flight == 3  # ninguém é interrompido
+    assert len(em_voo) == 3  # e ninguém mais entra
+
+    liberar.set()
+    await asyncio.gather(*tarefas)
+    assert len(em_voo) == 5 and aimd.in_flight == 0
+    assert aimd.peak_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_pista_alta_tem_vaga_reservada_e_passa_a_frente():
+    aimd = AdaptiveConcurrency(initial=2, minimum=1, maximum=2, latency_target=1.0, reserved=1)
+    ordem = []
+    liberar = {i: asyncio.Event() for i in ("blog1", "blog2", "blog3", "oficial1", "oficial2")}
+
+    async def busca(nome, pista):
+        async with aimd.slot(pista):
+            ordem.append(nome)
+            await liberar[nome].wait()
+
+    tarefas = [asyncio.create_task(busca(n, 1)) for n in ("blog1", "blog2", "blog3")]
+    await asyncio.sleep(0.01)
+    # A pista baixa não ocupa a vaga reservada.
+    assert ordem == ["blog1"] and aimd.in_flight == 1
+
+    tarefas.append(asyncio.create_task(busca("oficial1", 0)))
+    await asyncio.sleep(0.01)
+    assert ordem == ["blog1", "oficial1"]  # entrou sem esperar os blogs da fila
+
+    tarefas.append(asyncio.create_task(busca("oficial2", 0)))
+    await asyncio.sleep(0.01)
+    liberar["blog1"].set()
+    await asyncio.sleep(0.01)
+    # A vaga que abriu vai para a pista alta, à frente de blog2/blog3.
+    assert ordem == ["blog1", "oficial1", "oficial2"]
+
+    for evento in liberar.values():
+        evento.set()
+    await asyncio.gather(*tarefas)
+    assert ordem[3:] == ["blog2", "blog3"] and aimd.in_flight == 0
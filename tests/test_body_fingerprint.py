@@ -0,0 +1,79 @@
+"""
+Impressão digital do corpo: feed que devolve 200 idêntico (sem ETag) vira 304.
+
+Blogger, FC2 e WordPress atrás de CDN regeneram o XML a cada GET, muitas vezes
+só com <lastBuildDate> diferente. O teste sobe um servidor aiohttp local que
+faz exatamente isso.
+"""
+import aiohttp
+import pytest
+from aiohttp import web
+
+import core.scanner.fetcher as fetcher
+from core.stats import stats
+from utils.cache import body_fingerprint, fingerprint_matches, update_fingerprint
+
+
+def _rss(build_date, itens):
+    corpo = "".join(f"<item><title>{t}</title><link>https://b.com/{t}</link></item>" for t in itens)
+    return (
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>Blog</title>'
+        f"<lastBuildDate>{build_date}</lastBuildDate>{corpo}</channel></rss>"
+    ).encode()
+
+
+class TestFingerprint:
+    def test_ignora_last_build_date(self):
+        a = _rss("Mon, 01 Jan 2026 00:00:00 GMT", ["x"])
+        b = _rss("Mon, 01 Jan 2026 01:00:00 GMT", ["x"])
+        assert body_fingerprint(a) == body_fingerprint(b)
+        assert body_fingerprint(a, strip_volatile=False) != body_fingerprint(b, strip_volatile=False)
+
+    def test_item_novo_muda_o_hash(self):
+        assert body_fingerprint(_rss("d", ["x"])) != body_fingerprint(_rss("d", ["x", "y"]))
+
+    def test_grava_ao_lado_do_etag(self):
+        cache = {"https://f.com": {"etag": '"abc"'}}
+        fp = body_fingerprint(b"<rss/>")
+        assert not fingerprint_matches("https://f.com", fp, cache)
+        update_fingerprint("https://f.com", fp, cache)
+        assert cache["https://f.com"] == {"etag": '"abc"', "fingerprint": fp}
+        assert fingerprint_matches("https://f.com", fp, cache)
+
+
+@pytest.mark.asyncio
+async def test_corpo_identico_segue_o_caminho_do_304(monkeypatch):
+    estado = {"n": 0, "itens": ["x"]}
+
+    async def handler(request):
+        estado["n"] += 1
+        return web.Response(body=_rss(f"build {estado['n']}", estado["itens"]), content_type="application/rss+xml")
+
+    app = web.Application()
+    app.router.add_get("/feed", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    porta = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{porta}/feed"
+
+    monkeypatch.setattr(fetcher, "validate_url", lambda u: (True, None))
+    http_cache = {}
+    src = {"url": url, "metadata": {}}
+    try:
+        async with aiohttp.ClientSession() as session:
+            antes = stats.fingerprint_hits_total
+            primeiro = await fetcher.fetch_feed(session, src, http_cache)
+            assert primeiro is not None and len(primeiro[1]) == 1
+
+            # Mesmo conteúdo, só <lastBuildDate> novo: nada a parsear.
+            assert await fetcher.fetch_feed(session, src, http_cache) is None
+            assert stats.fingerprint_hits_total == antes + 1
+
+            estado["itens"] = ["y", "x"]
+            terceiro = await fetcher.fetch_feed(session, src, http_cache)
+            assert terceiro is not None and len(terceiro[1]) == 2
+            assert estado["n"] == 3
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,111 @@
+"""
+Disjuntor por fonte (core/scanner/breaker.py).
+
+Falhas seguidas abrem o disjuntor (uma mensagem de quarentena); aberta, a fonte
+só volta como sonda quando a janela vence; a sonda que responde fecha-o.
+"""
+import logging
+
+import core.scanner.breaker as breaker
+from core.scanner.breaker import OPEN, quarantined, split_by_breaker, update_breakers
+
+URL = "https://gundamnews.org/feed"
+
+
+def test_abre_no_limite_com_uma_mensagem_e_dobra_a_janela(monkeypatch, caplog):
+    monkeypatch.setattr(breaker, "FEED_BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(breaker, "FEED_BREAKER_PROBE_MIN", 60.0)
+    monkeypatch.setattr(breaker, "FEED_BREAKER_PROBE_MAX_HOURS", 3.0)
+    caplog.set_level(logging.INFO, logger="MaftyIntel.scanner")
+
+    tabela = {}
+    for agora in (1.0, 2.0):
+        tabela = update_breakers(tabela, [URL], {URL}, agora)
+    assert tabela[URL]["state"] != OPEN and tabela[URL]["failures"] == 2
+    tabela = update_breakers(tabela, [URL], {URL}, 3.0)
+    assert tabela[URL]["state"] == OPEN and tabela[URL]["next_probe_at"] == 3.0 + 3600
+
+    # Sondas que falham: janela 1h → 2h → teto de 3h, sem repetir a mensagem.
+    tabela = update_breakers(tabela, [URL], {URL}, 5000.0)
+    assert tabela[URL]["next_probe_at"] == 5000.0 + 7200
+    tabela = update_breakers(tabela, [URL], {URL}, 9000.0)
+    assert tabela[URL]["next_probe_at"] == 9000.0 + 10800
+    assert sum("[QUARENTENA]" in r.message for r in caplog.records) == 1
+
+    # A sonda responde: disjuntor fecha e a fonte sai da tabela.
+    tabela = update_breakers(tabela, [URL], set(), 20000.0)
+    assert tabela == {}
+
+
+def test_sucesso_zera_a_contagem_e_nao_tentada_fica_como_estava(monkeypatch):
+    monkeypatch.setattr(breaker, "FEED_BREAKER_THRESHOLD", 3)
+    tabela = update_breakers({}, [URL, "https://ok.com/feed"], {URL}, 1.0)
+    assert list(tabela) == [URL]
+    tabela = update_breakers(tabela, [URL], set(), 2.0)
+    assert tabela == {}
+    aberta = {URL: {"state": OPEN, "failures": 9, "next_probe_at": 50.0}}
+    assert update_breakers(aberta, ["https://ok.com/feed"], set(), 3.0) == aberta
+
+
+def test_fonte_fora_do_sources_json_sai_dos_disjuntores():
+    aberta = {URL: {"state": OPEN, "failures": 9, "next_probe_at": 50.0}}
+    # "enabled": false (ou removida): some da tabela, e com ela da quarentena.
+    assert update_breakers(aberta, [], set(), 3.0, keep={"https://ok.com/feed"}) == {}
+    assert update_breakers(aberta, [], set(), 3.0, keep={URL}) == aberta
+
+
+def test_campo_de_quarentena_cabe_no_limite_do_discord():
+    from bot.cogs.status import quarantine_field
+
+    longas = [(f"https://{'x' * 90}.com/feed/{i}", {"next_probe_at": 1_800_000_000}) for i in range(30)]
+    campo = quarantine_field(longas)
+    assert len(campo) <= 1024
+    assert campo.endswith(f"… e mais {30 - campo.count('•')}")
+    curtas = [(f"https://a.com/{i}", {"next_probe_at": 1}) for i in range(12)]
+    assert quarantine_field(curtas).count("•") == 10
+
+
+def test_quarentena_pula_ate_a_sonda_vencer():
+    fontes = [{"url": u} for u in ("https://ok.com/feed", URL, "https://morto.com/feed")]
+    tabela = {
+        URL: {"state": OPEN, "next_probe_at": 100.0},
+        "https://morto.com/feed": {"state": OPEN, "next_probe_at": 500.0},
+        "https://ok.com/feed": {"state": "closed", "failures": 2},
+        "lixo": "x",
+    }
+    buscar, sondas, puladas = split_by_breaker(fontes, tabela, 200.0)
+    assert [s["url"] for s in buscar] == ["https://ok.com/feed", URL]
+    assert sondas == {URL} and puladas == ["https://morto.com/feed"]
+    assert [url for url, _ in quarantined(tabela)] == [URL, "https://morto.com/feed"]
+    assert split_by_breaker(fontes, "lixo", 0.0)[0] == fontes
+
+
+async def test_sonda_faz_uma_tentativa_por_url(monkeypatch):
+    import aiohttp
+    from aiohttp import web
+
+    import core.scanner.fetcher as fetcher
+
+    pedidos = []
+
+    async def fora_do_ar(request):
+        pedidos.append(request.path)
+        return web.Response(status=503)
+
+    app = web.Application()
+    app.router.add_get("/{nome}", fora_do_ar)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    monkeypatch.setattr(fetcher, "validate_url", lambda u: (True, None))
+    monkeypatch.setattr(fetcher, "FEED_FETCH_MAX_ATTEMPTS", 3)
+    src = {"url": f"{base}/feed", "metadata": {"fallbacks": [f"{base}/alt"]}}
+    falhas = set()
+    try:
+        async with aiohttp.ClientSession() as session:
+            assert await fetcher.fetch_feed(session, src, {}, failures=falhas, probe=True) is None
+    finally:
+        await runner.cleanup()
+    assert pedidos == ["/feed", "/alt"] and falhas == {src["url"]}
@@ -0,0 +1,51 @@
+"""
+Cadência adaptativa por fonte (core/scanner/cadence.py).
+
+Fonte que traz novidade é lida mais vezes; fonte parada, menos — sempre dentro
+dos limites globais ou dos `min_interval_min`/`max_interval_min` da própria fonte.
+"""
+import core.scanner.cadence as cadence
+from core.scanner.cadence import CHANGED, FAILED, UNCHANGED, due_sources, update_cadence
+
+
+def test_novidade_encurta_e_silencio_alonga_dentro_dos_limites(monkeypatch):
+    monkeypatch.setattr(cadence, "LOOP_MINUTES", 120)
+    monkeypatch.setattr(cadence, "FEED_CADENCE_MIN_MIN", 30)
+    monkeypatch.setattr(cadence, "FEED_CADENCE_MAX_MIN", 180)
+    quente, fria = "https://gundam.info/feed", "https://blog.com/feed"
+
+    tabela = update_cadence({}, {quente: CHANGED, fria: UNCHANGED}, {}, 1000.0)
+    assert tabela[quente]["interval"] == 3600.0
+    assert tabela[quente]["next_due"] == 1000.0 + 3600.0
+    assert tabela[quente]["last_change"] == 1000.0
+    assert tabela[fria]["interval"] == 9000.0
+
+    for _ in range(5):
+        tabela = update_cadence(tabela, {quente: CHANGED, fria: UNCHANGED}, {}, 1000.0)
+    assert tabela[quente]["interval"] == 30 * 60.0
+    assert tabela[fria]["interval"] == 180 * 60.0
+    assert tabela[quente]["changes"] == 6 and tabela[fria]["checks"] == 6
+
+    # Falha não ensina nada sobre a frequência: o intervalo fica.
+    tabela = update_cadence(tabela, {fria: FAILED}, {}, 5000.0)
+    assert tabela[fria]["interval"] == 180 * 60.0
+    assert tabela[fria]["next_due"] == 5000.0 + 180 * 60.0
+
+
+def test_limites_da_fonte_e_poda(monkeypatch):
+    monkeypatch.setattr(cadence, "LOOP_MINUTES", 120)
+    url = "https://nyaa.si/rss"
+    meta = {url: {"min_interval_min": 240, "max_interval_min": 600}}
+    tabela = update_cadence({"https://sumiu.com/feed": {"interval": 60}}, {url: CHANGED}, meta, 0.0)
+    assert tabela[url]["interval"] == 240 * 60.0
+    assert "https://sumiu.com/feed" in tabela
+    tabela = update_cadence(tabela, {}, meta, 0.0, prune=True)
+    assert list(tabela) == [url]
+
+
+def test_vencidas_mais_atrasadas_primeiro_e_tabela_corrompida():
+    fontes = [{"url": u} for u in ("a", "b", "c", "nova")]
+    tabela = {"a": {"next_due": 50}, "b": {"next_due": 10}, "c": {"next_due": 999}}
+    assert [s["url"] for s in due_sources(fontes, tabela, 100, 10)] == ["nova", "b", "a"]
+    assert [s["url"] for s in due_sources(fontes, tabela, 100, 2)] == ["nova", "b"]
+    assert len(due_sources(fontes, "lixo", 100, 10)) == 4
@@ -113,7 +113,10 @@ class TestContratoGenerico:
         Falhar aqui é o lembrete de decidir qual das duas.
         """
         tratadas = {"dedup", "http_cache", "html_monitor", "html_hashes",
-                    "html_monitor_posted"}
+                    "html_monitor_posted", "feed_marks", "host_limits",
+                    "retry_queue", "source_cadence", "html_monitor_checked_at",
+                    "source_stats", "breakers", "html_monitor_http",
+                    "html_monitor_links"}
         metadados = {"last_cleanup", "last_announced_hash"}
 
         origem = open(os.path.join(_ROOT, "core", "scanner", "engine.py"),
@@ -0,0 +1,187 @@
+"""
+Entrega ao Discord por fila de canal (core/scanner/dispatcher.py).
+
+Garantias: ordem e espaçamento dentro do mesmo canal, paralelismo entre canais
+diferentes e um callback por entrega com o resultado real do envio.
+"""
+import asyncio
+import time
+
+import pytest
+
+from core.scanner.dispatcher import DeliveryDispatcher
+
+
+class Canal:
+    def __init__(self, cid, registro, atraso=0.0, falha=False):
+        self.id = cid
+        self.registro = registro
+        self.atraso = atraso
+        self.falha = falha
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await asyncio.sleep(self.atraso)
+        if self.falha:
+            raise RuntimeError("403 Forbidden")
+        self.registro.append((self.id, embed, time.monotonic()))
+
+
+@pytest.mark.asyncio
+async def test_mesmo_canal_em_ordem_e_espacado():
+    registro = []
+    disp = DeliveryDispatcher(concurrency=5, channel_interval=0.05, global_rate=50)
+    canal = Canal(1, registro)
+    for i in range(4):
+        disp.submit(canal, lambda ok, err: None, embed=i)
+    await disp.join()
+    await disp.close()
+
+    assert [e for _, e, _ in registro] == [0, 1, 2, 3]
+    tempos = [t for _, _, t in registro]
+    assert all(b - a >= 0.045 for a, b in zip(tempos, tempos[1:]))
+
+
+@pytest.mark.asyncio
+async def test_canais_diferentes_enviam_em_paralelo():
+    registro = []
+    disp = DeliveryDispatcher(concurrency=5, channel_interval=0.0, global_rate=50)
+    inicio = time.monotonic()
+    for cid in range(5):
+        disp.submit(Canal(cid, registro, atraso=0.2), lambda ok, err: None, embed=cid)
+    await disp.join()
+    await disp.close()
+
+    assert len(registro) == 5
+    # Em série seriam 1.0s; em paralelo, ~0.2s.
+    assert time.monotonic() - inicio < 0.6
+
+
+@pytest.mark.asyncio
+async def test_espacamento_de_um_canal_nao_segura_vaga_dos_outros():
+    registro = []
+    disp = DeliveryDispatcher(concurrency=2, channel_interval=0.5, global_rate=50)
+    inicio = time.monotonic()
+    # Canais 1 e 2 têm segunda mensagem: passam 0.5s esperando o próprio espaçamento.
+    for cid in (1, 2):
+        canal = Canal(cid, registro)
+        disp.submit(canal, lambda ok, err: None, embed=f"{cid}a")
+        disp.submit(canal, lambda ok, err: None, embed=f"{cid}b")
+    await asyncio.sleep(0.1)
+    for cid in (3, 4, 5):
+        disp.submit(Canal(cid, registro, atraso=0.05), lambda ok, err: None, embed=f"{cid}a")
+    await disp.join()
+    await disp.close()
+
+    tempos = {e: t - inicio for _, e, t in registro}
+    # Com a espera dentro da vaga, 3/4/5 só sairiam depois de ~0.5s.
+    assert max(tempos["3a"], tempos["4a"], tempos["5a"]) < 0.35
+    assert max(tempos["3a"], tempos["4a"], tempos["5a"]) < min(tempos["1b"], tempos["2b"])
+    assert tempos["1b"] >= 0.45 and tempos["2b"] >= 0.45
+
+
+@pytest.mark.asyncio
+async def test_callback_recebe_resultado_de_cada_envio():
+    resultados = []
+    disp = DeliveryDispatcher(concurrency=2, channel_interval=0.0, global_rate=50)
+    disp.submit(Canal(1, []), lambda ok, err: resultados.append(("ok", ok, err)), embed="a")
+    disp.submit(Canal(2, [], falha=True), lambda ok, err: resultados.append(("falha", ok, err)), embed="b")
+    await disp.join()
+    await disp.close()
+
+    por_nome = {nome: (ok, err) for nome, ok, err in resultados}
+    assert por_nome["ok"] == (True, None)
+    assert por_nome["falha"][0] is False
+    assert isinstance(por_nome["falha"][1], RuntimeError)
+    assert (disp.sent, disp.failed, disp.pending) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_callback_com_erro_nao_para_a_fila():
+    registro = []
+    disp = DeliveryDispatcher(concurrency=1, channel_interval=0.0, global_rate=50)
+    canal = Canal(1, registro)
+
+    def explode(ok, err):
+        raise ValueError("bug no callback")
+
+    disp.submit(canal, explode, embed=1)
+    disp.submit(canal, lambda ok, err: None, embed=2)
+    await disp.join()
+    await disp.close()
+
+    assert [e for _, e, _ in registro] == [1, 2]
+
+
+class CanalLote:
+    def __init__(self, cid=1, atraso=0.0):
+        self.id = cid
+        self.atraso = atraso
+        self.mensagens = []
+
+    async def send(self, content=None, embed=None, embeds=None, **kwargs):
+        await asyncio.sleep(self.atraso)
+        self.mensagens.append((content, [embed] if embed is not None else list(embeds)))
+
+
+@pytest.mark.asyncio
+async def test_lote_junta_embeds_do_mesmo_canal_ate_dez():
+    canal = CanalLote()
+    disp = DeliveryDispatcher(concurrency=5, channel_interval=0.0, global_rate=50, batch_embeds=True)
+    resultados = []
+    for i in range(23):
+        disp.submit(canal, lambda ok, err, i=i: resultados.append((i, ok)), content=None, embed=f"e{i}")
+    await disp.join()
+    await disp.close()
+
+    assert [len(embeds) for _, embeds in canal.mensagens] == [10, 10, 3]
+    assert [e for _, embeds in canal.mensagens for e in embeds] == [f"e{i}" for i in range(23)]
+    # Dedup continua por item: um callback por pedido, não por mensagem.
+    assert sorted(resultados) == [(i, True) for i in range(23)]
+    assert (disp.sent, disp.messages) == (23, 3)
+
+
+@pytest.mark.asyncio
+async def test_lote_video_sai_sozinho_e_ordem_preservada():
+    canal = CanalLote()
+    disp = DeliveryDispatcher(concurrency=5, channel_interval=0.0, global_rate=50, batch_embeds=True)
+    disp.submit(canal, lambda ok, err: None, content=None, embed="a")
+    disp.submit(canal, lambda ok, err: None, content=None, embed="b")
+    disp.submit(canal, lambda ok, err: None, content="https://youtu.be/x", embed="video")
+    disp.submit(canal, lambda ok, err: None, content=None, embed="c")
+    await disp.join()
+    await disp.close()
+
+    assert canal.mensagens == [
+        (None, ["a", "b"]),
+        ("https://youtu.be/x", ["video"]),
+        (None, ["c"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lote_respeita_6000_caracteres():
+    canal = CanalLote()
+    disp = DeliveryDispatcher(concurrency=5, channel_interval=0.0, global_rate=50, batch_embeds=True)
+    for i in range(4):
+        disp.submit(canal, lambda ok, err: None, embed=str(i) * 2500)
+    await disp.join()
+    await disp.close()
+
+    assert [len(embeds) for _, embeds in canal.mensagens] == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_lote_falha_vale_para_todos_os_itens():
+    class CanalQuebrado(CanalLote):
+        async def send(self, **kwargs):
+            raise RuntimeError("400 Bad Request")
+
+    disp = DeliveryDispatcher(concurrency=5, channel_interval=0.0, global_rate=50, batch_embeds=True)
+    resultados = []
+    for i in range(3):
+        disp.submit(CanalQuebrado(), lambda ok, err: resultados.append(ok), embed=f"e{i}")
+    await disp.join()
+    await disp.close()
+
+    assert resultados == [False, False, False]
+    assert disp.failed == 3
@@ -0,0 +1,165 @@
+"""
+Descoberta de feed/sitemap dos sites oficiais (core/discovery.py) e a rota que ela muda.
+
+Um servidor aiohttp local faz três "sites oficiais": um anuncia feed RSS, outro
+só tem sitemap (via robots.txt → índice → filho) e o terceiro nenhum dos dois.
+O do feed sai do HTML Monitor e entra no load_sources; o do sitemap só tem a
+página baixada quando o sitemap muda.
+"""
+import pytest
+from aiohttp import web
+
+import core.discovery as discovery
+import core.html_monitor as html_monitor
+import core.scanner.fetcher as fetcher
+from core.proxy_pool import ProxyPool
+from core.stats import stats
+from utils.http_client import HttpClientService
+
+_RSS = (
+    '<?xml version="1.0"?><rss version="2.0"><channel><title>A</title>'
+    "<item><title>Novo kit</title><link>https://a.jp/news/1</link></item></channel></rss>"
+)
+_ENCHIMENTO = "<p>" + "menu banner ranking " * 400 + "</p>"
+
+
+@pytest.fixture
+async def sites(monkeypatch):
+    pedidos = []
+    lastmod = {"b": "2026-10-01"}
+
+    def pagina(corpo, head=""):
+        return web.Response(
+            text=f"<html><head><title>Oficial</title>{head}</head><body>{corpo}{_ENCHIMENTO}</body></html>",
+            content_type="text/html",
+        )
+
+    async def handler(request):
+        caminho = request.path
+        pedidos.append(caminho)
+        if caminho == "/a/":
+            return pagina("<ul id='news'><li>a</li></ul>", "<link rel='alternate' type='application/rss+xml' href='/a/feed.xml'>"
+                          "<link rel='alternate' type='application/rss+xml' href='/a/comments/feed'>")
+        if caminho == "/a/feed.xml":
+            return web.Response(text=_RSS, content_type="application/rss+xml")
+        if caminho == "/b/":
+            return pagina(f"<ul id='news'><li>{lastmod['b']}</li></ul>")
+        if caminho == "/c/":
+            return pagina("<ul id='news'><li>c</li></ul>")
+        if caminho == "/robots.txt":
+            return web.Response(text=f"User-agent: *\nSitemap: {base}/sm-index.xml\n")
+        if caminho == "/sm-index.xml":
+            return web.Response(
+                text=f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                     f"<sitemap><loc>{base}/sm-loja.xml</loc></sitemap><sitemap><loc>{base}/sm-b.xml</loc></sitemap>"
+                     "</sitemapindex>",
+                content_type="application/xml",
+            )
+        if caminho == "/sm-loja.xml":
+            return web.Response(text='<urlset><url><loc>https://x/loja/1</loc><lastmod>2026-01-01</lastmod></url></urlset>')
+        if caminho == "/sm-b.xml":
+            return web.Response(
+                text=f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                     f"<url><loc>{base}/b/news/1</loc><lastmod>{lastmod['b']}</lastmod></url></urlset>",
+                content_type="application/xml",
+            )
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    tcp = web.TCPSite(runner, "127.0.0.1", 0)
+    await tcp.start()
+    base = f"http://127.0.0.1:{tcp._server.sockets[0].getsockname()[1]}"
+    fontes = {"official_sites": [{"name": n.upper(), "url": f"{base}/{n}/"} for n in "abc"]}
+
+    cliente = HttpClientService()
+    for mod in (discovery, html_monitor):
+        monkeypatch.setattr(mod, "validate_url", lambda u: (True, None))
+    monkeypatch.setattr(html_monitor, "http_client", cliente)
+    monkeypatch.setattr(html_monitor, "proxy_pool", ProxyPool([]))
+    monkeypatch.setattr(html_monitor, "HTML_BACKEND", "html.parser")
+    monkeypatch.setattr(html_monitor, "load_json_safe", lambda c, d: fontes)
+    monkeypatch.setattr(fetcher, "load_json_safe", lambda c, d: fontes)
+    try:
+        yield base, cliente, pedidos, lastmod
+    finally:
+        await cliente.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_descobre_feed_e_sitemap_e_mede_a_economia(sites):
+    base, cliente, _, _ = sites
+    alvo = [{"url": f"{base}/{n}/"} for n in "abc"]
+    results = await discovery.discover_sites(cliente.session(), alvo)
+
+    a, b, c = (results[f"{base}/{n}/"] for n in "abc")
+    assert a["feed"] == f"{base}/a/feed.xml" and a["sitemap"] is None
+    # Do índice, só o filho que cobre /b/ com <lastmod> serve.
+    assert b["feed"] is None and b["sitemap"] == f"{base}/sm-b.xml"
+    assert c["feed"] is None and c["sitemap"] is None
+    assert a["html_bytes"] > a["alt_bytes"] > 0
+
+    economia = discovery.savings(discovery.routes_for(alvo, {"sites": results}))
+    assert economia["feed"] == 1 and economia["sitemap"] == 1
+    assert economia["bytes"] == a["html_bytes"] - a["alt_bytes"] + b["html_bytes"] - b["alt_bytes"]
+
+
+@pytest.mark.asyncio
+async def test_overlay_tira_o_site_do_html_monitor(sites):
+    base, cliente, pedidos, lastmod = sites
+    a, b, c = (f"{base}/{n}/" for n in "abc")
+    discovery.save_overlay(await discovery.discover_sites(cliente.session(), [{"url": u} for u in (a, b, c)]))
+
+    # O feed descoberto vira fonte normal, na pista das oficiais.
+    descobertas = [src for src in fetcher.load_sources() if src["metadata"].get("discovered_from")]
+    assert [(s["url"], s["metadata"]["priority"]) for s in descobertas] == [(f"{base}/a/feed.xml", "high")]
+
+    http_state = {}
+    pedidos.clear()
+    _, hashes = await html_monitor.check_official_sites({a: "velho"}, http_state)
+    assert set(hashes) == {b, c} and "/a/" not in pedidos
+
+    # Sitemap igual: a página de /b/ nem é pedida; a de /c/ (sem rota) é.
+    pedidos.clear()
+    antes = stats.html_sitemap_unchanged_total
+    updates, hashes = await html_monitor.check_official_sites(hashes, http_state)
+    assert updates == [] and "/b/" not in pedidos and "/c/" in pedidos
+    assert stats.html_sitemap_unchanged_total == antes + 1
+
+    # lastmod avançou: a página volta a ser baixada e a mudança aparece.
+    lastmod["b"] = "2026-10-18"
+    pedidos.clear()
+    updates, _ = await html_monitor.check_official_sites(hashes, http_state)
+    assert "/b/" in pedidos and [u["link"] for u in updates] == [b]
+
+
+def test_site_fora_da_descoberta_e_area_do_sitemap():
+    overlay = {"sites": {"https://a.jp/": {"feed": "https://a.jp/feed"}, "https://b.jp/": {"sitemap": "https://b.jp/s.xml"}}}
+    sites = [{"url": "https://a.jp/", "discovery": False}, {"url": "https://b.jp/"}, {"url": "https://z.jp/"}]
+    assert list(discovery.routes_for(sites, overlay)) == ["https://b.jp/"]
+    assert discovery.site_prefix("https://www.bandainamco.co.jp/en/pavilion/index.php") == "bandainamco.co.jp/en/pavilion/"
+
+
+def test_sitemap_gzip_e_descomprimido_com_teto():
+    import gzip
+    import tracemalloc
+
+    sitemap = (
+        b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        b"<url><loc>https://b.jp/news/1</loc><lastmod>2026-10-01</lastmod></url></urlset>"
+    )
+    assert discovery.parse_sitemap(gzip.compress(sitemap)) == ([("https://b.jp/news/1", "2026-10-01")], [])
+
+    # ~100 KB de gzip que inflariam para 200 MB: a descompressão para no teto.
+    bomba = gzip.compress(b"<urlset>" + b" " * (200 * 1024 * 1024), compresslevel=9)
+    tracemalloc.start()
+    try:
+        assert discovery.parse_sitemap(bomba) == ([], [])
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Sem o teto, o pico passaria dos 200 MB inflados.
+    assert pico < 10 * discovery._MAX_BODY_BYTES
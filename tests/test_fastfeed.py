@@ -0,0 +1,139 @@
+"""
+Parser rápido de feeds: só os N primeiros itens, mesmos campos do feedparser.
+
+A garantia central é de paridade: para RSS 2.0 e Atom (YouTube), os campos que
+o engine lê têm de sair iguais aos do feedparser. O que o parser rápido não
+entende levanta UnsupportedFeedFormatError para o fetcher cair no feedparser.
+"""
+import feedparser
+import pytest
+
+from core.scanner.fastfeed import parse_top_entries
+from utils.exceptions import UnsupportedFeedFormatError
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel><title>Blog</title><lastBuildDate>Mon, 05 Jan 2026 10:00:00 GMT</lastBuildDate>
+%s
+</channel></rss>"""
+
+ITEM = """<item>
+  <title>HG Gundam %(n)d &amp; Aerial</title>
+  <link>https://blog.jp/%(n)d</link>
+  <guid isPermaLink="false">post-%(n)d</guid>
+  <pubDate>Mon, 0%(d)d Jan 2026 10:00:00 GMT</pubDate>
+  <description>&lt;p&gt;Kit %(n)d&lt;/p&gt;</description>
+  <media:thumbnail url="https://img.jp/%(n)d.jpg" width="72" height="72"/>
+</item>"""
+
+ATOM = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015"
+      xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">
+ <title>GUNDAM CHANNEL</title>
+ <entry>
+  <id>yt:video:abc</id>
+  <yt:videoId>abc</yt:videoId>
+  <title>Gundam GQuuuuuuX PV</title>
+  <link rel="alternate" href="https://www.youtube.com/watch?v=abc"/>
+  <published>2026-01-03T12:00:00+00:00</published>
+  <updated>2026-01-04T12:00:00+00:00</updated>
+  <media:group>
+   <media:title>Gundam GQuuuuuuX PV</media:title>
+   <media:thumbnail url="https://i4.ytimg.com/vi/abc/hqdefault.jpg" width="480" height="360"/>
+   <media:description>Trailer oficial</media:description>
+  </media:group>
+ </entry>
+</feed>"""
+
+CAMPOS = ("title", "link", "id", "summary", "published", "published_parsed", "updated", "updated_parsed")
+
+
+def _rss(n):
+    return RSS % "".join(ITEM % {"n": i, "d": 9 - i} for i in range(n)).encode()
+
+
+def _paridade(rapido, referencia):
+    for campo in CAMPOS:
+        assert rapido.get(campo) == referencia.get(campo), campo
+    if "media_thumbnail" in referencia:
+        assert rapido["media_thumbnail"][0]["url"] == referencia.media_thumbnail[0]["url"]
+
+
+def test_rss_paridade_com_feedparser():
+    corpo = _rss(3)
+    rapido = parse_top_entries(corpo, None)
+    referencia = feedparser.parse(corpo).entries
+    assert len(rapido) == len(referencia) == 3
+    for a, b in zip(rapido, referencia):
+        _paridade(a, b)
+
+
+def test_atom_youtube_paridade_com_feedparser():
+    rapido = parse_top_entries(ATOM, 15)
+    referencia = feedparser.parse(ATOM).entries
+    assert len(rapido) == 1
+    _paridade(rapido[0], referencia[0])
+    # Atributo e dict, como o FeedParserDict do feedparser.
+    assert rapido[0].media_thumbnail[0]["url"].endswith("hqdefault.jpg")
+
+
+def test_para_no_n_esimo_item_sem_ler_o_resto():
+    # Lixo depois do 2º item: só não quebra se o parser parou antes de chegar lá.
+    corpo = _rss(2).replace(b"</channel></rss>", b"<<< corrompido &&& " * 5000)
+    entradas = parse_top_entries(corpo, 2)
+    assert [e.link for e in entradas] == ["https://blog.jp/0", "https://blog.jp/1"]
+
+
+@pytest.mark.parametrize("corpo", [
+    b'<?xml version="1.0"?><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"></rdf:RDF>',
+    b"<html><body>Cloudflare</body></html>",
+    b"<rss><channel><item><title>&nbsp;quebrado</title></item></channel></rss>",
+    b"<rss><channel><title>vazio</title></channel></rss>",
+])
+def test_formatos_nao_suportados_devolvem_ao_feedparser(corpo):
+    with pytest.raises(UnsupportedFeedFormatError):
+        parse_top_entries(corpo, 10)
+
+
+@pytest.mark.asyncio
+async def test_fetcher_usa_parser_rapido_e_cai_no_feedparser(monkeypatch):
+    import aiohttp
+    from aiohttp import web
+
+    import core.scanner.fetcher as fetcher
+    import core.scanner.parsepool as parsepool
+
+    rdf = (
+        b'<?xml version="1.0"?><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" '
+        b'xmlns="http://purl.org/rss/1.0/"><channel rdf:about="x"><title>t</title></channel>'
+        b'<item rdf:about="https://r.jp/1"><title>Gundam</title><link>https://r.jp/1</link></item></rdf:RDF>'
+    )
+    corpos = {"/rss": _rss(9), "/rdf": rdf}
+
+    async def handler(request):
+        return web.Response(body=corpos[request.path], content_type="application/xml")
+
+    app = web.Application()
+    app.router.add_get("/{nome}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    monkeypatch.setattr(fetcher, "validate_url", lambda u: (True, None))
+    monkeypatch.setattr(fetcher, "FEED_FAST_PARSER", True)
+    monkeypatch.setattr(fetcher, "MAX_ENTRIES_PER_FEED", 4)
+    usados = []
+    original = parsepool.feedparser.parse
+    monkeypatch.setattr(parsepool.feedparser, "parse", lambda *a, **k: usados.append(1) or original(*a, **k))
+    try:
+        async with aiohttp.ClientSession() as session:
+            _, entradas = await fetcher.fetch_feed(session, {"url": f"{base}/rss", "metadata": {}}, {})
+            assert len(entradas) == 4 and not usados
+
+            _, entradas = await fetcher.fetch_feed(session, {"url": f"{base}/rdf", "metadata": {}}, {})
+            assert [e.link for e in entradas] == ["https://r.jp/1"] and usados == [1]
+    finally:
+        await runner.cleanup()
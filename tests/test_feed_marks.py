@@ -0,0 +1,217 @@
+"""
+Marcas de água por feed: só entradas realmente novas chegam ao pipeline.
+
+Feed em ordem cronológica para na primeira entrada já vista; feed sem ordem
+confiável usa o conjunto compacto de hashes da janela anterior.
+"""
+import pytest
+from feedparser import FeedParserDict
+
+import core.scanner.engine as engine
+from core.scanner.processor import build_feed_mark, unseen_entries
+from utils.storage import clean_state
+
+
+def _e(guid, published=None, link=None):
+    d = FeedParserDict(id=guid, link=link or f"https://site.com/{guid}", title="Gundam", summary="")
+    if published:
+        d["published"] = published
+    return d
+
+
+ORDENADO = [
+    _e("c", "2026-01-03T00:00:00+00:00"),
+    _e("b", "2026-01-02T00:00:00+00:00"),
+    _e("a", "2026-01-01T00:00:00+00:00"),
+]
+
+
+class TestMarca:
+    def test_sem_marca_devolve_janela_inteira(self):
+        assert unseen_entries(ORDENADO, None) == ORDENADO
+
+    def test_feed_ordenado_para_na_primeira_ja_vista(self):
+        mark = build_feed_mark(ORDENADO)
+        assert mark["ordered"] is True and mark["guid"] == "c"
+        assert "seen" not in mark
+
+        novo = [_e("d", "2026-01-04T00:00:00+00:00")] + ORDENADO
+        assert [e["id"] for e in unseen_entries(novo, mark)] == ["d"]
+        assert unseen_entries(ORDENADO, mark) == []
+
+    def test_feed_ordenado_sem_a_guid_da_marca_usa_a_data(self):
+        mark = build_feed_mark(ORDENADO)
+        # A entrada da marca saiu do feed (editada/removida): a data decide.
+        novo = [_e("d", "2026-01-04T00:00:00+00:00"), ORDENADO[1], ORDENADO[2]]
+        assert [e["id"] for e in unseen_entries(novo, mark)] == ["d"]
+
+    def test_feed_sem_ordem_usa_conjunto_de_vistos(self):
+        janela = [_e("x"), _e("y", "2026-01-01T00:00:00+00:00"), _e("z")]
+        mark = build_feed_mark(janela)
+        assert mark["ordered"] is False
+        assert len(mark["seen"]) == 3 and all(len(h) == 12 for h in mark["seen"])
+
+        # Entrada nova no MEIO da lista: um feed fora de ordem não pode parar cedo.
+        novo = [_e("x"), _e("novo"), _e("y", "2026-01-01T00:00:00+00:00"), _e("z")]
+        assert [e["id"] for e in unseen_entries(novo, mark)] == ["novo"]
+
+    def test_rss2_pubdate_rfc822_conta_como_ordenado(self):
+        import feedparser
+
+        rss = (
+            '<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+            "<item><guid>c</guid><link>https://site.com/c</link><pubDate>Sat, 03 Jan 2026 00:00:00 +0900</pubDate></item>"
+            "<item><guid>b</guid><link>https://site.com/b</link><pubDate>Fri, 02 Jan 2026 00:00:00 GMT</pubDate></item>"
+            "</channel></rss>"
+        )
+        entradas = feedparser.parse(rss).entries
+        mark = build_feed_mark(entradas)
+        assert mark["ordered"] is True and "seen" not in mark
+        # 2026-01-03 00:00 +0900 = 2026-01-02 15:00 UTC.
+        assert mark["ts"] == 1767366000.0
+
+        novo = feedparser.parse(rss.replace("<item><guid>c</guid>", (
+            "<item><guid>d</guid><link>https://site.com/d</link><pubDate>Sun, 04 Jan 2026 00:00:00 GMT</pubDate></item>"
+            "<item><guid>c</guid>"
+        ))).entries
+        assert [e["id"] for e in unseen_entries(novo, mark)] == ["d"]
+
+    def test_sem_guid_usa_link_limpo(self):
+        sem_id = FeedParserDict(link="https://site.com/n?utm_source=rss", title="t")
+        mark = build_feed_mark([sem_id])
+        assert mark["guid"] == "https://site.com/n"
+
+
+def test_clean_state_dedup_e_tudo_limpam_marcas(tmp_path, monkeypatch):
+    import utils.storage as storage
+    monkeypatch.setattr(storage, "p", lambda nome: str(tmp_path / nome))
+    state = {"dedup": {"f": {"l": ["1"]}}, "feed_marks": {"f": {"guid": "l"}}}
+    for tipo in ("dedup", "tudo"):
+        novo, antes = clean_state(state, tipo)
+        assert novo["feed_marks"] == {}
+        assert antes["feed_marks_feeds"] == 1
+    novo, _ = clean_state(state, "http_cache")
+    assert novo["feed_marks"] == state["feed_marks"]
+
+
+class Canal:
+    def __init__(self, enviados, falhar):
+        self.enviados = enviados
+        self.falhar = falhar
+
+    async def send(self, content=None, embed=None, **kwargs):
+        if self.falhar:
+            raise RuntimeError("503")
+        self.enviados.append(embed)
+
+
+@pytest.fixture
+def scan(tmp_path, monkeypatch):
+    from unittest.mock import MagicMock
+
+    enviados = []
+    controle = {"falhar": False, "entradas": []}
+    bot = MagicMock()
+    monkeypatch.setattr(engine, "_missing_channel_scans", {})
+    bot.get_channel.side_effect = lambda cid: None if controle.get("sem_canal") else Canal(enviados, controle["falhar"])
+    config = {"1": {"channel_id": 10, "filters": ["todos"], "language": "en_US"}}
+    vistos = []
+
+    monkeypatch.setattr(engine, "p", lambda nome: str(tmp_path / nome))
+    monkeypatch.setattr(engine, "load_config_cached", lambda default=None: config)
+    monkeypatch.setattr(engine, "load_sources", lambda: [{"url": "https://f.com/rss", "metadata": {}}])
+    monkeypatch.setattr(engine, "load_history", lambda: ([], set()))
+    monkeypatch.setattr(engine, "save_history", lambda *a, **k: None)
+    monkeypatch.setattr(engine, "save_translation_cache", lambda: None)
+    monkeypatch.setattr(engine, "FEED_FETCH_JITTER_MIN", 0.0)
+    monkeypatch.setattr(engine, "FEED_FETCH_JITTER_MAX", 0.0)
+    monkeypatch.setattr(engine, "DISCORD_CHANNEL_MIN_INTERVAL_SEC", 0.0)
+
+    def classificar(title, summary, source_url=None):
+        vistos.append(title)
+        return frozenset()
+
+    async def sem_thumb(entry, session=None):
+        return None
+
+    async def embed_falso(bot, entry, lang, cfg, session=None, thumbnail_url=None):
+        return entry["link"]
+
+    async def sem_html(estado, http_state=None, links_state=None):
+        return [], estado
+
+    async def fetch_falso(session, src, http_cache, wait=None, failures=None, hedge_after=None, probe=False, **_):
+        return src["url"], list(controle["entradas"])
+
+    monkeypatch.setattr(engine, "classify_intel", classificar)
+    monkeypatch.setattr(engine, "resolve_thumbnail", sem_thumb)
+    monkeypatch.setattr(engine, "create_embed", embed_falso)
+    monkeypatch.setattr(engine, "check_official_sites", sem_html)
+    monkeypatch.setattr(engine, "fetch_feed", fetch_falso)
+
+    async def rodar():
+        vistos.clear()
+        await engine.run_scan_once(bot, trigger="teste")
+        return list(vistos)
+
+    return controle, enviados, rodar
+
+
+def _agora(guid, horas_atras):
+    from datetime import datetime, timedelta, timezone
+    ts = datetime.now(timezone.utc) - timedelta(hours=horas_atras)
+    d = _e(guid, ts.isoformat())
+    d["title"] = f"Gundam {guid}"
+    return d
+
+
+@pytest.mark.asyncio
+async def test_segunda_varredura_so_processa_o_que_e_novo(scan):
+    controle, enviados, rodar = scan
+    controle["entradas"] = [_agora("b", 1), _agora("a", 2)]
+    assert len(await rodar()) == 2
+
+    controle["entradas"] = [_agora("c", 0)] + controle["entradas"]
+    assert await rodar() == ["Gundam c"]
+    assert await rodar() == []
+    assert len(enviados) == 3
+
+
+@pytest.mark.asyncio
+async def test_falha_de_entrega_nao_avanca_a_marca(scan):
+    controle, enviados, rodar = scan
+    controle["entradas"] = [_agora("a", 1)]
+    controle["falhar"] = True
+    await rodar()
+    assert enviados == []
+
+    controle["falhar"] = False
+    assert await rodar() == ["Gundam a"]
+    assert enviados == ["https://site.com/a"]
+
+
+@pytest.mark.asyncio
+async def test_canal_ausente_nao_avanca_a_marca(scan):
+    controle, enviados, rodar = scan
+    controle["entradas"] = [_agora("a", 1)]
+    controle["sem_canal"] = True
+    await rodar()
+    assert enviados == []
+
+    controle["sem_canal"] = False
+    assert await rodar() == ["Gundam a"]
+    assert enviados == ["https://site.com/a"]
+
+
+@pytest.mark.asyncio
+async def test_canal_apagado_segura_a_marca_so_por_algumas_rodadas(scan):
+    controle, enviados, rodar = scan
+    controle["entradas"] = [_agora("a", 1)]
+    controle["sem_canal"] = True
+    # Canal sumido: a entrada volta a ser avaliada enquanto durar a tolerância...
+    for _ in range(engine._MISSING_CHANNEL_GRACE_SCANS):
+        assert await rodar() == ["Gundam a"]
+    # ...e depois a marca avança: um canal apagado não congela o feed.
+    assert await rodar() == ["Gundam a"]
+    assert await rodar() == []
+    assert enviados == []
@@ -61,13 +61,17 @@ def test_requirements_has_dependencies():
 
 
 def test_main_has_ssl_fix():
-    """Verifica que o scanner usa certifi para SSL (config de SSL vive no engine modular)."""
+    """Verifica que o scanner usa certifi para SSL (config de SSL vive no cliente HTTP compartilhado)."""
+    with open("utils/http_client.py", "r", encoding="utf-8") as f:
+        client_content = f.read()
     with open("core/scanner/engine.py", "r", encoding="utf-8") as f:
         scanner_content = f.read()
 
     # Deve usar certifi
-    assert "certifi" in scanner_content, "core/scanner/engine.py deve importar certifi para SSL seguro"
+    assert "certifi" in client_content, "utils/http_client.py deve usar certifi para SSL seguro"
+    assert "http_client" in scanner_content, "core/scanner/engine.py deve usar o cliente HTTP compartilhado"
 
     # NÃO deve ter CERT_NONE (inseguro)
-    assert "CERT_NONE" not in scanner_content, "core/scanner/engine.py não deve usar CERT_NONE (inseguro)"
+    for nome, conteudo in (("utils/http_client.py", client_content), ("core/scanner/engine.py", scanner_content)):
+        assert "CERT_NONE" not in conteudo, f"{nome} não deve usar CERT_NONE (inseguro)"
 
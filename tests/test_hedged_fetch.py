@@ -0,0 +1,113 @@
+"""
+Hedge de fallback: se a principal não responde no p90, o 1º fallback corre em paralelo.
+
+O teste sobe um servidor aiohttp local com uma principal lenta e um fallback
+rápido; a chave devolvida continua a ser a URL canônica.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+import core.scanner.fetcher as fetcher
+from core.stats import stats
+
+_RSS = (
+    b'<?xml version="1.0"?><rss version="2.0"><channel><title>Gunpla 101</title>'
+    b"<item><title>HG</title><link>https://gunpla101.com/hg</link></item></channel></rss>"
+)
+
+
+@pytest.fixture
+async def servidor(monkeypatch):
+    pedidos = []
+
+    async def lento(request):
+        pedidos.append("lento")
+        await asyncio.sleep(1.5)
+        return web.Response(body=_RSS, content_type="application/rss+xml")
+
+    async def rapido(request):
+        pedidos.append("rapido")
+        return web.Response(body=_RSS, content_type="application/rss+xml")
+
+    app = web.Application()
+    app.router.add_get("/lento", lento)
+    app.router.add_get("/rapido", rapido)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    porta = site._server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(fetcher, "validate_url", lambda u: (True, None))
+    try:
+        yield f"http://127.0.0.1:{porta}", pedidos
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_fallback_em_paralelo_vence_a_principal_lenta(servidor):
+    base, pedidos = servidor
+    src = {"url": f"{base}/lento", "metadata": {"fallbacks": [f"{base}/rapido"], "hedge": True}}
+    antes = stats.hedges_won
+
+    inicio = time.monotonic()
+    async with aiohttp.ClientSession() as session:
+        resultado = await fetcher.fetch_feed(session, src, {}, hedge_after=0.2)
+
+    assert resultado is not None
+    url, entradas = resultado
+    assert url == f"{base}/lento"  # a chave de dedup continua a canônica
+    assert len(entradas) == 1
+    # Sem hedge, o fallback só sairia depois dos 1.5s da principal.
+    assert time.monotonic() - inicio < 1.0
+    assert pedidos == ["lento", "rapido"] and stats.hedges_won == antes + 1
+
+
+@pytest.mark.asyncio
+async def test_principal_rapida_nao_dispara_o_fallback(servidor):
+    base, pedidos = servidor
+    src = {"url": f"{base}/rapido", "metadata": {"fallbacks": [f"{base}/lento"], "hedge": True}}
+    antes = stats.hedges_started
+
+    async with aiohttp.ClientSession() as session:
+        resultado = await fetcher.fetch_feed(session, src, {}, hedge_after=1.0)
+
+    assert resultado is not None and pedidos == ["rapido"]
+    assert stats.hedges_started == antes
+
+
+@pytest.mark.asyncio
+async def test_fallback_do_hedge_ocupa_vaga_propria_e_latencia_e_da_principal(servidor):
+    base, pedidos = servidor
+    src = {"url": f"{base}/lento", "metadata": {"fallbacks": [f"{base}/rapido"], "hedge": True}}
+    vagas = {"em_uso": 0, "pegas": 0}
+
+    @asynccontextmanager
+    async def vaga():
+        vagas["em_uso"] += 1
+        vagas["pegas"] += 1
+        try:
+            yield
+        finally:
+            vagas["em_uso"] -= 1
+
+    latencias = {}
+    async with aiohttp.ClientSession() as session:
+        resultado = await fetcher.fetch_feed(
+            session, src, {}, hedge_after=0.2, hedge_slot=vaga, latencies=latencias
+        )
+        assert resultado is not None and pedidos == ["lento", "rapido"]
+        assert vagas == {"em_uso": 0, "pegas": 1}
+        # A principal foi cancelada: nenhuma latência dela; a do fallback não conta.
+        assert latencias == {}
+
+        pedidos.clear()
+        rapido = {"url": f"{base}/rapido", "metadata": {"fallbacks": [f"{base}/lento"], "hedge": True}}
+        await fetcher.fetch_feed(session, rapido, {}, hedge_after=1.0, hedge_slot=vaga, latencies=latencias)
+    assert vagas["pegas"] == 1  # sem hedge, sem vaga extra
+    assert set(latencias) == {f"{base}/rapido"} and latencias[f"{base}/rapido"] < 1.0
@@ -0,0 +1,134 @@
+"""
+Rate limit por host aprendido dos cabeçalhos (core/host_scheduler.py).
+
+Verifica que 429 + Retry-After bloqueia o host, que x-ratelimit-* fixa a taxa,
+que o aprendido sobrevive a export/load (state["host_limits"]) e que o fetcher
+espera pelo host em vez de martelar um servidor local que pede calma.
+"""
+import asyncio
+import time
+from email.utils import formatdate
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+import core.scanner.fetcher as fetcher
+from core.host_scheduler import HostScheduler, retry_after_seconds
+
+
+def test_retry_after_le_os_dois_cabecalhos_e_limita():
+    assert retry_after_seconds({"Retry-After": "7"}) == 7.0
+    assert retry_after_seconds({"x-ratelimit-reset": "6"}) == 6.0
+    assert retry_after_seconds({"Retry-After": "9999"}) == 300.0
+    assert retry_after_seconds({"Retry-After": "amanhã"}) == 0.0
+    assert retry_after_seconds({}) == 0.0
+
+
+def test_retry_after_http_date_e_reset_em_epoch():
+    # Retry-After como HTTP-date (RFC 9110).
+    daqui_a_30 = formatdate(time.time() + 30, usegmt=True)
+    assert retry_after_seconds({"Retry-After": daqui_a_30}) == pytest.approx(30, abs=2)
+    assert retry_after_seconds({"Retry-After": formatdate(time.time() - 60, usegmt=True)}) == 0.0
+    # x-ratelimit-reset como epoch: segundos até lá, não 300s de teto.
+    reset = str(int(time.time()) + 20)
+    assert retry_after_seconds({"x-ratelimit-reset": reset}) == pytest.approx(20, abs=2)
+
+    agenda = HostScheduler(seeds={})
+    agenda.observe("https://api.example.com/x", 200, {"x-ratelimit-remaining": "40", "x-ratelimit-reset": reset})
+    # 40 pedidos em ~20s, não 40 em 1,7 bilhão de segundos (que cairia em _MIN_RATE).
+    assert agenda.export()["api.example.com"]["rate"] == pytest.approx(2.0, rel=0.15)
+
+
+@pytest.mark.asyncio
+async def test_429_bloqueia_o_host_e_o_aprendido_persiste():
+    agenda = HostScheduler(seeds={})
+    # Host desconhecido: velocidade total.
+    assert await agenda.acquire("https://www.site.jp/a") == 0.0
+
+    agenda.observe("https://site.jp/feed", 429, {"Retry-After": "0.3"})
+    # Subdomínio www partilha o balde do domínio.
+    esperou = await agenda.acquire("https://www.site.jp/b")
+    assert esperou >= 0.25
+    assert agenda.snapshot()["pushbacks"] == 1
+
+    exportado = agenda.export()
+    assert exportado["site.jp"]["hits_429"] == 1
+    assert exportado["site.jp"]["rate"] > 0
+
+    # Restart: o ritmo volta do state.json.
+    nova = HostScheduler(seeds={})
+    nova.load({"site.jp": {**exportado["site.jp"], "blocked_until": time.time() + 0.2}})
+    assert nova.export()["site.jp"]["rate"] == exportado["site.jp"]["rate"]
+    assert await nova.acquire("https://site.jp/c") >= 0.15
+
+    # Estado corrompido não levanta.
+    nova.load({"x.jp": {"rate": "lixo"}, 3: []})
+    nova.load("lixo")
+    assert nova.export() == {}
+
+
+def test_x_ratelimit_fixa_a_taxa_e_semente_e_teto():
+    agenda = HostScheduler(seeds={"reddit.com": (1 / 12, 1.0)})
+    agenda.observe("https://api.example.com/x", 200, {"x-ratelimit-remaining": "20", "x-ratelimit-reset": "10"})
+    assert agenda.export()["api.example.com"]["rate"] == pytest.approx(2.0)
+
+    # O orçamento anunciado pelo Reddit nunca sobe acima do intervalo configurado.
+    agenda.observe("https://old.reddit.com/r/Gundam/.rss", 200,
+                   {"x-ratelimit-remaining": "100", "x-ratelimit-reset": "10"})
+    assert agenda.export()["reddit.com"]["rate"] == pytest.approx(1 / 12, rel=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_cortesia_espaca_o_mesmo_host_e_nao_os_outros():
+    agenda = HostScheduler(seeds={})
+    inicio = time.monotonic()
+    esperas = await asyncio.gather(
+        agenda.pace("https://blog.jp/a.xml", 0.2, 0.2),
+        agenda.pace("https://www.blog.jp/b.xml", 0.2, 0.2),
+        agenda.pace("https://outro.jp/feed", 0.2, 0.2),
+    )
+    assert esperas[0] == 0.0 and esperas[2] == 0.0
+    assert esperas[1] == pytest.approx(0.2, abs=0.05)
+    assert time.monotonic() - inicio < 0.35
+    # Jitter desligado: nenhuma espera.
+    assert await agenda.pace("https://blog.jp/c.xml", 0.0, 0.0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_fetcher_espera_pelo_retry_after_em_vez_de_martelar(monkeypatch):
+    chegadas = []
+    rss = (b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+           b'<item><title>Novo kit</title><link>https://x.jp/1</link></item></channel></rss>')
+
+    async def handler(request):
+        chegadas.append(time.monotonic())
+        if len(chegadas) == 1:
+            return web.Response(status=429, headers={"Retry-After": "0.4"})
+        return web.Response(body=rss, content_type="application/rss+xml")
+
+    app = web.Application()
+    app.router.add_get("/feed", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/feed"
+
+    agenda = HostScheduler(seeds={})
+    monkeypatch.setattr(fetcher, "host_scheduler", agenda)
+    monkeypatch.setattr(fetcher, "validate_url", lambda u: (True, None))
+    # Backoff configurado enorme: se o fetcher o usasse, o teste estouraria.
+    monkeypatch.setattr(fetcher, "_delay_before_feed_retry", lambda attempt: 30.0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            outcome, entries = await fetcher._fetch_feed_url(
+                session, url, {}, {}, aiohttp.ClientTimeout(total=5)
+            )
+    finally:
+        await runner.cleanup()
+
+    assert outcome == fetcher._OK and len(entries) == 1
+    assert len(chegadas) == 2
+    assert chegadas[1] - chegadas[0] >= 0.35
+    assert agenda.export()["127.0.0.1"]["hits_429"] == 1
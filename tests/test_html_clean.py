@@ -0,0 +1,104 @@
+"""
+Limpeza e hash das páginas do HTML Monitor (core/html_clean.py).
+
+O hash do html.parser tem de continuar o de sempre (senão o state.json inteiro
+vira "mudança"), lxml/selectolax (quando instalados) extraem o mesmo texto
+normalizado, e trocar de backend reinicia o hash sem anunciar nada.
+"""
+import hashlib
+
+import pytest
+
+import core.html_monitor as html_monitor
+from core.html_clean import clean_and_hash, hash_key, key_profile, region_signature, resolve_backend
+
+_PAGINA = (
+    "<html><head><title> Gundam Official </title><script>var x = 1</script></head><body>"
+    "<div class='ad big'>PROPAGANDA</div><p>ガンダム  新作</p><span id='clock'>12:00</span>"
+    "<p>Segundo <b>parágrafo</b></p></body></html>"
+)
+
+
+def test_html_parser_mantem_o_hash_de_sempre():
+    titulo, page_hash, tamanho, _ = clean_and_hash(_PAGINA, "html.parser")
+    # Texto que o fetch_page_hash antigo extraía: sem script, .ad nem #clock.
+    esperado = "Gundam Official ガンダム  新作 Segundo parágrafo"
+    assert titulo == "Gundam Official" and tamanho == len(esperado)
+    assert page_hash == hashlib.sha256(esperado.encode("utf-8")).hexdigest()
+    assert hash_key("html.parser", page_hash) == page_hash
+    assert key_profile(page_hash) == ""
+    assert key_profile(hash_key("lxml", page_hash)) == "lxml"
+    assert resolve_backend("inexistente") == "html.parser"
+
+
+@pytest.mark.parametrize("backend", ["lxml", "selectolax"])
+def test_backends_rapidos_extraem_o_mesmo_texto(backend):
+    pytest.importorskip(backend)
+    titulo, page_hash, _, _ = clean_and_hash(_PAGINA, backend)
+    normalizado = "Gundam Official ガンダム 新作 Segundo parágrafo"
+    assert titulo == "Gundam Official"
+    assert page_hash == hashlib.sha256(normalizado.encode("utf-8")).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_troca_de_backend_reinicia_o_hash_sem_anunciar(monkeypatch):
+    url = "https://gundam-official.com/"
+    antigo = "a" * 64  # html.parser, sem prefixo
+    novo = hash_key("lxml", "b" * 64)
+
+    async def fetch_falso(session, u, headers=None, last_hash=None, http_state=None, **regiao):
+        return u, "Gundam", novo, None
+
+    monkeypatch.setattr(html_monitor, "fetch_page_hash", fetch_falso)
+    monkeypatch.setattr(html_monitor, "load_json_safe", lambda c, d: {"official_sites": [{"url": url}]})
+    updates, estado = await html_monitor.check_official_sites({url: antigo})
+    assert updates == [] and estado[url] == novo
+
+    # Mesmo backend, texto diferente: aí sim é novidade.
+    updates, _ = await html_monitor.check_official_sites({url: hash_key("lxml", "c" * 64)})
+    assert len(updates) == 1
+
+
+def _portal(banner, noticias):
+    itens = "".join(f"<li><a href='/news/{i}'>{t}</a></li>" for i, t in enumerate(noticias))
+    return (
+        f"<html><head><title>Portal</title></head><body><div class='hero'>{banner}</div>"
+        f"<section id='news'><ul class='news-list'>{itens}</ul><p class='views'>123 views</p></section>"
+        f"<div class='ranking'>1. HG 2. MG</div></body></html>"
+    )
+
+
+@pytest.mark.parametrize("backend", ["html.parser", "lxml", "selectolax"])
+def test_so_a_regiao_vigiada_entra_no_hash(backend):
+    if backend != "html.parser":
+        pytest.importorskip(backend)
+    regiao = {"watch_selector": "#news ul.news-list", "ignore_selectors": [".views"]}
+
+    def h(pagina):
+        return clean_and_hash(pagina, backend, regiao["watch_selector"], regiao["ignore_selectors"])[1]
+
+    base = h(_portal("Banner A", ["RX-78 novo kit"]))
+    # Banner rotativo fora da região: não é novidade.
+    assert h(_portal("Banner B", ["RX-78 novo kit"])) == base
+    # Notícia nova na lista: é.
+    assert h(_portal("Banner A", ["Hathaway BD", "RX-78 novo kit"])) != base
+    # Seletor que não casa com nada: sem veredito.
+    assert clean_and_hash(_portal("A", ["x"]), backend, "#sumiu")[1] == ""
+
+
+def test_seletores_por_site_do_sources_json():
+    sites = html_monitor._html_monitor_sites_from_sources({"official_sites": [
+        "https://a.jp/",
+        {"url": "https://b.jp/", "watch_selector": " .news ", "ignore_selectors": [".pr", 3, ""]},
+        {"url": "https://c.jp/", "watch_selector": 42},
+        {"url": "https://b.jp/", "watch_selector": "#outra"},
+    ]})
+    assert sites == [
+        {"url": "https://a.jp/"},
+        {"url": "https://b.jp/", "watch_selector": ".news", "ignore_selectors": [".pr"]},
+        {"url": "https://c.jp/"},
+    ]
+    # Região nova num site já vigiado: o perfil do hash muda e o monitor só reinicia.
+    regiao = region_signature(".news", [".pr"])
+    assert key_profile(hash_key("html.parser", "f" * 64, regiao)) == f"html.parser@{regiao}"
+    assert region_signature(None) == ""
@@ -0,0 +1,85 @@
+"""
+GET condicional e digest do corpo bruto no HTML Monitor.
+
+Sobe um servidor aiohttp local com um site que manda ETag (e responde 304) e
+outro que não manda validador nenhum (devolve sempre o mesmo 200). Página sem
+mudança custa um pedido e nenhum parse; corpo novo volta a ser parseado.
+"""
+import pytest
+from aiohttp import web
+
+import core.html_monitor as html_monitor
+from core.proxy_pool import ProxyPool
+from core.stats import stats
+from utils.http_client import HttpClientService
+
+
+@pytest.fixture
+async def sites(monkeypatch):
+    paginas = {"com_etag": "<html><title>A</title><p>v1</p></html>", "sem_etag": "<html><title>B</title><p>v1</p></html>"}
+    condicionais = []
+
+    async def com_etag(request):
+        etag = f'"{hash(paginas["com_etag"])}"'
+        condicionais.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(text=paginas["com_etag"], content_type="text/html", headers={"ETag": etag})
+
+    async def sem_etag(request):
+        return web.Response(text=paginas["sem_etag"], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/com_etag", com_etag)
+    app.router.add_get("/sem_etag", sem_etag)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    urls = [f"{base}/com_etag", f"{base}/sem_etag"]
+
+    cliente = HttpClientService()
+    parses = []
+    clean_original = html_monitor.clean_hash_links
+
+    def clean_contado(content, backend, *regiao):
+        parses.append(backend)
+        return clean_original(content, backend, *regiao)
+
+    monkeypatch.setattr(html_monitor, "http_client", cliente)
+    monkeypatch.setattr(html_monitor, "proxy_pool", ProxyPool([]))
+    monkeypatch.setattr(html_monitor, "HTML_BACKEND", "html.parser")
+    monkeypatch.setattr(html_monitor, "clean_hash_links", clean_contado)
+    monkeypatch.setattr(html_monitor, "validate_url", lambda u: (True, None))
+    monkeypatch.setattr(
+        html_monitor, "load_json_safe", lambda c, d: {"official_sites": [{"url": u} for u in urls]}
+    )
+    try:
+        yield urls, paginas, parses, condicionais
+    finally:
+        await cliente.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_pagina_sem_mudanca_nao_e_parseada(sites):
+    (com_etag, sem_etag), paginas, parses, condicionais = sites
+    http_state = {"https://saiu.do/sources.json": {"etag": '"x"'}}
+
+    _, hashes = await html_monitor.check_official_sites({}, http_state)
+    assert len(parses) == 2 and set(http_state) == {com_etag, sem_etag}
+    assert condicionais == [None]  # sem hash guardado, nada de GET condicional
+
+    antes_304, antes_digest = stats.html_not_modified_total, stats.html_digest_hits_total
+    updates, hashes2 = await html_monitor.check_official_sites(hashes, http_state)
+    assert updates == [] and hashes2 == hashes
+    assert len(parses) == 2  # nenhuma página parseada de novo
+    assert condicionais[-1] is not None
+    assert stats.html_not_modified_total == antes_304 + 1
+    assert stats.html_digest_hits_total == antes_digest + 1
+
+    paginas["sem_etag"] = "<html><title>B</title><p>v2 — novo anúncio</p></html>"
+    updates, _ = await html_monitor.check_official_sites(hashes2, http_state)
+    assert [u["link"] for u in updates] == [sem_etag]
+    assert len(parses) == 3
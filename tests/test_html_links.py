@@ -0,0 +1,93 @@
+"""
+Manchetes novas do HTML Monitor em vez do "🔄 Update" genérico.
+
+O parse devolve os links da região vigiada; o monitor guarda o conjunto por site
+(state["html_monitor_links"]) e, quando o hash muda, emite um item por link que
+não estava lá — texto âncora como título, link do artigo como link.
+"""
+import pytest
+from aiohttp import web
+
+import core.html_monitor as html_monitor
+from core.html_clean import clean_hash_links
+from core.proxy_pool import ProxyPool
+from utils.http_client import HttpClientService
+
+
+def _pagina(noticias, rodape="v1"):
+    itens = "".join(f"<li><a href='/news/{n}'>Notícia {n}</a></li>" for n in noticias)
+    return (
+        "<html><head><title>GUNDAM Official</title></head><body>"
+        "<nav><a href='/'>Home</a><a href='#topo'>Topo</a><a href='javascript:void(0)'>Menu</a></nav>"
+        f"<ul id='news'>{itens}<li><a href='/news/{noticias[0]}'><img src='x.png'></a></li></ul>"
+        f"<div class='ad'><a href='/promo'>Promo</a></div><footer>{rodape}</footer></body></html>"
+    )
+
+
+@pytest.mark.parametrize("backend", ["html.parser", "lxml", "selectolax"])
+def test_links_da_regiao_vigiada(backend):
+    if backend != "html.parser":
+        pytest.importorskip(backend)
+    *_, links = clean_hash_links(_pagina(["b", "a"]), backend, "#news")
+    assert links == [("/news/b", "Notícia b"), ("/news/a", "Notícia a")]
+
+    # Página inteira: fragmentos, javascript: e links dentro de anúncios ficam de fora.
+    *_, links = clean_hash_links(_pagina(["a"]), backend)
+    assert [href for href, _ in links] == ["/", "/news/a"]
+
+
+@pytest.fixture
+async def site(monkeypatch):
+    pagina = {"html": _pagina(["1"])}
+
+    async def handler(request):
+        return web.Response(text=pagina["html"], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    tcp = web.TCPSite(runner, "127.0.0.1", 0)
+    await tcp.start()
+    url = f"http://127.0.0.1:{tcp._server.sockets[0].getsockname()[1]}/"
+
+    cliente = HttpClientService()
+    monkeypatch.setattr(html_monitor, "http_client", cliente)
+    monkeypatch.setattr(html_monitor, "proxy_pool", ProxyPool([]))
+    monkeypatch.setattr(html_monitor, "HTML_BACKEND", "html.parser")
+    monkeypatch.setattr(html_monitor, "HTML_MONITOR_MAX_NEW_LINKS", 3)
+    monkeypatch.setattr(html_monitor, "validate_url", lambda u: (True, None))
+    monkeypatch.setattr(
+        html_monitor, "load_json_safe",
+        lambda c, d: {"official_sites": [{"url": url, "watch_selector": "#news"}]},
+    )
+    try:
+        yield url, pagina
+    finally:
+        await cliente.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_mudanca_vira_uma_manchete_por_link_novo(site):
+    url, pagina = site
+    links = {}
+    updates, hashes = await html_monitor.check_official_sites({}, links_state=links)
+    assert updates == [] and len(links[url]) == 1
+
+    pagina["html"] = _pagina(["3", "2", "1"])
+    updates, hashes = await html_monitor.check_official_sites(hashes, links_state=links)
+    assert [(u["title"], u["link"], u["site"]) for u in updates] == [
+        ("Notícia 3", f"{url}news/3", url),
+        ("Notícia 2", f"{url}news/2", url),
+    ]
+
+    # Mudou o texto, nenhum link novo: nada a postar.
+    pagina["html"] = _pagina(["3", "2", "1"]).replace("Notícia 1", "Notícia 1 (atualizada)")
+    updates, hashes = await html_monitor.check_official_sites(hashes, links_state=links)
+    assert updates == []
+
+    # Redesenho (mais links novos que o teto): o aviso genérico de antes.
+    pagina["html"] = _pagina(["x", "y", "z", "w"])
+    updates, _ = await html_monitor.check_official_sites(hashes, links_state=links)
+    assert [u["link"] for u in updates] == [url] and "site" not in updates[0]
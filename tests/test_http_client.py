@@ -0,0 +1,83 @@
+"""
+Cliente HTTP compartilhado: uma sessão para o bot inteiro, com keep-alive.
+
+Sobe um servidor aiohttp local e verifica que varreduras consecutivas, o HTML
+Monitor e o OpenGraph reaproveitam a mesma sessão e as mesmas conexões.
+"""
+import pytest
+from aiohttp import web
+
+import core.html_monitor as html_monitor
+import utils.opengraph as opengraph
+from core.proxy_pool import ProxyPool
+from utils.http_client import HttpClientService
+
+
+@pytest.fixture
+async def servidor():
+    async def pagina(request):
+        return web.Response(
+            text='<html><head><title>Gundam Official</title>'
+                 '<meta property="og:image" content="https://img.jp/og.jpg"></head>'
+                 '<body><p>Novo kit</p><div class="ad">promo</div></body></html>',
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_get("/", pagina)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    yield f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_sessao_unica_reaproveita_conexoes(servidor):
+    cliente = HttpClientService()
+    try:
+        async with cliente.borrow() as s1:
+            async with s1.get(servidor) as r:
+                await r.read()
+        # A "varredura" terminou: a sessão não foi fechada e a próxima usa a mesma.
+        async with cliente.borrow() as s2:
+            assert s2 is s1 and not s1.closed
+            for _ in range(3):
+                async with s2.get(servidor) as r:
+                    await r.read()
+        snap = cliente.snapshot()
+        assert snap["requests"] == 4
+        assert snap["connections_created"] == 1
+        assert snap["connections_reused"] == 3
+        assert snap["reuse_ratio"] == 0.75
+    finally:
+        await cliente.close()
+    assert s1.closed
+
+
+@pytest.mark.asyncio
+async def test_html_monitor_e_opengraph_usam_a_sessao_compartilhada(servidor, monkeypatch):
+    cliente = HttpClientService()
+    monkeypatch.setattr(html_monitor, "http_client", cliente)
+    monkeypatch.setattr(opengraph, "http_client", cliente)
+    monkeypatch.setattr(html_monitor, "validate_url", lambda u: (True, None))
+    monkeypatch.setattr(opengraph, "validate_url", lambda u: (True, None))
+    monkeypatch.setattr(html_monitor, "proxy_pool", ProxyPool([]))
+    monkeypatch.setattr(html_monitor, "HTML_BACKEND", "html.parser")
+    monkeypatch.setattr(
+        html_monitor, "load_json_safe",
+        lambda caminho, padrao: {"official_sites": [{"url": servidor}]},
+    )
+    try:
+        updates, estado = await html_monitor.check_official_sites({})
+        assert updates == [] and len(estado[servidor]) == 64
+
+        _, titulo, _, _ = await html_monitor.fetch_page_hash(cliente.session(), servidor)
+        assert titulo == "Gundam Official"
+
+        assert await opengraph.fetch_og_image(servidor) == "https://img.jp/og.jpg"
+        snap = cliente.snapshot()
+        assert snap["requests"] == 3 and snap["connections_created"] == 1
+    finally:
+        await cliente.close()
@@ -0,0 +1,77 @@
+"""
+KeywordMatcher: todas as listas de keywords numa passada, sem mudar o que casa.
+
+A referência é `_contains_any`, cujas regras (fronteira de palavra, plural,
+fronteira numérica estrita, substring CJK) estão em test_filters_regex.py. Aqui
+se garante que o matcher combinado responde grupo a grupo o mesmo que chamar
+`_contains_any` em cada lista — inclusive com keywords sobrepostas.
+"""
+import random
+
+import pytest
+
+from core.filters import (
+    BLACKLIST,
+    CAT_MAP,
+    GUNDAM_CORE,
+    GUNDAM_JP_HINTS,
+    GUNDAM_SPECIFIC,
+    NEGATIVE_KEYWORDS,
+    KeywordMatcher,
+    _INTEL_MATCHER,
+    _contains_any,
+)
+
+LISTAS = {
+    "blacklist": BLACKLIST,
+    "negative": NEGATIVE_KEYWORDS,
+    "specific": GUNDAM_SPECIFIC,
+    "core": GUNDAM_CORE,
+    **{f"cat:{c}": kws for c, kws in CAT_MAP.items()},
+}
+
+
+def _referencia(texto):
+    esperado = {nome for nome, kws in LISTAS.items() if _contains_any(texto, kws)}
+    if any(h in texto for h in GUNDAM_JP_HINTS):
+        esperado.add("jp_hints")
+    return esperado
+
+
+@pytest.mark.parametrize("texto", [
+    "sd gundam base tour",             # "sd gundam" e "gundam base" sobrepostos
+    "gundam base",                     # "gundam" dentro de "gundam base"
+    "new hg kit at 12:00",
+    "gundam 00 and mgex",
+    "ガンダムseed 劇場版 公開",
+    "アニメ主題歌決定 ガンプラ",
+    "rog strix gundam edition motherboard",
+    "one piece x gundams",
+    "tシャツ ガンダム",
+    "nothing relevant here",
+    "",
+])
+def test_combinado_igual_a_listas_separadas(texto):
+    assert _INTEL_MATCHER.groups_in(texto) == _referencia(texto)
+
+
+def test_fuzz_com_fragmentos_de_keywords():
+    rng = random.Random(1234)
+    vocab = [k for kws in LISTAS.values() for k in kws] + list(GUNDAM_JP_HINTS)
+    cola = [" ", "", "s ", ":", ".", "-", "x", "12:", " 2", "の"]
+    for _ in range(1500):
+        partes = [rng.choice(vocab) + rng.choice(cola) for _ in range(rng.randint(1, 5))]
+        texto = "".join(partes).lower()
+        assert _INTEL_MATCHER.groups_in(texto) == _referencia(texto), texto
+
+
+def test_grupo_case_sensitive_casa_como_in():
+    m = KeywordMatcher({"txt": ["gundam"]}, case_sensitive={"lit": ["ＧＵＮＤＡＭ"]})
+    assert m.groups_in("ＧＵＮＤＡＭ") == {"lit"}
+    # `in` é sensível a maiúsculas: o texto minúsculo não casa o hint literal.
+    assert m.groups_in("ｇｕｎｄａｍ") == set()
+
+
+def test_matcher_vazio_nao_levanta():
+    assert KeywordMatcher({}).groups_in("gundam") == set()
+    assert KeywordMatcher({"a": []}).groups_in("") == set()
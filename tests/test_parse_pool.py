@@ -0,0 +1,68 @@
+"""
+Pool de processos de parse: bytes entram, entradas compactas saem.
+
+Sobe um pool real (contexto spawn) com 1 processo. O conftest desliga o pool
+nos demais testes; aqui ele é ligado explicitamente.
+"""
+import asyncio
+import pickle
+
+import pytest
+
+from core.scanner.parsepool import FeedParsePool, parse_feed_bytes
+
+
+def _rss(n, encoding="utf-8", titulo="ガンダム 新作"):
+    itens = "".join(
+        f"<item><title>{titulo} {i}</title><link>https://jp.com/{i}</link>"
+        f"<description>{'<p>texto</p>' * 20}</description>"
+        f"<category>a</category><category>b</category></item>"
+        for i in range(n)
+    )
+    xml = f'<?xml version="1.0" encoding="{encoding}"?><rss version="2.0"><channel><title>t</title>{itens}</channel></rss>'
+    return xml.encode(encoding)
+
+
+def test_bytes_com_encoding_declarado_sao_decodificados_pelo_feedparser():
+    entradas, parser, _ = parse_feed_bytes(_rss(2, "shift_jis"), None, fast=False)
+    assert parser == "feedparser"
+    assert entradas[0]["title"] == "ガンダム 新作 0"
+
+
+def test_entradas_compactas_e_cortadas_no_limite():
+    entradas, _, _ = parse_feed_bytes(_rss(30), 10, fast=False)
+    assert len(entradas) == 10
+    # Só os campos que o engine usa: nada de tags, *_detail, links, content.
+    assert set(entradas[0]) <= {"title", "link", "summary", "id"}
+    assert len(pickle.dumps(entradas)) < 10 * 1024
+
+
+@pytest.mark.asyncio
+async def test_pool_de_processos_mantem_o_loop_livre():
+    pool = FeedParsePool(workers=1, queue_max=2)
+    ticks = 0
+    parando = False
+
+    async def relogio():
+        nonlocal ticks
+        while not parando:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    tarefa = asyncio.create_task(relogio())
+    try:
+        corpo = _rss(1500)
+        resultados = await asyncio.gather(*(pool.parse(corpo, 15, False) for _ in range(3)))
+    finally:
+        parando = True
+        await tarefa
+        pool.shutdown()
+
+    for entradas, parser, segundos in resultados:
+        assert len(entradas) == 15 and parser == "feedparser" and segundos > 0
+        # O engine lê atributos (entry.media_thumbnail, getattr(entry, "published")).
+        assert entradas[0].link == "https://jp.com/0"
+    assert ticks > 5
+    snap = pool.snapshot()
+    assert snap["parsed"] == 3 and snap["queue_depth"] == 0
+    assert snap["max_queue_depth"] == 3 and snap["avg_ms"] > 0
@@ -0,0 +1,86 @@
+"""
+Planejador da fase de busca (core/scanner/planner.py).
+
+Dentro de cada pista, a fonte que mais demora pelo histórico começa primeiro
+(LPT); o makespan previsto respeita as vagas e a cortesia por host.
+"""
+from core.scanner.planner import (
+    expected_seconds,
+    hedge_delay,
+    plan_order,
+    predict_makespan,
+    update_source_stats,
+)
+
+
+def _host(url):
+    return url.split("/")[2]
+
+
+def test_medias_separadas_para_sucesso_e_falha():
+    url = "https://kusakusa.wordpress.com/feed/"
+    tabela = update_source_stats({}, {url: 2.0}, set(), 100.0)
+    assert tabela[url]["ok_sec"] == 2.0 and tabela[url]["fail_rate"] == 0.0
+    # Timeout de 30s: a média das falhas é à parte e a taxa de falha sobe.
+    tabela = update_source_stats(tabela, {url: 30.0}, {url}, 200.0)
+    assert tabela[url]["ok_sec"] == 2.0 and tabela[url]["fail_sec"] == 30.0
+    assert tabela[url]["fail_rate"] == 0.3 and tabela[url]["failures"] == 1
+    assert expected_seconds(tabela[url], {}) == 0.7 * 2.0 + 0.3 * 30.0
+    # Sem histórico: o prior mais o first_request_delay_sec da fonte.
+    assert expected_seconds(None, {"first_request_delay_sec": 4.5}) == 6.5
+    # Varredura completa poda fontes que saíram do sources.json.
+    assert update_source_stats(tabela, {}, set(), 300.0, keep=set()) == {}
+
+
+def test_lpt_dentro_da_pista():
+    fontes = [{"url": f"https://{n}.com/feed", "metadata": {}} for n in ("rapido", "lento", "oficial", "medio")]
+    tabela = {
+        "https://rapido.com/feed": {"checks": 3, "ok_sec": 0.5, "fail_rate": 0.0},
+        "https://lento.com/feed": {"checks": 3, "ok_sec": 40.0, "fail_rate": 0.0},
+        "https://oficial.com/feed": {"checks": 3, "ok_sec": 1.0, "fail_rate": 0.0},
+        "https://medio.com/feed": {"checks": 3, "ok_sec": 5.0, "fail_rate": 0.0},
+    }
+    pistas = {src["url"]: 1 for src in fontes}
+    pistas["https://oficial.com/feed"] = 0
+    ordem = [src["url"].split("/")[2] for src in plan_order(fontes, tabela, pistas)]
+    assert ordem == ["oficial.com", "lento.com", "medio.com", "rapido.com"]
+
+
+def test_makespan_previsto_lpt_e_cortesia_por_host():
+    tabela = {f"https://{n}.com/feed": {"checks": 1, "ok_sec": s, "fail_rate": 0.0}
+              for n, s in (("a", 1.0), ("b", 1.0), ("c", 1.0), ("lento", 10.0))}
+    declarada = [{"url": f"https://{n}.com/feed"} for n in ("a", "b", "c", "lento")]
+    lpt = plan_order(declarada, tabela, {})
+    # 2 vagas: o lento por último termina em 1 + 10; começando primeiro, em 10.
+    assert predict_makespan(declarada, tabela, 2, _host, 0.0) == 11.0
+    assert predict_makespan(lpt, tabela, 2, _host, 0.0) == 10.0
+    # Mesmo host: a cortesia espaça os inícios mesmo com vagas livres.
+    mesmo_host = [{"url": f"https://reddit.com/r/{i}"} for i in range(3)]
+    assert predict_makespan(mesmo_host, {}, 8, _host, 1.0) == 2.0 + 2.0
+
+
+def test_atraso_do_hedge_pelo_p90():
+    meta = {"hedge": True, "fallbacks": ["https://gunpla101.com/?feed=rss2"]}
+    item = update_source_stats({}, {"u": 1.0}, set(), 0.0, latencies={"u": 1.0})["u"]
+    assert hedge_delay(item, meta, 0.5, 8.0) == 8.0  # pouco histórico: atraso padrão
+    tabela = {}
+    for segundos in (1.0, 1.2, 0.9, 1.1, 6.0, 1.0, 1.3, 0.8, 1.0, 1.1):
+        tabela = update_source_stats(tabela, {"u": segundos}, set(), 0.0, latencies={"u": segundos})
+    assert hedge_delay(tabela["u"], meta, 0.5, 8.0) == 6.0
+    assert hedge_delay(tabela["u"], meta, 10.0, 8.0) == 10.0  # piso
+    # Sem opt-in ou sem fallback, não há hedge.
+    assert hedge_delay(tabela["u"], {"fallbacks": meta["fallbacks"]}, 0.5, 8.0) is None
+    assert hedge_delay(tabela["u"], {"hedge": True}, 0.5, 8.0) is None
+
+
+def test_p90_do_hedge_usa_a_latencia_da_principal_e_nao_a_busca_inteira():
+    meta = {"hedge": True, "fallbacks": ["https://gunpla101.com/?feed=rss2"]}
+    tabela = {}
+    # Busca inteira de 40s (retentativas, host bloqueado), mas a principal responde em 1s.
+    for _ in range(10):
+        tabela = update_source_stats(tabela, {"u": 40.0}, set(), 0.0, latencies={"u": 1.0})
+    assert tabela["u"]["ok_sec"] == 40.0
+    assert hedge_delay(tabela["u"], meta, 0.5, 8.0) == 1.0
+    # Sem latência da principal (só o fallback respondeu), nada entra no p90.
+    tabela = update_source_stats({}, {"v": 3.0}, set(), 0.0, latencies={})
+    assert "recent_ok" not in tabela["v"]
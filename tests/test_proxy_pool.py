@@ -0,0 +1,118 @@
+"""
+Pool de proxies com escolha por latência e saúde (core/proxy_pool.py).
+
+Verifica que o pedido vai pela rota mais barata para aquele host, que um Worker
+que só falha é ejetado e volta depois da janela, e — com dois proxies locais
+(aiohttp) no lugar dos Workers — que a retentativa de um feed sai pelo Worker
+saudável levando o segredo DELE.
+"""
+import aiohttp
+import pytest
+from aiohttp import web
+
+import core.proxy_pool as proxy_pool_mod
+import core.scanner.fetcher as fetcher
+from core.proxy_pool import ProxyPool, parse_routes
+
+_RSS = (
+    b'<?xml version="1.0"?><rss version="2.0"><channel><title>Nyaa</title>'
+    b"<item><title>Gundam</title><link>https://nyaa.si/view/1</link></item></channel></rss>"
+)
+
+
+def test_parse_routes_segredo_proprio_ou_herdado():
+    rotas = parse_routes(
+        "https://a.workers.dev/?url=|s1, https://b.workers.dev/?url=, lixo", "", "padrao"
+    )
+    assert [r.name for r in rotas] == ["a.workers.dev", "b.workers.dev"]
+    assert rotas[0].headers() == {"X-Proxy-Secret": "s1"}
+    assert rotas[1].headers() == {"X-Proxy-Secret": "padrao"}
+    # Sem lista: o CLOUDFLARE_PROXY_URL único de antes.
+    assert [r.prefix for r in parse_routes("", "https://w.dev/?url=", "")] == ["https://w.dev/?url="]
+
+
+def test_escolhe_a_rota_mais_barata_por_host():
+    pool = ProxyPool(parse_routes("https://a.dev/?url=,https://b.dev/?url="))
+    a, b = pool.proxies
+    pool.observe(a, "https://nyaa.si/rss", 200, 0.2, now=0.0)
+    pool.observe(b, "https://nyaa.si/rss", 200, 0.8, now=0.0)
+    assert pool.choose("https://nyaa.si/rss", now=1.0) is a
+    # Pedido sem proxy vai sempre pela direta.
+    assert pool.choose("https://site.jp/feed", proxied=False).direct
+
+    # O site bloqueou o IP do Worker rápido: para ESTE host, o lento fica mais barato.
+    for _ in range(4):
+        pool.observe(a, "https://youtube.com/feeds", 403, 0.2, now=1.0)
+    assert pool.choose("https://youtube.com/feeds", now=2.0) is b
+    assert pool.choose("https://nyaa.si/rss", now=2.0) is a
+
+
+def test_worker_que_so_falha_e_ejetado_e_volta(monkeypatch):
+    monkeypatch.setattr(proxy_pool_mod, "PROXY_EJECT_AFTER", 2)
+    monkeypatch.setattr(proxy_pool_mod, "PROXY_EJECT_SEC", 60.0)
+    pool = ProxyPool(parse_routes("https://a.dev/?url="))
+    (a,) = pool.proxies
+    pool.observe(a, "https://nyaa.si/rss", None, 30.0, now=0.0)
+    pool.observe(a, "https://nyaa.si/rss", 502, 0.1, now=1.0)
+
+    # Todos os Workers fora: a direta responde.
+    assert pool.choose("https://nyaa.si/rss", now=30.0).direct
+    snap = pool.snapshot(now=30.0)
+    assert snap["ejected"] == 1 and snap["routes"][0]["ejected_for_sec"] == 31
+    assert pool.choose("https://nyaa.si/rss", now=62.0) is a
+
+    # Reincidência: a janela dobra.
+    pool.observe(a, "https://nyaa.si/rss", 502, 0.1, now=62.0)
+    pool.observe(a, "https://nyaa.si/rss", 502, 0.1, now=63.0)
+    assert a.ejected_until == 63.0 + 120.0
+
+
+@pytest.fixture
+async def proxies_locais(monkeypatch):
+    pedidos = []
+
+    async def quebrado(request):
+        pedidos.append(("quebrado", request.headers.get("X-Proxy-Secret"), request.query.get("url")))
+        return web.Response(status=502, text="Worker exceeded CPU limit")
+
+    async def bom(request):
+        pedidos.append(("bom", request.headers.get("X-Proxy-Secret"), request.query.get("url")))
+        return web.Response(body=_RSS, content_type="application/rss+xml")
+
+    app = web.Application()
+    app.router.add_get("/quebrado", quebrado)
+    app.router.add_get("/bom", bom)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    porta = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{porta}"
+    pool = ProxyPool(parse_routes(f"{base}/quebrado?url=|s1,{base}/bom?url=|s2"))
+    monkeypatch.setattr(fetcher, "proxy_pool", pool)
+    monkeypatch.setattr(fetcher, "validate_url", lambda u: (True, None))
+    try:
+        yield pool, pedidos
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_retentativa_sai_pelo_worker_saudavel(proxies_locais):
+    pool, pedidos = proxies_locais
+
+    async def sem_pausa(segundos):
+        return True
+
+    alvo = "https://nyaa.si/rss/gundam"
+    async with aiohttp.ClientSession() as session:
+        outcome, entries = await fetcher._fetch_feed_url(
+            session, alvo, {}, {}, aiohttp.ClientTimeout(total=5), wait=sem_pausa
+        )
+
+    assert outcome == fetcher._OK and len(entries) == 1
+    assert pedidos == [("quebrado", "s1", alvo), ("bom", "s2", alvo)]
+    rotas = {r["route"]: r for r in pool.snapshot()["routes"]}
+    assert rotas["127.0.0.1"]["failures"] == 1
+    assert rotas["127.0.0.1#2"]["failures"] == 0 and rotas["127.0.0.1#2"]["requests"] == 1
+    assert rotas["direto"]["requests"] == 0
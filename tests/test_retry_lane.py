@@ -0,0 +1,42 @@
+"""
+Agenda da pista de retentativa (core/scanner/retrylane.py).
+
+A varredura completa redefine a fila com os feeds que falharam nela; a pista
+tira quem respondeu e dobra a espera de quem falhou de novo, até o teto.
+"""
+import core.scanner.retrylane as retrylane
+from core.scanner.retrylane import due_retries, update_retry_queue
+
+
+def test_varredura_completa_redefine_a_fila(monkeypatch):
+    monkeypatch.setattr(retrylane, "FEED_RETRY_BASE_MIN", 10.0)
+    antiga = {"https://voltou.com/feed": {"attempts": 2, "next_at": 5, "failed_at": 1}}
+    fila = update_retry_queue(
+        antiga, ["https://voltou.com/feed", "https://caiu.com/feed"], {"https://caiu.com/feed"}, 1000.0, True
+    )
+    assert fila == {"https://caiu.com/feed": {"attempts": 0, "next_at": 1600.0, "failed_at": 1000.0}}
+
+
+def test_pista_dobra_a_espera_e_desiste_no_teto(monkeypatch):
+    monkeypatch.setattr(retrylane, "FEED_RETRY_BASE_MIN", 10.0)
+    monkeypatch.setattr(retrylane, "FEED_RETRY_MAX_ATTEMPTS", 3)
+    url = "https://caiu.com/feed"
+    fila = {url: {"attempts": 0, "next_at": 0, "failed_at": 1.0},
+            "https://outro.com/feed": {"attempts": 0, "next_at": 99999, "failed_at": 1.0}}
+
+    fila = update_retry_queue(fila, [url], {url}, 2000.0, False)
+    assert fila[url] == {"attempts": 1, "next_at": 2000.0 + 1200.0, "failed_at": 1.0}
+    fila = update_retry_queue(fila, [url], {url}, 4000.0, False)
+    assert fila[url]["next_at"] == 4000.0 + 2400.0
+    # Terceira falha seguida: sai da pista e fica para a varredura completa.
+    fila = update_retry_queue(fila, [url], {url}, 7000.0, False)
+    assert url not in fila
+    # Quem não foi tentado nesta rodada fica como estava.
+    assert fila["https://outro.com/feed"]["next_at"] == 99999
+
+
+def test_vencidos_em_ordem_e_fila_corrompida():
+    fila = {"b": {"next_at": 20}, "a": {"next_at": 10}, "c": {"next_at": 50}, "d": "lixo"}
+    assert due_retries(fila, 30) == ["a", "b"]
+    assert due_retries("lixo", 30) == []
+    assert update_retry_queue("lixo", [], set(), 0.0, False) == {}
@@ -0,0 +1,460 @@
+"""
+Varredura em streaming: cada feed é processado assim que termina de baixar.
+
+Antes, `run_scan_once` esperava o `asyncio.gather` de TODOS os feeds antes de
+filtrar uma única entrada — o feed mais lento (Nyaa/YouTube com
+`first_request_delay_sec` e retentativas) atrasava o post de todas as outras
+fontes. Estes testes rodam o engine de verdade com a rede, o Discord e o disco
+trocados por dublês.
+"""
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+import core.scanner.engine as engine
+
+
+class CanalFalso:
+    def __init__(self, registro):
+        self.registro = registro
+
+    async def send(self, content=None, embed=None, **kwargs):
+        self.registro.append((time.monotonic(), embed))
+
+
+@pytest.fixture
+def scan(tmp_path, monkeypatch):
+    """Engine com fontes, rede e Discord substituídos; devolve o registro de envios."""
+    enviados = []
+    bot = MagicMock()
+    bot.get_channel.return_value = CanalFalso(enviados)
+
+    config = {"1": {"channel_id": 10, "filters": ["todos"], "language": "en_US"}}
+    fontes = {}
+
+    monkeypatch.setattr(engine, "p", lambda nome: str(tmp_path / nome))
+    monkeypatch.setattr(engine, "load_config_cached", lambda default=None: config)
+    monkeypatch.setattr(engine, "load_sources", lambda: [{"url": u, "metadata": {}} for u in fontes])
+    monkeypatch.setattr(engine, "load_history", lambda: ([], set()))
+    monkeypatch.setattr(engine, "save_history", lambda *a, **k: None)
+    monkeypatch.setattr(engine, "save_translation_cache", lambda: None)
+    monkeypatch.setattr(engine, "classify_intel", lambda *a, **k: frozenset())
+    monkeypatch.setattr(engine, "FEED_FETCH_JITTER_MIN", 0.0)
+    monkeypatch.setattr(engine, "FEED_FETCH_JITTER_MAX", 0.0)
+    monkeypatch.setattr(engine, "DISCORD_CHANNEL_MIN_INTERVAL_SEC", 0.0)
+
+    async def sem_thumb(entry, session=None):
+        return None
+
+    async def embed_falso(bot, entry, lang, cfg, session=None, thumbnail_url=None):
+        return entry["link"]
+
+    async def sem_html(estado, http_state=None, links_state=None):
+        return [], estado
+
+    async def fetch_falso(session, src, http_cache, wait=None, failures=None, hedge_after=None, probe=False, **_):
+        atraso, entradas, *retentativa = fontes[src["url"]]
+        await asyncio.sleep(atraso)
+        # Terceiro elemento opcional: backoff antes de uma segunda tentativa, pela
+        # mesma espera que o fetcher real usa.
+        if retentativa and not await wait(retentativa[0]):
+            return None
+        if entradas is None:  # falha: principal e fallbacks esgotados
+            failures.add(src["url"])
+            return None
+        return src["url"], entradas
+
+    monkeypatch.setattr(engine, "resolve_thumbnail", sem_thumb)
+    monkeypatch.setattr(engine, "create_embed", embed_falso)
+    monkeypatch.setattr(engine, "check_official_sites", sem_html)
+    monkeypatch.setattr(engine, "fetch_feed", fetch_falso)
+
+    async def rodar(retry_lane=False, lote=False):
+        if retry_lane:
+            await engine.run_retry_lane(bot)
+        elif lote:
+            await engine.run_due_batch(bot)
+        else:
+            await engine.run_scan_once(bot, trigger="teste")
+
+    return fontes, enviados, rodar
+
+
+def _entrada(link):
+    return {"title": "Gundam", "summary": "", "link": link}
+
+
+@pytest.mark.asyncio
+async def test_feed_rapido_publica_antes_do_lento_terminar(scan):
+    fontes, enviados, rodar = scan
+    fontes["https://lento.com/feed"] = (0.5, [_entrada("https://lento.com/1")])
+    fontes["https://rapido.com/feed"] = (0.0, [_entrada("https://rapido.com/1")])
+
+    inicio = time.monotonic()
+    await rodar()
+
+    por_link = {embed: t - inicio for t, embed in enviados}
+    assert set(por_link) == {"https://lento.com/1", "https://rapido.com/1"}
+    # O rápido não espera o lento: sai bem antes dos 0.5s do feed lento.
+    assert por_link["https://rapido.com/1"] < 0.3
+    assert por_link["https://lento.com/1"] >= 0.5
+
+
+@pytest.mark.asyncio
+async def test_mesmo_link_em_dois_feeds_publica_uma_vez(scan):
+    fontes, enviados, rodar = scan
+    fontes["https://a.com/feed"] = (0.0, [_entrada("https://x.com/noticia")])
+    fontes["https://b.com/feed"] = (0.05, [_entrada("https://x.com/noticia")])
+
+    await rodar()
+
+    assert [embed for _, embed in enviados] == ["https://x.com/noticia"]
+
+
+@pytest.mark.asyncio
+async def test_fila_limitada_nao_perde_feeds(scan, monkeypatch):
+    """Com fila de 1 posição e mais feeds que slots, todos chegam ao processamento."""
+    fontes, enviados, rodar = scan
+    monkeypatch.setattr(engine, "SCAN_QUEUE_MAXSIZE", 1)
+    for i in range(12):
+        fontes[f"https://f{i}.com/feed"] = (0.0, [_entrada(f"https://f{i}.com/1")])
+
+    await rodar()
+
+    assert len(enviados) == 12
+
+
+@pytest.mark.asyncio
+async def test_backoff_devolve_a_vaga_e_prazo_desiste(scan, monkeypatch):
+    """Um feed em backoff não segura a única vaga; espera além do prazo desiste."""
+    from core.scanner.concurrency import feed_concurrency
+
+    fontes, enviados, rodar = scan
+    monkeypatch.setattr(feed_concurrency, "limit", 1.0)
+    monkeypatch.setattr(feed_concurrency, "maximum", 1)
+    monkeypatch.setattr(engine, "FEED_SCAN_DEADLINE_SEC", 60.0)
+    fontes["https://limitado.com/feed"] = (0.0, [_entrada("https://limitado.com/1")], 0.4)
+    fontes["https://saudavel.com/feed"] = (0.05, [_entrada("https://saudavel.com/1")])
+    fontes["https://teimoso.com/feed"] = (0.0, [_entrada("https://teimoso.com/1")], 300.0)
+
+    inicio = time.monotonic()
+    await rodar()
+
+    por_link = {embed: t - inicio for t, embed in enviados}
+    # Com a vaga presa no backoff, o saudável só sairia depois dos 0.4s.
+    assert por_link["https://saudavel.com/1"] < 0.3
+    assert por_link["https://limitado.com/1"] >= 0.4
+    # 300s de backoff passam do prazo de 60s: desiste sem travar a varredura.
+    assert "https://teimoso.com/1" not in por_link
+    assert time.monotonic() - inicio < 5
+    assert feed_concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_pista_de_retentativa_busca_so_o_feed_que_falhou(scan, monkeypatch):
+    fontes, enviados, rodar = scan
+    fontes["https://ok.com/feed"] = (0.0, [_entrada("https://ok.com/1")])
+    fontes["https://reddit.com/r/Gundam/.rss"] = (0.0, None)
+
+    buscados = []
+    fetch_original = engine.fetch_feed
+
+    async def espiao(session, src, http_cache, **kwargs):
+        buscados.append(src["url"])
+        return await fetch_original(session, src, http_cache, **kwargs)
+
+    monkeypatch.setattr(engine, "fetch_feed", espiao)
+
+    await rodar()
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        fila = json.load(f)["retry_queue"]
+    assert list(fila) == ["https://reddit.com/r/Gundam/.rss"]
+    assert fila["https://reddit.com/r/Gundam/.rss"]["attempts"] == 0
+
+    # Ainda não venceu: a pista não busca nada.
+    buscados.clear()
+    await rodar(retry_lane=True)
+    assert buscados == []
+
+    # Venceu e o Reddit voltou: só ele é buscado, a notícia sai e a fila esvazia.
+    fila["https://reddit.com/r/Gundam/.rss"]["next_at"] = 0
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        estado = json.load(f)
+    estado["retry_queue"] = fila
+    with open(engine.p("state.json"), "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    fontes["https://reddit.com/r/Gundam/.rss"] = (0.0, [_entrada("https://reddit.com/r/Gundam/1")])
+
+    await rodar(retry_lane=True)
+    assert buscados == ["https://reddit.com/r/Gundam/.rss"]
+    assert [embed for _, embed in enviados] == ["https://ok.com/1", "https://reddit.com/r/Gundam/1"]
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        assert json.load(f)["retry_queue"] == {}
+
+
+@pytest.mark.asyncio
+async def test_lote_da_cadencia_busca_so_as_fontes_vencidas(scan, monkeypatch):
+    fontes, enviados, rodar = scan
+    monkeypatch.setattr(engine, "FEED_ADAPTIVE_CADENCE", True)
+    fontes["https://quente.com/feed"] = (0.0, [_entrada("https://quente.com/1")])
+    fontes["https://fria.com/feed"] = (0.0, [_entrada("https://fria.com/1")])
+
+    buscados = []
+    fetch_original = engine.fetch_feed
+
+    async def espiao(session, src, http_cache, **kwargs):
+        buscados.append(src["url"])
+        return await fetch_original(session, src, http_cache, **kwargs)
+
+    monkeypatch.setattr(engine, "fetch_feed", espiao)
+
+    # Tabela vazia: tudo vence, inclusive os sites oficiais.
+    await rodar(lote=True)
+    assert sorted(buscados) == ["https://fria.com/feed", "https://quente.com/feed"]
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        estado = json.load(f)
+    assert set(estado["source_cadence"]) == set(buscados)
+    assert estado["html_monitor_checked_at"] > 0
+    assert len(enviados) == 2
+
+    # Só a quente venceu: o lote busca só ela e não repete os sites oficiais.
+    estado["source_cadence"]["https://quente.com/feed"]["next_due"] = 0
+    with open(engine.p("state.json"), "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    html = []
+
+    async def html_espiao(estado_html, http_state=None, links_state=None):
+        html.append(1)
+        return [], estado_html
+
+    monkeypatch.setattr(engine, "check_official_sites", html_espiao)
+    buscados.clear()
+    await rodar(lote=True)
+    assert buscados == ["https://quente.com/feed"]
+    assert html == []
+
+    # Nada vencido: o tique não faz nada.
+    buscados.clear()
+    await rodar(lote=True)
+    assert buscados == []
+
+
+@pytest.mark.asyncio
+async def test_lote_conta_a_parte_e_poda_fontes_removidas(scan, monkeypatch):
+    from core.stats import stats
+
+    fontes, enviados, rodar = scan
+    monkeypatch.setattr(engine, "FEED_ADAPTIVE_CADENCE", True)
+    fontes["https://fica.com/feed"] = (0.0, [_entrada("https://fica.com/1")])
+    fontes["https://sai.com/feed"] = (0.0, [_entrada("https://sai.com/1")])
+    varreduras, lotes = stats.scans_completed, stats.cadence_batches
+
+    await rodar(lote=True)
+    del fontes["https://sai.com/feed"]
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        estado = json.load(f)
+    estado["source_cadence"]["https://fica.com/feed"]["next_due"] = 0
+    with open(engine.p("state.json"), "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    await rodar(lote=True)
+
+    assert (stats.scans_completed, stats.cadence_batches) == (varreduras, lotes + 2)
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        estado = json.load(f)
+    # Sem varredura completa, o próprio lote esquece a fonte que saiu do sources.json.
+    assert set(estado["source_cadence"]) == {"https://fica.com/feed"}
+    assert set(estado["source_stats"]) == {"https://fica.com/feed"}
+
+
+@pytest.mark.asyncio
+async def test_cadencia_desligada_nao_grava_a_tabela(scan, monkeypatch):
+    fontes, enviados, rodar = scan
+    monkeypatch.setattr(engine, "FEED_ADAPTIVE_CADENCE", False)
+    fontes["https://a.com/feed"] = (0.0, [_entrada("https://a.com/1")])
+    with open(engine.p("state.json"), "w", encoding="utf-8") as f:
+        json.dump({"source_cadence": {"https://a.com/feed": {"interval": 1800, "next_due": 0}}}, f)
+
+    await rodar()
+
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        assert "source_cadence" not in json.load(f)
+
+
+@pytest.mark.asyncio
+async def test_scan_manual_espera_o_lote_em_andamento(scan, monkeypatch):
+    fontes, enviados, rodar = scan
+    fontes["https://lento.com/feed"] = (0.3, [])
+
+    buscados = []
+    fetch_original = engine.fetch_feed
+
+    async def espiao(session, src, http_cache, **kwargs):
+        buscados.append(src["url"])
+        return await fetch_original(session, src, http_cache, **kwargs)
+
+    monkeypatch.setattr(engine, "fetch_feed", espiao)
+
+    lote = asyncio.create_task(rodar(lote=True))
+    await asyncio.sleep(0.1)
+    assert engine.scan_lock.locked()
+    await rodar()
+    await lote
+    # O /scan não foi pulado: buscou de novo depois do lote.
+    assert buscados == ["https://lento.com/feed", "https://lento.com/feed"]
+
+
+@pytest.mark.asyncio
+async def test_site_trocado_por_feed_descoberto_nao_posta_o_acervo(scan, monkeypatch):
+    import core.discovery as discovery
+
+    fontes, enviados, rodar = scan
+    site, feed = "https://gundam-official.com/news/", "https://gundam-official.com/news/feed.xml"
+    discovery.save_overlay({site: {"feed": feed}})
+    monkeypatch.setattr(
+        engine, "load_sources", lambda: discovery.discovered_feeds({"official_sites": [site]})
+    )
+    # Acervo sem data: o filtro de data nem o seguraria.
+    fontes[feed] = (0.0, [_entrada(f"https://gundam-official.com/news/{i}") for i in (3, 2, 1)])
+
+    await rodar()
+    assert enviados == []
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        assert feed in json.load(f)["feed_marks"]
+
+    # Depois da troca, o que o site publicar sai normalmente.
+    fontes[feed] = (0.0, [_entrada("https://gundam-official.com/news/4")] + fontes[feed][1])
+    await rodar()
+    assert [embed for _, embed in enviados] == ["https://gundam-official.com/news/4"]
+
+
+@pytest.mark.asyncio
+async def test_pista_alta_e_despachada_primeiro(scan, monkeypatch):
+    from core.scanner.concurrency import feed_concurrency
+    from core.stats import stats
+
+    fontes, enviados, rodar = scan
+    monkeypatch.setattr(feed_concurrency, "limit", 1.0)
+    monkeypatch.setattr(feed_concurrency, "maximum", 1)
+    prioridade = {"https://oficial.com/feed": "high", "https://nyaa.si/rss": "low"}
+    monkeypatch.setattr(
+        engine,
+        "load_sources",
+        lambda: [{"url": u, "metadata": {"priority": prioridade.get(u, "normal")}} for u in fontes],
+    )
+    fontes["https://nyaa.si/rss"] = (0.05, [_entrada("https://nyaa.si/1")])
+    fontes["https://blog.com/feed"] = (0.05, [_entrada("https://blog.com/1")])
+    fontes["https://oficial.com/feed"] = (0.05, [_entrada("https://oficial.com/1")])
+
+    await rodar()
+
+    # Declarada por último no sources.json, a oficial sai primeiro; a "low" por último.
+    assert [embed for _, embed in enviados] == [
+        "https://oficial.com/1", "https://blog.com/1", "https://nyaa.si/1"
+    ]
+    assert list(stats.lane_time_to_post) == ["high", "normal", "low"]
+    assert stats.lane_time_to_post["high"]["first_sec"] < stats.lane_time_to_post["low"]["first_sec"]
+
+
+@pytest.mark.asyncio
+async def test_fonte_lenta_pelo_historico_comeca_primeiro(scan, monkeypatch):
+    from core.scanner.concurrency import feed_concurrency
+
+    fontes, enviados, rodar = scan
+    monkeypatch.setattr(feed_concurrency, "limit", 1.0)
+    monkeypatch.setattr(feed_concurrency, "maximum", 1)
+    fontes["https://rapido.com/feed"] = (0.0, [])
+    fontes["https://lento.com/feed"] = (0.2, [])
+
+    buscados = []
+    fetch_original = engine.fetch_feed
+
+    async def espiao(session, src, http_cache, **kwargs):
+        buscados.append(src["url"])
+        return await fetch_original(session, src, http_cache, **kwargs)
+
+    monkeypatch.setattr(engine, "fetch_feed", espiao)
+
+    await rodar()
+    assert buscados == ["https://rapido.com/feed", "https://lento.com/feed"]
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        latencias = json.load(f)["source_stats"]
+    assert latencias["https://lento.com/feed"]["ok_sec"] >= 0.2
+
+    # Com o histórico, o lento deixa de começar por último.
+    buscados.clear()
+    await rodar()
+    assert buscados == ["https://lento.com/feed", "https://rapido.com/feed"]
+
+
+@pytest.mark.asyncio
+async def test_fonte_morta_entra_em_quarentena_e_so_volta_como_sonda(scan, monkeypatch):
+    import core.scanner.breaker as breaker
+
+    fontes, enviados, rodar = scan
+    monkeypatch.setattr(breaker, "FEED_BREAKER_THRESHOLD", 2)
+    fontes["https://ok.com/feed"] = (0.0, [_entrada("https://ok.com/1")])
+    fontes["https://morto.com/feed"] = (0.0, None)
+
+    chamadas = []
+    fetch_original = engine.fetch_feed
+
+    async def espiao(session, src, http_cache, **kwargs):
+        chamadas.append((src["url"], kwargs.get("probe")))
+        return await fetch_original(session, src, http_cache, **kwargs)
+
+    monkeypatch.setattr(engine, "fetch_feed", espiao)
+
+    await rodar()
+    await rodar()
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        estado = json.load(f)
+    assert estado["breakers"]["https://morto.com/feed"]["state"] == "open"
+    # Quem cuida da fonte em quarentena é o disjuntor, não a pista de retentativa.
+    assert estado["retry_queue"] == {}
+
+    # Em quarentena: a varredura seguinte nem tenta.
+    chamadas.clear()
+    await rodar()
+    assert chamadas == [("https://ok.com/feed", False)]
+
+    # A janela venceu e o site voltou: uma sonda, e o disjuntor fecha.
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        estado = json.load(f)
+    estado["breakers"]["https://morto.com/feed"]["next_probe_at"] = 0
+    with open(engine.p("state.json"), "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    fontes["https://morto.com/feed"] = (0.0, [_entrada("https://morto.com/1")])
+    chamadas.clear()
+    await rodar()
+    assert ("https://morto.com/feed", True) in chamadas
+    assert "https://morto.com/1" in [embed for _, embed in enviados]
+    with open(engine.p("state.json"), encoding="utf-8") as f:
+        assert json.load(f)["breakers"] == {}
+
+
+@pytest.mark.asyncio
+async def test_manchete_do_html_monitor_ignora_o_cooldown_e_passa_pelo_dedup(scan, monkeypatch, tmp_path):
+    fontes, enviados, rodar = scan
+    site = "https://gundam-official.com/"
+    with open(tmp_path / "state.json", "w", encoding="utf-8") as f:
+        json.dump({"html_monitor_posted": {site: time.time()}}, f)
+
+    async def html_com_manchete(estado, http_state=None, links_state=None):
+        return [
+            {"title": "Novo kit", "link": f"{site}news/42", "summary": "", "site": site},
+            {"title": "🔄 Update: GUNDAM", "link": site, "summary": ""},
+        ], estado
+
+    monkeypatch.setattr(engine, "check_official_sites", html_com_manchete)
+    await rodar()
+    # O genérico continua barrado pelo cooldown do site; a manchete não.
+    assert [embed for _, embed in enviados] == [f"{site}news/42"]
+    with open(tmp_path / "state.json", encoding="utf-8") as f:
+        assert json.load(f)["dedup"][site] == {f"{site}news/42": ["1"]}
+
+    # Mesma manchete de novo (link que saiu e voltou): o dedup segura.
+    await rodar()
+    assert len(enviados) == 1
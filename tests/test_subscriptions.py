@@ -0,0 +1,76 @@
+"""
+Fan-out por índice de assinaturas: a notícia é classificada uma vez e o índice
+diz quais guilds a recebem.
+
+A garantia central é de equivalência: para qualquer guild, `classify_intel` +
+`SubscriptionIndex` tem de decidir exatamente o que `match_intel` decidiria.
+"""
+import pytest
+
+from core.filters import classify_intel, filters_accept, match_intel
+from core.subscriptions import SubscriptionIndex, get_subscription_index
+
+
+CONFIG = {
+    "1": {"channel_id": 10, "filters": ["todos"]},
+    "2": {"channel_id": 20, "filters": ["model_kits"]},
+    "3": {"channel_id": 30, "filters": ["gunpla"]},          # nome legado
+    "4": {"channel_id": 40, "filters": ["games", "musica"]},
+    "5": {"channel_id": None, "filters": ["todos"]},          # sem canal
+    "6": {"channel_id": 60, "filters": []},                   # sem filtros
+    "7": {"channel_id": 70, "filters": ["categoria_inexistente"]},
+}
+
+NOTICIAS = [
+    ("New HG Gundam Aerial kit revealed", "", None),
+    ("Gundam Breaker 4 DLC update", "", None),
+    ("Gundam Hathaway soundtrack album", "", None),
+    ("One Piece x Gundam crossover", "", None),
+    ("Bandai quarterly results", "", "https://news.google.com/rss"),
+    ("機動戦士ガンダム 新作アニメ 劇場版 公開", "", None),
+    ("Gunpla review", "", "https://www.youtube.com/feeds/videos.xml?channel_id=x"),
+    ("Random anime news", "nothing here", None),
+]
+
+
+@pytest.mark.parametrize("titulo,resumo,fonte", NOTICIAS)
+def test_indice_equivale_a_match_intel(titulo, resumo, fonte):
+    indice = SubscriptionIndex(CONFIG)
+    veredito = classify_intel(titulo, resumo, source_url=fonte)
+
+    esperado = [
+        gid for gid, g in CONFIG.items()
+        if g.get("channel_id") and match_intel(gid, titulo, resumo, CONFIG, source_url=fonte)
+    ]
+    assert indice.guilds_for(veredito) == esperado
+
+
+def test_bloqueada_nao_vai_nem_para_todos():
+    indice = SubscriptionIndex(CONFIG)
+    assert classify_intel("Dragon Ball vs Gundam", "") is None
+    assert indice.guilds_for(None) == []
+
+
+def test_aprovada_sem_categoria_vai_so_para_todos():
+    indice = SubscriptionIndex(CONFIG)
+    veredito = classify_intel("Gundam", "")
+    assert veredito == frozenset()
+    assert indice.guilds_for(veredito) == ["1"]
+
+
+def test_filters_accept_resolve_legado():
+    assert filters_accept(["gunpla"], frozenset({"model_kits"})) is True
+    assert filters_accept([], frozenset({"model_kits"})) is False
+    assert filters_accept("todos", frozenset()) is False
+
+
+def test_indice_reconstruido_quando_config_muda_in_place():
+    config = {"1": {"channel_id": 10, "filters": ["games"]}}
+    antes = get_subscription_index(config)
+    assert get_subscription_index(config) is antes
+
+    # Os painéis mutam o mesmo dict antes de salvar.
+    config["1"]["filters"].append("model_kits")
+    depois = get_subscription_index(config)
+    assert depois is not antes
+    assert depois.guilds_for(frozenset({"model_kits"})) == ["1"]
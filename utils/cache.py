@@ -1,6 +1,8 @@
 """
 Cache utilities - HTTP caching with ETag and Last-Modified support.
 """
+import hashlib
+import re
 from typing import Dict, Any
 from .storage import load_json_safe, save_json_safe, p
 
@@ -71,3 +73,46 @@ def update_cache_state(url: str, response_headers: Any, state: Dict[str, Dict[st
         state[url]["last_modified"] = response_headers["Last-Modified"]
     elif "last-modified" in response_headers:
         state[url]["last_modified"] = response_headers["last-modified"]
+
+
+# Campos do <channel> que mudam a cada pedido sem que o feed mude (Blogger, FC2 e
+# WordPress atrás de CDN regeneram o XML a cada GET).
+_VOLATILE_FEED_TAGS = re.compile(rb"<lastBuildDate>[^<]*</lastBuildDate>", re.IGNORECASE)
+
+
+def body_fingerprint(body: bytes, strip_volatile: bool = True) -> str:
+    """
+    Impressão digital do corpo bruto de um feed (blake2b de 128 bits, em hex).
+
+    Args:
+        body: Bytes da resposta, antes de decodificar
+        strip_volatile: Remove <lastBuildDate> antes do hash
+
+    Returns:
+        Hash hexadecimal de 32 caracteres
+    """
+    if strip_volatile:
+        body = _VOLATILE_FEED_TAGS.sub(b"", body)
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def fingerprint_matches(url: str, fingerprint: str, state: Dict[str, Dict[str, str]]) -> bool:
+    """
+    True se o corpo é idêntico ao da última resposta processada para a URL.
+
+    Para servidores que ignoram ETag/Last-Modified e devolvem 200 sempre: um
+    match é tratado como 304.
+    """
+    return bool(fingerprint) and state.get(url, {}).get("fingerprint") == fingerprint
+
+
+def update_fingerprint(url: str, fingerprint: str, state: Dict[str, Dict[str, str]]) -> None:
+    """
+    Grava a impressão digital do corpo processado, ao lado de ETag/Last-Modified.
+
+    Args:
+        url: URL do feed
+        fingerprint: Resultado de body_fingerprint
+        state: Estado HTTP a atualizar (modificado in-place)
+    """
+    state.setdefault(url, {})["fingerprint"] = fingerprint
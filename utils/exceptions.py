@@ -74,3 +74,8 @@ class ValidationError(GundamIntelError):
 class FeedError(GundamIntelError):
     """Erro ao buscar ou processar um feed (timeout, status 4xx/5xx, XML inválido)."""
     pass
+
+
+class UnsupportedFeedFormatError(FeedError):
+    """O parser rápido de RSS/Atom não sabe ler o documento; o chamador usa o feedparser."""
+    pass
@@ -0,0 +1,125 @@
+"""
+HTTP client utilities - Sessão aiohttp persistente e compartilhada pelo processo do bot.
+"""
+import asyncio
+import logging
+import ssl
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+import certifi
+
+from settings import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL_SEC,
+    HTTP_KEEPALIVE_SEC,
+)
+
+log = logging.getLogger("MaftyIntel")
+
+
+class HttpClientService:
+    """
+    Dono da única `aiohttp.ClientSession` do bot.
+
+    PROPÓSITO DE NEGÓCIO:
+        Cada varredura criava um TCPConnector novo, o HTML Monitor abria um
+        `httpx.AsyncClient` à parte e o OpenGraph pegava a sessão da varredura
+        emprestada: DNS, TCP e TLS para os mesmos ~150 hosts eram refeitos a
+        cada ciclo, em duas pilhas HTTP. Agora fetcher, HTML Monitor e OpenGraph
+        usam a mesma sessão, que vive enquanto o bot viver.
+
+    INVARIANTES DO DOMÍNIO:
+        - Conexões keep-alive (HTTP_KEEPALIVE_SEC): o feed e o OpenGraph do mesmo
+          portal, e os fallbacks do mesmo host, reaproveitam o socket já
+          autenticado em TLS em vez de refazer o handshake.
+        - No máximo HTTP_POOL_LIMIT conexões no total e HTTP_POOL_LIMIT_PER_HOST
+          por host — um portal lento não monopoliza o pool.
+        - DNS em cache por HTTP_DNS_CACHE_TTL_SEC.
+        - Um único SSLContext (certifi) para todas as conexões.
+        - Quem usa a sessão NÃO a fecha; só `close()` (no desligamento do bot).
+
+    COMPORTAMENTO EM CASO DE FALHA:
+        Sessão fechada ou criada noutro event loop é recriada na próxima chamada.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ssl_ctx: Optional[ssl.SSLContext] = None
+        self.requests = 0
+        self.request_errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.connections_queued = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        def counter(attr: str):
+            async def _inc(_session, _ctx, _params) -> None:
+                setattr(self, attr, getattr(self, attr) + 1)
+            return _inc
+
+        trace.on_request_start.append(counter("requests"))
+        trace.on_request_exception.append(counter("request_errors"))
+        trace.on_connection_create_end.append(counter("connections_created"))
+        trace.on_connection_reuseconn.append(counter("connections_reused"))
+        trace.on_connection_queued_start.append(counter("connections_queued"))
+        trace.on_dns_cache_hit.append(counter("dns_cache_hits"))
+        trace.on_dns_cache_miss.append(counter("dns_cache_misses"))
+        return trace
+
+    def session(self) -> aiohttp.ClientSession:
+        """Sessão compartilhada (criada na primeira chamada dentro do event loop)."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._ssl_ctx is None:
+                self._ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+            connector = aiohttp.TCPConnector(
+                ssl=self._ssl_ctx,
+                limit=HTTP_POOL_LIMIT,
+                limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL_SEC,
+                use_dns_cache=True,
+                keepalive_timeout=HTTP_KEEPALIVE_SEC,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()])
+            self._loop = loop
+            log.info(
+                f"🌐 Cliente HTTP compartilhado iniciado (pool {HTTP_POOL_LIMIT}, "
+                f"{HTTP_POOL_LIMIT_PER_HOST}/host, DNS {HTTP_DNS_CACHE_TTL_SEC}s, keep-alive {HTTP_KEEPALIVE_SEC}s)."
+            )
+        return self._session
+
+    @asynccontextmanager
+    async def borrow(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """`async with` que entrega a sessão compartilhada sem fechá-la na saída."""
+        yield self.session()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores acumulados do pool (para /status e /api/stats)."""
+        conexoes = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "request_errors": self.request_errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "connections_queued": self.connections_queued,
+            "reuse_ratio": round(self.connections_reused / conexoes, 3) if conexoes else 0.0,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+http_client = HttpClientService()
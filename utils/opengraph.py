@@ -7,12 +7,14 @@ from bs4 import BeautifulSoup
 from typing import Optional
 
 from utils.security import validate_url
+from utils.http_client import http_client
 
 log = logging.getLogger("MaftyIntel.scanner")
 
-async def fetch_og_image(url: str, session: aiohttp.ClientSession) -> Optional[str]:
+async def fetch_og_image(url: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
     """
     Fetches the OpenGraph or Twitter image from a URL article.
+    Sem `session`, usa a sessão compartilhada do bot (keep-alive com o fetcher).
     """
     if not url or not url.startswith("http"):
         return None
@@ -23,6 +25,9 @@ async def fetch_og_image(url: str, session: aiohttp.ClientSession) -> Optional[s
         log.debug(f"OG fetch bloqueado por segurança para {url}: {error_msg}")
         return None
 
+    if session is None:
+        session = http_client.session()
+
     try:
         # Simulate a social media crawler to trigger SSR for OG tags
         headers = {
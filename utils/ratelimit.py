@@ -0,0 +1,71 @@
+"""
+Rate limit utilities - Token bucket assíncrono.
+"""
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Balde de fichas: até `burst` operações seguidas, depois `rate` por segundo.
+
+    rate <= 0 significa sem limite (acquire nunca espera). Os valores podem ser
+    trocados em runtime via `configure` — quem aprende o limite de um servidor
+    (Retry-After, x-ratelimit-*) ajusta o balde sem recriá-lo.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def configure(self, rate: float, burst: Optional[float] = None) -> None:
+        self._refill()
+        self.rate = float(rate)
+        if burst is not None:
+            self.burst = max(1.0, float(burst))
+            self._tokens = min(self._tokens, self.burst)
+
+    def block_for(self, seconds: float) -> None:
+        """Nenhuma ficha sai antes de `seconds` a partir de agora (ex.: Retry-After)."""
+        if seconds > 0:
+            self._refill()
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            # Uma ficha fica pronta exatamente no fim do bloqueio (não 1/rate depois).
+            restante = self._blocked_until - time.monotonic()
+            self._tokens = min(self._tokens, 1.0 - restante * self.rate) if self.rate > 0 else 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        else:
+            self._tokens = self.burst
+        self._updated = now
+
+    def delay(self) -> float:
+        """Segundos até a próxima ficha (0 = disponível agora). Não consome."""
+        self._refill()
+        espera = max(0.0, self._blocked_until - time.monotonic())
+        if self.rate > 0 and self._tokens < 1.0:
+            espera = max(espera, (1.0 - self._tokens) / self.rate)
+        return espera
+
+    async def acquire(self) -> float:
+        """Espera a vez e consome uma ficha. Devolve quanto tempo esperou."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        esperado = 0.0
+        # Lock: quem chegou primeiro sai primeiro, sem corrida pela mesma ficha.
+        async with self._lock:
+            espera = self.delay()
+            while espera > 0:
+                await asyncio.sleep(espera)
+                esperado += espera
+                espera = self.delay()
+            self._tokens -= 1.0
+        return esperado
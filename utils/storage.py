@@ -185,6 +185,9 @@ def get_state_stats(state: Dict[str, Any]) -> Dict[str, Any]:
         "http_cache_urls": 0,
         "html_hashes_sites": 0,
         "html_cooldown_sites": 0,
+        "feed_marks_feeds": 0,
+        "host_limits_hosts": 0,
+        "quarantined_sources": 0,
         "last_cleanup": None,
         "last_announced_hash": state.get("last_announced_hash"),
         "file_size_kb": 0
@@ -218,6 +221,23 @@ def get_state_stats(state: Dict[str, Any]) -> Dict[str, Any]:
     if isinstance(html_cooldown, dict):
         stats["html_cooldown_sites"] = len(html_cooldown)
 
+    # Marcas de água por feed (feed_marks): andam junto com o dedup.
+    feed_marks = state.get("feed_marks", {})
+    if isinstance(feed_marks, dict):
+        stats["feed_marks_feeds"] = len(feed_marks)
+
+    # Ritmo aprendido por host (host_limits): anda junto com o http_cache.
+    host_limits = state.get("host_limits", {})
+    if isinstance(host_limits, dict):
+        stats["host_limits_hosts"] = len(host_limits)
+
+    # Disjuntores abertos (fontes em quarentena): limpos junto com o http_cache.
+    breakers = state.get("breakers", {})
+    if isinstance(breakers, dict):
+        stats["quarantined_sources"] = sum(
+            1 for item in breakers.values() if isinstance(item, dict) and item.get("state") == "open"
+        )
+
     # Última limpeza
     last_cleanup = state.get("last_cleanup", 0)
     if last_cleanup:
@@ -245,14 +265,33 @@ def clean_state(state: Dict[str, Any], clean_type: str) -> Tuple[Dict[str, Any],
     new_state = state.copy()
     if clean_type == "dedup":
         new_state["dedup"] = {}
-        log.info("🧹 Limpeza: dedup removido")
+        # Sem as marcas de água, o scanner volta a olhar a janela inteira de cada
+        # feed — é o que "repostar notícias já enviadas" pede.
+        new_state["feed_marks"] = {}
+        log.info("🧹 Limpeza: dedup e marcas de água removidos")
         # Também zera o histórico global legado (history.json)
         save_json_safe(p("history.json"), [])
         log.info("🧹 Limpeza: history.json zerado")
     
     elif clean_type == "http_cache":
         new_state["http_cache"] = {}
-        log.info("🧹 Limpeza: http_cache removido")
+        # O ritmo aprendido dos hosts também é "memória de rede": volta a velocidade
+        # total e reaprende com os próximos 429/x-ratelimit-*.
+        new_state["host_limits"] = {}
+        # Fila de retentativa idem: a próxima varredura completa a refaz.
+        new_state["retry_queue"] = {}
+        # Cadência aprendida por fonte: todas vencem já e reaprendem o intervalo.
+        new_state["source_cadence"] = {}
+        # Latência/falha por fonte (ordem LPT): reaprendida a partir da próxima varredura.
+        new_state["source_stats"] = {}
+        # Disjuntores: fontes em quarentena voltam às buscas e são reavaliadas.
+        new_state["breakers"] = {}
+        # Validadores/digest do HTML Monitor: os sites oficiais voltam a vir inteiros.
+        new_state["html_monitor_http"] = {}
+        log.info(
+            "🧹 Limpeza: http_cache, ritmo por host, fila de retentativa, cadência, latências, "
+            "quarentenas e validadores do HTML Monitor removidos"
+        )
     
     elif clean_type == "html_hashes":
         # Limpa a chave real (html_monitor) e a legada (html_hashes) por segurança.
@@ -262,15 +301,30 @@ def clean_state(state: Dict[str, Any], clean_type: str) -> Tuple[Dict[str, Any],
         new_state["html_monitor"] = {}
         new_state["html_hashes"] = {}
         new_state["html_monitor_posted"] = {}
-        log.info("🧹 Limpeza: html_monitor/html_hashes/cooldown removido")
+        # Validadores e digest sem hash para comparar não servem: vão junto.
+        new_state["html_monitor_http"] = {}
+        # Links da ronda anterior idem: a re-inicialização grava o conjunto de novo.
+        new_state["html_monitor_links"] = {}
+        # Sem a hora da última ronda, o próximo lote da cadência re-inicializa os sites.
+        new_state.pop("html_monitor_checked_at", None)
+        log.info("🧹 Limpeza: html_monitor/html_hashes/cooldown/links removidos")
 
     elif clean_type == "tudo":
         # Limpa tudo exceto last_cleanup e last_announced_hash
         new_state["dedup"] = {}
+        new_state["feed_marks"] = {}
         new_state["http_cache"] = {}
+        new_state["host_limits"] = {}
+        new_state["retry_queue"] = {}
+        new_state["source_cadence"] = {}
+        new_state["source_stats"] = {}
+        new_state["breakers"] = {}
         new_state["html_monitor"] = {}
         new_state["html_hashes"] = {}
         new_state["html_monitor_posted"] = {}
+        new_state["html_monitor_http"] = {}
+        new_state["html_monitor_links"] = {}
+        new_state.pop("html_monitor_checked_at", None)
         save_json_safe(p("history.json"), [])
         # Mantém last_cleanup e last_announced_hash
         log.info("🧹 Limpeza: tudo removido (exceto metadados), incluindo history.json")
@@ -11,7 +11,11 @@ from datetime import datetime
 from functools import wraps
 
 from core.stats import stats
-from utils.storage import p
+from utils.http_client import http_client
+from core.host_scheduler import host_scheduler
+from core.proxy_pool import proxy_pool
+from core.scanner.breaker import quarantined
+from utils.storage import p, load_json_safe
 from settings import LOG_LEVEL
 
 log = logging.getLogger("MaftyWeb")
@@ -141,8 +145,22 @@ async def api_stats(request):
     return web.json_response({
         "uptime": stats.format_uptime(),
         "scans": stats.scans_completed,
+        "cadence_batches": stats.cadence_batches,
         "news_posted": stats.news_posted,
         "cache_hits": stats.cache_hits_total,
+        "fingerprint_hits": stats.fingerprint_hits_total,
+        "html_not_modified": stats.html_not_modified_total,
+        "html_digest_hits": stats.html_digest_hits_total,
+        "html_sitemap_unchanged": stats.html_sitemap_unchanged_total,
+        "http_pool": http_client.snapshot(),
+        "host_rate_limits": host_scheduler.snapshot(),
+        "proxy_routes": proxy_pool.snapshot(),
+        "lane_time_to_post": stats.lane_time_to_post,
+        "hedges": {"started": stats.hedges_started, "won_by_fallback": stats.hedges_won},
+        "quarantined_sources": [
+            {"url": url, "failures": item.get("failures"), "next_probe_at": item.get("next_probe_at")}
+            for url, item in quarantined(load_json_safe(p("state.json"), {}).get("breakers"))
+        ],
         "last_scan": stats.last_scan_time.isoformat() if stats.last_scan_time else "Never"
     })
 